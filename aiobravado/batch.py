@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+Execution of many service calls with a bound on the number of calls in flight.
+
+.. code-block:: python
+
+    # Results in the order of the kwargs
+    pets = await client.pet.getPetById.batch(
+        [{'petId': pet_id} for pet_id in pet_ids],
+        concurrency=50,
+    )
+
+    # (index, result) pairs as the calls complete
+    async for index, pet in client.pet.getPetById.batch_as_completed(
+        [{'petId': pet_id} for pet_id in pet_ids],
+    ):
+        ...
+
+    # Stopping early cancels the calls in flight
+    async with client.pet.getPetById.batch_as_completed(kwargs_list) as results:
+        async for index, pet in results:
+            if pet.status == 'sold':
+                break
+
+    # Calls to different operations
+    pet, user = await batch([
+        (client.pet.getPetById, {'petId': 42}),
+        (client.user.getUserByName, {'username': 'bob'}),
+    ])
+"""
+import asyncio
+
+
+# Number of calls of a batch in flight at the same time unless specified
+DEFAULT_BATCH_CONCURRENCY = 10
+
+_WORKER_DONE = object()
+
+
+class BatchResults(object):
+    """Asynchronous iterator over the results of a batch of calls, yielding
+    ``(index, result)`` pairs in completion order.
+
+    Calls are started lazily by ``concurrency`` workers once iteration
+    begins. When ``return_exceptions`` is False, the first failure cancels the
+    calls still in flight and is raised from the iteration; otherwise
+    exceptions are yielded as results.
+
+    The calls still in flight are cancelled when the iteration stops early:
+    on exit when used as an async context manager, or else as soon as the
+    iterator is garbage collected.
+
+    :param calls: iterable of ``(callable_operation, op_kwargs)`` pairs
+    :param concurrency: maximum number of calls in flight
+    :param timeout: timeout in seconds passed to each
+        :meth:`aiobravado.http_future.HttpFuture.result`
+    :param return_exceptions: whether to return failures instead of raising
+    """
+
+    def __init__(self, calls, concurrency=DEFAULT_BATCH_CONCURRENCY, timeout=None, return_exceptions=False):
+        if concurrency < 1:
+            raise ValueError('concurrency must be at least 1, got {0}'.format(concurrency))
+        self._calls = enumerate(calls)
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.return_exceptions = return_exceptions
+        self._queue = asyncio.Queue()
+        self._workers = None
+        self._running_workers = 0
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self._workers is None:
+            self._start()
+
+        try:
+            while self._running_workers:
+                item = await self._queue.get()
+                if item is _WORKER_DONE:
+                    self._running_workers -= 1
+                    continue
+
+                index, result, failed = item
+                if failed and not self.return_exceptions:
+                    raise result
+                return index, result
+        except BaseException:
+            # Failed call, or the iteration itself was cancelled
+            self.cancel()
+            raise
+
+        raise StopAsyncIteration
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.cancel()
+
+    def __del__(self):
+        # Iteration stopped early without the context manager. The workers
+        # don't reference the iterator, so this runs as soon as it is dropped.
+        self.cancel()
+
+    async def results(self):
+        """Wait for all the calls of the batch.
+
+        :return: list of results in the order of the calls
+        """
+        results = {}
+        async for index, result in self:
+            results[index] = result
+        return [results[index] for index in range(len(results))]
+
+    def cancel(self):
+        """Cancel the calls in flight and don't start any new one."""
+        for worker in self._workers or ():
+            worker.cancel()
+
+    def _start(self):
+        self._workers = [
+            asyncio.ensure_future(_work(self._calls, self._queue, self.timeout))
+            for _ in range(self.concurrency)
+        ]
+        self._running_workers = len(self._workers)
+
+
+async def _work(calls, queue, timeout):
+    """Make calls of a batch one after the other, putting their outcome in
+    ``queue``.
+    """
+    try:
+        # Workers share the iterator, so each call is made exactly once
+        for index, (callable_operation, op_kwargs) in calls:
+            try:
+                result = await callable_operation(**op_kwargs).result(timeout=timeout)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                queue.put_nowait((index, e, True))
+            else:
+                queue.put_nowait((index, result, False))
+    finally:
+        queue.put_nowait(_WORKER_DONE)
+
+
+async def batch(calls, concurrency=DEFAULT_BATCH_CONCURRENCY, timeout=None, return_exceptions=False):
+    """Make a batch of calls, possibly to different operations, with at most
+    ``concurrency`` of them in flight.
+
+    :param calls: iterable of ``(callable_operation, op_kwargs)`` pairs
+    :param concurrency: maximum number of calls in flight
+    :param timeout: timeout in seconds of each call
+    :param return_exceptions: whether to return failures in place of their
+        results instead of raising the first one
+    :return: list of results in the order of the calls
+    """
+    return await BatchResults(calls, concurrency, timeout, return_exceptions).results()
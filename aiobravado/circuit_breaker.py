@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+"""
+Circuit breakers for service calls.
+
+A breaker watches the outcome of the recent calls to a host or an operation.
+Once too many of them failed, the breaker opens and calls fail right away with
+:class:`aiobravado.exception.CircuitBreakerOpen` without touching the network.
+After ``reset_timeout`` seconds it lets a few probe calls through: if they
+succeed the breaker closes again, otherwise it stays open for another
+``reset_timeout``.
+
+.. code-block:: python
+
+    breakers = BreakerRegistry(partial(CircuitBreaker, failure_rate_threshold=0.5, reset_timeout=10))
+    client = SwaggerClient.from_spec(spec_dict, config={'circuit_breakers': breakers})
+    ...
+    breakers.metrics()  # {'petstore.swagger.io': {'state': 'open', 'failure_rate': 0.8, ...}}
+"""
+import asyncio
+import collections
+import time
+
+from six import iteritems
+
+from aiobravado.concurrency_limit import get_scope_key
+from aiobravado.concurrency_limit import LIMITER_SCOPES
+from aiobravado.exception import BravadoConnectionError
+from aiobravado.exception import BravadoTimeoutError
+from aiobravado.exception import CircuitBreakerOpen
+from aiobravado.exception import HTTPError
+from aiobravado.exception import HTTPServerError
+from aiobravado.exception import status_map
+from aiobravado.http_future import FutureWrapper
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker(object):
+    """Breaker opening once the failure rate of the recent calls is too high.
+
+    :param failure_rate_threshold: fraction of failed calls, between 0 and 1,
+        at which the breaker opens
+    :param window_size: number of recent calls the failure rate is computed on
+    :param min_calls: number of calls needed before the breaker can open
+    :param reset_timeout: number of seconds the breaker stays open before
+        letting probe calls through
+    :param half_open_calls: number of successful probe calls needed to close
+        the breaker, which is also the number of probes sent concurrently
+    :param failure_on: exception classes counting as failures. HTTP errors are
+        matched by the status code of the response, the other ones when they
+        are raised by the call.
+    """
+
+    def __init__(self, failure_rate_threshold=0.5, window_size=100, min_calls=20, reset_timeout=30,
+                 half_open_calls=1, failure_on=(HTTPServerError, BravadoTimeoutError, BravadoConnectionError)):
+        self.failure_rate_threshold = failure_rate_threshold
+        self.min_calls = min_calls
+        self.reset_timeout = reset_timeout
+        self.half_open_calls = half_open_calls
+        self.failure_on = tuple(failure_on)
+        self.state = CLOSED
+        self.rejected = 0
+        self._outcomes = collections.deque(maxlen=window_size)
+        self._failures = 0
+        self._opened_at = None
+        self._probes = 0
+        self._successful_probes = 0
+
+    @property
+    def failure_rate(self):
+        if not self._outcomes:
+            return 0.0
+        return self._failures / len(self._outcomes)
+
+    def metrics(self):
+        """
+        :return: dict with the state of the breaker, the failure rate and
+            number of recent calls, and the number of calls rejected so far
+        """
+        return {
+            'state': self.state,
+            'failure_rate': self.failure_rate,
+            'calls': len(self._outcomes),
+            'rejected': self.rejected,
+        }
+
+    def is_failure(self, status_code=None, error=None):
+        """
+        :param status_code: status code of the response of the call
+        :param error: exception raised by the call, if any
+        :rtype: bool
+        """
+        if error is not None:
+            return isinstance(error, self.failure_on)
+        return issubclass(status_map.get(status_code, HTTPError), self.failure_on)
+
+    def before_call(self):
+        """Check a call can be sent.
+
+        :raises: CircuitBreakerOpen when the breaker is open, or half open with
+            enough probes in flight.
+        """
+        if self.state == OPEN:
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                self.rejected += 1
+                raise CircuitBreakerOpen(
+                    'Circuit breaker open for {0:.1f} more seconds'.format(
+                        self.reset_timeout - (time.monotonic() - self._opened_at)))
+            self.state = HALF_OPEN
+            self._probes = 0
+            self._successful_probes = 0
+
+        if self.state == HALF_OPEN:
+            if self._probes >= self.half_open_calls:
+                self.rejected += 1
+                raise CircuitBreakerOpen('Circuit breaker half open, waiting for the probe calls to complete')
+            self._probes += 1
+
+    def record(self, failed):
+        """Record the outcome of a call allowed by :meth:`before_call`.
+
+        :param failed: whether the call failed, or None if it did not complete
+            (e.g. it was cancelled) and should not count
+        """
+        if self.state == HALF_OPEN:
+            self._probes -= 1
+            if failed:
+                self._open()
+            elif failed is not None:
+                self._successful_probes += 1
+                if self._successful_probes >= self.half_open_calls:
+                    self._close()
+            return
+
+        if failed is None or self.state != CLOSED:
+            return
+        if len(self._outcomes) == self._outcomes.maxlen:
+            self._failures -= self._outcomes[0]
+        self._outcomes.append(failed)
+        self._failures += failed
+        if len(self._outcomes) >= self.min_calls and self.failure_rate >= self.failure_rate_threshold:
+            self._open()
+
+    def _open(self):
+        self.state = OPEN
+        self._opened_at = time.monotonic()
+
+    def _close(self):
+        self.state = CLOSED
+        self._outcomes.clear()
+        self._failures = 0
+
+
+class BreakerRegistry(object):
+    """Circuit breakers of the calls of a client, one per host or per
+    operation.
+
+    :param breaker_factory: callable returning a new breaker, e.g.
+        ``functools.partial(CircuitBreaker, reset_timeout=10)``
+    :param scope: ``'host'`` for one breaker per host the calls are sent to,
+        ``'operation'`` for one breaker per operation id
+    """
+
+    def __init__(self, breaker_factory=CircuitBreaker, scope='host'):
+        if scope not in LIMITER_SCOPES:
+            raise ValueError('Unknown breaker scope {0}, expected one of {1}'.format(scope, LIMITER_SCOPES))
+        self.breaker_factory = breaker_factory
+        self.scope = scope
+        self.breakers = {}
+
+    def get_breaker(self, operation, request_params):
+        """
+        :type operation: :class:`bravado_core.operation.Operation`
+        :param request_params: request dict of the call
+        :rtype: :class:`CircuitBreaker`
+        """
+        key = get_scope_key(self.scope, operation, request_params)
+        try:
+            return self.breakers[key]
+        except KeyError:
+            breaker = self.breakers[key] = self.breaker_factory()
+            return breaker
+
+    def metrics(self):
+        """
+        :return: dict of hosts or operation ids to the metrics of their
+            breaker
+        """
+        return {key: breaker.metrics() for key, breaker in iteritems(self.breakers)}
+
+
+class BreakerFuture(FutureWrapper):
+    """Future of a service call which is only sent while its circuit breaker
+    is closed.
+
+    :param breaker: :class:`CircuitBreaker` of the call
+    :param make_request: callable sending the request and returning its
+        :class:`aiobravado.http_future.HttpFuture`
+    :type operation: :class:`bravado_core.operation.Operation`
+    """
+
+    behaviour = 'circuit breakers'
+
+    def __init__(self, breaker, make_request, operation=None):
+        super(BreakerFuture, self).__init__(make_request, operation)
+        self.breaker = breaker
+
+    async def response(self, timeout=None):
+        """Send the request and wait for the HTTP response.
+
+        :raises: CircuitBreakerOpen when the breaker does not let the call
+            through.
+        """
+        self.breaker.before_call()
+        failed = None
+        try:
+            self.http_future = self.send()
+            incoming_response = await self.http_future.response(timeout=timeout)
+            failed = self.breaker.is_failure(status_code=incoming_response.status_code)
+            return incoming_response
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if self.breaker.is_failure(error=e):
+                failed = True
+            raise
+        finally:
+            self.breaker.record(failed)
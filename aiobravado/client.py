@@ -44,9 +44,8 @@ To get a client
     client = aiobravado.client.SwaggerClient.from_url(swagger_spec_url)
 """
 import logging
+from functools import partial
 
-from bravado_asyncio.definitions import RunMode
-from bravado_asyncio.http_client import AsyncioClient
 from bravado_core.docstring import create_operation_docstring
 from bravado_core.exception import SwaggerMappingError
 from bravado_core.formatter import SwaggerFormat  # noqa
@@ -55,10 +54,30 @@ from bravado_core.spec import Spec
 from six import iteritems
 from six import itervalues
 
+from aiobravado.batch import BatchResults
+from aiobravado.batch import DEFAULT_BATCH_CONCURRENCY
+from aiobravado.circuit_breaker import BreakerFuture
+from aiobravado.coalescing import make_request_key
+from aiobravado.coalescing import RequestCoalescer
+from aiobravado.concurrency_limit import LimitedFuture
 from aiobravado.config_defaults import CONFIG_DEFAULTS
 from aiobravado.config_defaults import REQUEST_OPTIONS_DEFAULTS
+from aiobravado.connection_pool import make_http_client
 from aiobravado.docstring_property import docstring_property
+from aiobravado.http_future import check_result_mode
+from aiobravado.http_future import RESULT_MODE_MODELS
+from aiobravado.http_future import with_result_mode
+from aiobravado.instrumentation import measure
+from aiobravado.lazy_spec import LazySpec
+from aiobravado.request_builder import RequestBuilder
+from aiobravado.response_cache import CACHE_MODE_BODY
+from aiobravado.response_cache import CachedFuture
+from aiobravado.retry import HedgePolicy
+from aiobravado.retry import LatencyTracker
+from aiobravado.retry import ResilientFuture
+from aiobravado.retry import RetryPolicy
 from aiobravado.swagger_model import Loader
+from aiobravado.swagger_model import preload_remote_documents
 from aiobravado.warning import warn_for_deprecated_op
 
 log = logging.getLogger(__name__)
@@ -74,8 +93,19 @@ class SwaggerClient(object):
         self.__also_return_response = also_return_response
         self.swagger_spec = swagger_spec
 
+    @property
+    def swagger_spec(self):
+        return self._swagger_spec
+
+    @swagger_spec.setter
+    def swagger_spec(self, swagger_spec):
+        self._swagger_spec = swagger_spec
+        # Decorated resources wrap objects owned by the spec, so they have
+        # to be rebuilt whenever the spec is swapped.
+        self._resource_decorators = {}
+
     @classmethod
-    async def from_url(cls, spec_url, http_client=None, request_headers=None, config=None):
+    async def from_url(cls, spec_url, http_client=None, request_headers=None, config=None, spec_cache=None):
         """Build a :class:`SwaggerClient` from a url to the Swagger
         specification for a RESTful API.
 
@@ -88,13 +118,16 @@ class SwaggerClient(object):
         :param config: Config dict for aiobravado and bravado_core.
             See CONFIG_DEFAULTS in :module:`bravado_core.spec`.
             See CONFIG_DEFAULTS in :module:`aiobravado.client`.
+        :param spec_cache: Optional on-disk cache of parsed specs
+        :type  spec_cache: :class:`aiobravado.spec_cache.SpecCache`
 
         :rtype: :class:`bravado_core.spec.Spec`
         """
         log.debug(u"Loading from %s", spec_url)
-        http_client = http_client or AsyncioClient(run_mode=RunMode.FULL_ASYNCIO)
-        loader = Loader(http_client, request_headers=request_headers)
+        http_client = http_client or make_http_client(dict(CONFIG_DEFAULTS, **(config or {})))
+        loader = Loader(http_client, request_headers=request_headers, spec_cache=spec_cache)
         spec_dict = await loader.load_spec(spec_url)
+        remote_documents = await loader.load_remote_documents(spec_url, spec_dict)
 
         # RefResolver may have to download additional json files (remote refs)
         # via http. Wrap http_client's request() so that request headers are
@@ -105,11 +138,11 @@ class SwaggerClient(object):
             http_client.request = inject_headers_for_remote_refs(
                 http_client.request, request_headers)
 
-        return cls.from_spec(spec_dict, spec_url, http_client, config)
+        return cls.from_spec(spec_dict, spec_url, http_client, config, remote_documents=remote_documents)
 
     @classmethod
     def from_spec(cls, spec_dict, origin_url=None, http_client=None,
-                  config=None):
+                  config=None, remote_documents=None):
         """
         Build a :class:`SwaggerClient` from a Swagger spec in dict form.
 
@@ -117,18 +150,23 @@ class SwaggerClient(object):
         :param origin_url: the url used to retrieve the spec_dict
         :type  origin_url: str
         :param config: Configuration dict - see spec.CONFIG_DEFAULTS
+        :param remote_documents: dict of url to the documents of the remote
+            $refs of the spec, already loaded (see
+            :meth:`aiobravado.swagger_model.Loader.load_remote_documents`)
 
         :rtype: :class:`bravado_core.spec.Spec`
         """
-        http_client = http_client or AsyncioClient(run_mode=RunMode.FULL_ASYNCIO)
-
         # Apply aiobravado config defaults
         config = dict(CONFIG_DEFAULTS, **(config or {}))
 
+        http_client = http_client or make_http_client(config)
+
         also_return_response = config.pop('also_return_response', False)
-        swagger_spec = Spec.from_dict(
-            spec_dict, origin_url, http_client, config,
-        )
+        spec_class = LazySpec if config.get('lazy_spec', False) else Spec
+        swagger_spec = spec_class(spec_dict, origin_url, http_client, config)
+        if remote_documents:
+            preload_remote_documents(swagger_spec, remote_documents)
+        swagger_spec.build()
         return cls(swagger_spec, also_return_response=also_return_response)
 
     def get_model(self, model_name):
@@ -139,6 +177,11 @@ class SwaggerClient(object):
         :param item: name of the resource to return
         :return: :class:`Resource`
         """
+        try:
+            return self._resource_decorators[item]
+        except KeyError:
+            pass
+
         resource = self.swagger_spec.resources.get(item)
         if not resource:
             raise AttributeError(
@@ -147,7 +190,9 @@ class SwaggerClient(object):
 
         # Wrap bravado-core's Resource and Operation objects in order to
         # execute a service call via the http_client.
-        return ResourceDecorator(resource, self.__also_return_response)
+        resource_decorator = ResourceDecorator(resource, self.__also_return_response)
+        self._resource_decorators[item] = resource_decorator
+        return resource_decorator
 
     def __repr__(self):
         return u"%s(%s)" % (self.__class__.__name__, self.swagger_spec.api_url)
@@ -192,12 +237,20 @@ class ResourceDecorator(object):
         """
         self.also_return_response = also_return_response
         self.resource = resource
+        self._callable_operations = {}
 
     def __getattr__(self, name):
         """
         :rtype: :class:`CallableOperation`
         """
-        return CallableOperation(getattr(self.resource, name), self.also_return_response)
+        try:
+            return self._callable_operations[name]
+        except KeyError:
+            pass
+
+        callable_operation = CallableOperation(getattr(self.resource, name), self.also_return_response)
+        self._callable_operations[name] = callable_operation
+        return callable_operation
 
     def __dir__(self):
         """
@@ -216,6 +269,60 @@ class CallableOperation(object):
     def __init__(self, operation, also_return_response=False):
         self.also_return_response = also_return_response
         self.operation = operation
+        self._request_builder = None
+        self._coalescer = None
+        self._policies = None
+        self._latency_tracker = None
+
+    @property
+    def request_builder(self):
+        """Lazily compiled request builder for the wrapped operation.
+
+        :rtype: :class:`aiobravado.request_builder.RequestBuilder`
+        """
+        if self._request_builder is None:
+            self._request_builder = RequestBuilder(self.operation)
+        return self._request_builder
+
+    @property
+    def coalescer(self):
+        """Registry of the calls in flight, used when coalescing requests.
+
+        :rtype: :class:`aiobravado.coalescing.RequestCoalescer`
+        """
+        if self._coalescer is None:
+            self._coalescer = RequestCoalescer()
+        return self._coalescer
+
+    @property
+    def policies(self):
+        """Default retry and hedge policies of the operation, from its
+        ``x-retry-policy`` and ``x-hedge-policy`` vendor extensions or else
+        from the config.
+
+        :return: tuple of :class:`aiobravado.retry.RetryPolicy` or None and
+            :class:`aiobravado.retry.HedgePolicy` or None
+        """
+        if self._policies is None:
+            op_spec = self.operation.op_spec
+            config = self.operation.swagger_spec.config
+            retry_policy = op_spec.get('x-retry-policy')
+            hedge_policy = op_spec.get('x-hedge-policy')
+            self._policies = (
+                RetryPolicy.from_dict(retry_policy) if retry_policy is not None else config.get('retry_policy'),
+                HedgePolicy.from_dict(hedge_policy) if hedge_policy is not None else config.get('hedge_policy'),
+            )
+        return self._policies
+
+    @property
+    def latency_tracker(self):
+        """Latencies of the recent calls, used to decide when to hedge.
+
+        :rtype: :class:`aiobravado.retry.LatencyTracker`
+        """
+        if self._latency_tracker is None:
+            self._latency_tracker = LatencyTracker()
+        return self._latency_tracker
 
     @docstring_property(__doc__)
     def __doc__(self):
@@ -240,10 +347,15 @@ class CallableOperation(object):
             REQUEST_OPTIONS_DEFAULTS,
             **(op_kwargs.pop('_request_options', {})))
 
-        request_params = construct_request(
-            self.operation, request_options, **op_kwargs)
+        swagger_spec = self.operation.swagger_spec
+        if swagger_spec.config.get('compile_operations', False):
+            build_request = partial(self.request_builder.build, request_options, op_kwargs)
+        else:
+            build_request = partial(construct_request, self.operation, request_options, **op_kwargs)
+        request_params = measure(
+            swagger_spec.config.get('instrumentation'), 'construct_request', self.operation, build_request)
 
-        http_client = self.operation.swagger_spec.http_client
+        http_client = swagger_spec.http_client
 
         # Per-request config overrides client wide config
         also_return_response = request_options.get(
@@ -251,12 +363,107 @@ class CallableOperation(object):
             self.also_return_response,
         )
 
-        return http_client.request(
+        make_request = partial(
+            http_client.request,
             request_params,
             operation=self.operation,
             response_callbacks=request_options['response_callbacks'],
             also_return_response=also_return_response)
 
+        result_mode = request_options.get('result_mode', RESULT_MODE_MODELS)
+        if result_mode != RESULT_MODE_MODELS:
+            check_result_mode(result_mode)
+            make_request = partial(with_result_mode, make_request, result_mode)
+
+        limiters = swagger_spec.config.get('concurrency_limiters')
+        if limiters is not None:
+            make_request = partial(
+                LimitedFuture,
+                limiters.get_limiter(self.operation, request_params),
+                make_request,
+                operation=self.operation,
+            )
+
+        # Checked before queueing for a slot, so open breakers fail fast
+        breakers = swagger_spec.config.get('circuit_breakers')
+        if breakers is not None:
+            make_request = partial(
+                BreakerFuture,
+                breakers.get_breaker(self.operation, request_params),
+                make_request,
+                operation=self.operation,
+            )
+
+        retry_policy, hedge_policy = self.policies
+        retry_policy = request_options.get('retry_policy', retry_policy)
+        hedge_policy = request_options.get('hedge_policy', hedge_policy)
+        if retry_policy is not None or hedge_policy is not None:
+            make_request = partial(
+                ResilientFuture,
+                make_request,
+                request_params['method'],
+                retry_policy=retry_policy,
+                hedge_policy=hedge_policy,
+                latency_tracker=self.latency_tracker,
+                operation=self.operation,
+            )
+
+        response_cache = swagger_spec.config.get('response_cache')
+        if response_cache is not None and request_options.get('cache', True):
+            cache_key = make_request_key(self.operation.operation_id, request_params, False, result_mode)
+            if cache_key is not None:
+                make_request = partial(
+                    CachedFuture,
+                    response_cache,
+                    cache_key,
+                    make_request,
+                    request_params,
+                    self.operation,
+                    response_callbacks=request_options['response_callbacks'],
+                    also_return_response=also_return_response,
+                    result_mode=result_mode,
+                    mode=request_options.get(
+                        'cache_mode', swagger_spec.config.get('response_cache_mode', CACHE_MODE_BODY)),
+                )
+
+        # Response callbacks are specific to each call, so calls using them
+        # are never coalesced
+        coalesce = request_options.get('coalesce', swagger_spec.config.get('coalesce_requests', False))
+        if coalesce and not request_options['response_callbacks']:
+            key = make_request_key(self.operation.operation_id, request_params, also_return_response, result_mode)
+            if key is not None:
+                return self.coalescer.request(key, make_request)
+
+        return make_request()
+
+    async def batch(self, op_kwargs_list, concurrency=DEFAULT_BATCH_CONCURRENCY, timeout=None,
+                    return_exceptions=False):
+        """Call the operation once per kwargs dict, with at most
+        ``concurrency`` calls in flight.
+
+        :param op_kwargs_list: iterable of kwargs dicts, one per call
+        :param concurrency: maximum number of calls in flight
+        :param timeout: timeout in seconds of each call
+        :param return_exceptions: whether to return failures in place of
+            their results instead of raising the first one
+        :return: list of results in the order of ``op_kwargs_list``
+        """
+        return await self.batch_as_completed(op_kwargs_list, concurrency, timeout, return_exceptions).results()
+
+    def batch_as_completed(self, op_kwargs_list, concurrency=DEFAULT_BATCH_CONCURRENCY, timeout=None,
+                           return_exceptions=False):
+        """Like :meth:`batch`, but iterate over ``(index, result)`` pairs as
+        the calls complete.
+
+        :rtype: :class:`aiobravado.batch.BatchResults`
+        """
+        return BatchResults(
+            ((self, op_kwargs) for op_kwargs in op_kwargs_list),
+            concurrency=concurrency,
+            timeout=timeout,
+            return_exceptions=return_exceptions,
+        )
+
 
 def construct_request(operation, request_options, **op_kwargs):
     """Construct the outgoing request dict.
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+Coalescing of identical concurrent requests ("single-flight").
+
+When the ``coalesce_requests`` config key is enabled, calls to safe operations
+(GET and HEAD) made while an identical call is still in flight don't send a new
+request: they wait for the response of the call in flight and receive the same
+result.
+
+Results are shared between the coalesced calls, so they should be treated as
+read-only.
+"""
+import asyncio
+from functools import partial
+
+from six import iteritems
+
+from aiobravado.exception import BravadoTimeoutError
+from aiobravado.http_future import FutureWrapper
+from aiobravado.http_future import RESULT_MODE_MODELS
+
+# HTTP methods whose requests can be shared between callers
+COALESCED_METHODS = frozenset(('GET', 'HEAD'))
+
+
+class CoalescedFutureTimeout(BravadoTimeoutError, asyncio.TimeoutError):
+    pass
+
+
+def freeze(value):
+    """Build a hashable equivalent of a marshalled request value.
+
+    :raises: TypeError if the value can not be made hashable.
+    """
+    if isinstance(value, dict):
+        return tuple(sorted((key, freeze(item)) for key, item in iteritems(value)))
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    hash(value)
+    return value
+
+
+def make_request_key(operation_id, request_params, also_return_response, result_mode=RESULT_MODE_MODELS):
+    """Identify a request by its operation and marshalled request.
+
+    :param operation_id: id of the called operation
+    :param request_params: request dict built by
+        :func:`aiobravado.client.construct_request`
+    :param also_return_response: whether the call returns the http response
+    :param result_mode: what the response body is turned into, see
+        :data:`aiobravado.http_future.RESULT_MODES`
+    :return: a hashable key, or None if the request can not be coalesced.
+    """
+    if request_params['method'] not in COALESCED_METHODS:
+        return None
+    try:
+        return operation_id, also_return_response, result_mode, freeze(request_params)
+    except TypeError:
+        return None
+
+
+class CoalescedFuture(FutureWrapper):
+    """Future of a call sharing the response of an identical call in flight.
+
+    Only :meth:`result` is supported, the http response is read by the
+    shared call.
+
+    :param task: task resolving to the result of the shared call
+    :type task: :class:`asyncio.Task`
+    :param shared_future: future of the shared call
+    """
+
+    behaviour = 'request coalescing'
+
+    def __init__(self, task, shared_future=None):
+        super(CoalescedFuture, self).__init__(
+            None, operation=getattr(shared_future, 'operation', None))
+        self.task = task
+        self.shared_future = shared_future
+        self._waiter = None
+
+    @property
+    def future(self):
+        """Future adapter of the shared call, or None."""
+        return getattr(self.shared_future, 'future', None)
+
+    async def result(self, timeout=None):
+        """Wait for the result of the shared call.
+
+        Giving up on the result, because of the timeout or a cancellation,
+        doesn't cancel the request which other callers may be waiting for.
+
+        :param timeout: Number of seconds to wait for the result. Defaults to
+            None which means wait indefinitely.
+        """
+        if self._cancelled:
+            raise asyncio.CancelledError()
+        self._waiter = asyncio.shield(self.task)
+        try:
+            return await asyncio.wait_for(self._waiter, timeout)
+        except asyncio.TimeoutError:
+            if self.task.done():
+                # The shared call itself timed out
+                raise
+            raise CoalescedFutureTimeout('Timed out waiting for a coalesced request')
+
+    async def response(self, timeout=None):
+        """
+        :raises: TypeError, the http response is read by the shared call.
+            Use :meth:`result` with ``also_return_response`` to get it.
+        """
+        raise TypeError('The responses of calls with {0} can only be read through result()'.format(self.behaviour))
+
+    def cancel(self):
+        """Give up on the result, without cancelling the shared call which
+        other callers may be waiting for.
+        """
+        self._cancelled = True
+        if self._waiter is not None:
+            self._waiter.cancel()
+
+
+class RequestCoalescer(object):
+    """Registry of the calls in flight, keyed by
+    :func:`make_request_key`.
+    """
+
+    def __init__(self):
+        self._in_flight = {}
+
+    def request(self, key, make_request):
+        """Join the call in flight with the same key, or start a new one.
+
+        :param key: request key from :func:`make_request_key`
+        :param make_request: callable sending the request and returning its
+            :class:`aiobravado.http_future.HttpFuture`
+        :rtype: :class:`CoalescedFuture`
+        """
+        in_flight = self._in_flight.get(key)
+        if in_flight is None:
+            http_future = make_request()
+            task = asyncio.ensure_future(http_future.result())
+            in_flight = self._in_flight[key] = task, http_future
+            task.add_done_callback(partial(self._forget, key))
+        return CoalescedFuture(*in_flight)
+
+    def in_flight(self):
+        """Number of distinct calls in flight."""
+        return len(self._in_flight)
+
+    def _forget(self, key, task):
+        if self._in_flight.get(key, (None,))[0] is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            # Don't warn about an unretrieved exception when every caller
+            # gave up on the result
+            task.exception()
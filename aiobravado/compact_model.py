@@ -0,0 +1,359 @@
+# -*- coding: utf-8 -*-
+"""
+Compact model instances for unmarshalled responses.
+
+bravado-core models keep their properties in a per-instance dict, which makes a
+large list of models take several times the memory of its JSON. With the
+``compact_models`` config key, responses are unmarshalled into instances of
+:class:`CompactModel` subclasses generated for each definition, storing every
+property in a slot.
+
+Compact models support attribute and item access, ``in``, ``_as_dict()``,
+equality and ``repr`` like bravado-core models, but are not instances of the
+types returned by ``SwaggerClient.get_model``. Schemas using ``allOf`` or a
+``discriminator`` keep being unmarshalled into bravado-core models.
+
+The same compiled unmarshallers also back the ``'dicts'`` result mode, where
+objects are unmarshalled into plain dicts instead of models, and the default
+``'models'`` result mode, where they are unmarshalled into the bravado-core
+models of the definitions.
+"""
+import keyword
+from functools import partial
+
+from bravado_core.model import is_object
+from bravado_core.model import MODEL_MARKER
+from bravado_core.unmarshal import unmarshal_schema_object
+from six import iteritems
+
+# Attribute of the specs holding their compact model types, keyed by model
+# name. Kept on the spec, which the types reference, so that they are collected
+# together.
+COMPACT_MODELS_ATTRIBUTE = '_aiobravado_compact_models'
+
+# Attribute of the specs holding the unmarshallers of their bravado-core
+# models, keyed by model name
+MODEL_UNMARSHALLERS_ATTRIBUTE = '_aiobravado_model_unmarshallers'
+
+
+class CompactModel(object):
+    """Base class of the generated compact model types.
+
+    ``_properties`` holds the names of the properties defined in the spec,
+    ``_slot_names`` maps them to the slot holding their value. Properties
+    whose name is not a valid attribute name are stored in ``_p<index>``
+    slots and can be read with ``getattr`` or ``[]``.
+    """
+
+    __slots__ = ()
+
+    _properties = ()
+    _slot_names = {}
+    _model_spec = None
+    # Overridden by a slot in the models allowing additional properties
+    _additional = None
+
+    def __getattr__(self, name):
+        # Only called for names which are not slots: properties with names
+        # that are not identifiers, and additional properties
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError('{0!r} object has no attribute {1!r}'.format(type(self).__name__, name))
+
+    def __getitem__(self, name):
+        try:
+            slot_name = self._slot_names[name]
+        except KeyError:
+            additional = self._additional
+            if additional is None:
+                raise KeyError(name)
+            return additional[name]
+        return getattr(self, slot_name)
+
+    def __contains__(self, name):
+        if name in self._slot_names:
+            return True
+        additional = self._additional
+        return additional is not None and name in additional
+
+    def __dir__(self):
+        additional = self._additional
+        return sorted(list(self._properties) + list(additional or ()))
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self._as_dict(recursive=False) == other._as_dict(recursive=False)
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        properties = sorted(iteritems(self._as_dict(recursive=False)))
+        return '{0}({1})'.format(
+            type(self).__name__,
+            ', '.join('{0}={1!r}'.format(name, value) for name, value in properties),
+        )
+
+    def _as_dict(self, additional_properties=True, recursive=True):
+        """Get property values as a dict.
+
+        :param additional_properties: whether to include the properties that
+            are not defined in the spec
+        :param recursive: whether to turn nested models into dicts as well
+        :rtype: dict
+        """
+        dct = {name: getattr(self, slot_name) for name, slot_name in iteritems(self._slot_names)}
+        additional = self._additional
+        if additional_properties and additional:
+            dct.update(additional)
+        if recursive:
+            dct = {name: _as_dict(value) for name, value in iteritems(dct)}
+        return dct
+
+
+def _as_dict(value):
+    if isinstance(value, CompactModel):
+        return value._as_dict()
+    if isinstance(value, list):
+        return [_as_dict(item) for item in value]
+    return value
+
+
+def make_slot_names(property_names):
+    """
+    :return: dict of property names to the name of the slot holding their
+        value
+    """
+    slot_names = {}
+    for index, name in enumerate(property_names):
+        if name.isidentifier() and not keyword.iskeyword(name) and not name.startswith('_'):
+            slot_names[name] = name
+        else:
+            slot_names[name] = '_p{0}'.format(index)
+    return slot_names
+
+
+class _ModelUnmarshaller(object):
+    """Unmarshals dicts into instances of a compact model type."""
+
+    def __init__(self, model_type, fields, allows_additional):
+        self.model_type = model_type
+        # list of (property name, slot setter, default, unmarshal function or None)
+        self.fields = fields
+        self.allows_additional = allows_additional
+
+    def __call__(self, value):
+        if value is None:
+            return None
+
+        model = object.__new__(self.model_type)
+        found = 0
+        for name, set_slot, default, unmarshal in self.fields:
+            property_value = value.get(name, default)
+            if property_value is not None:
+                if name in value:
+                    found += 1
+                if unmarshal is not None:
+                    property_value = unmarshal(property_value)
+            set_slot(model, property_value)
+
+        if self.allows_additional:
+            additional = None
+            if len(value) > found:
+                properties = self.model_type._slot_names
+                additional = {name: item for name, item in iteritems(value) if name not in properties} or None
+            model._additional = additional
+        return model
+
+
+def get_compact_model_unmarshaller(swagger_spec, model_name, model_spec):
+    """Return the function unmarshalling dicts into the compact model type
+    of a definition, creating the type on first use.
+
+    :type swagger_spec: :class:`bravado_core.spec.Spec`
+    :rtype: callable
+    """
+    models = vars(swagger_spec).get(COMPACT_MODELS_ATTRIBUTE)
+    if models is None:
+        models = {}
+        setattr(swagger_spec, COMPACT_MODELS_ATTRIBUTE, models)
+    try:
+        return models[model_name]
+    except KeyError:
+        pass
+
+    deref = swagger_spec.deref
+    properties = deref(model_spec.get('properties', {}))
+    slot_names = make_slot_names(list(properties))
+    allows_additional = deref(model_spec.get('additionalProperties', True)) is not False
+
+    slots = tuple(slot_names.values())
+    if allows_additional:
+        slots += ('_additional',)
+    model_type = type(str(model_name), (CompactModel,), {
+        '__slots__': slots,
+        '_properties': tuple(properties),
+        '_slot_names': slot_names,
+        '_model_spec': model_spec,
+    })
+
+    # Registered before compiling the properties, which may refer back to
+    # the model
+    unmarshaller = models[model_name] = _ModelUnmarshaller(model_type, [], allows_additional)
+    for name, property_spec in iteritems(properties):
+        property_spec = deref(property_spec)
+        unmarshaller.fields.append((
+            name,
+            getattr(model_type, slot_names[name]).__set__,
+            property_spec.get('default'),
+            _compile(swagger_spec, property_spec, get_compact_model_unmarshaller),
+        ))
+    return unmarshaller
+
+
+class _BravadoModelUnmarshaller(object):
+    """Unmarshals dicts into instances of a bravado-core model type."""
+
+    def __init__(self, model_type, property_unmarshallers):
+        self.model_type = model_type
+        # list of (property name, unmarshal function)
+        self.property_unmarshallers = property_unmarshallers
+
+    def __call__(self, value):
+        if value is None:
+            return None
+        # Missing properties are added by _from_dict
+        return self.model_type._from_dict(_unmarshal_object(self.property_unmarshallers, False, value))
+
+
+def get_model_unmarshaller(swagger_spec, model_name, model_spec):
+    """Return the function unmarshalling dicts into the bravado-core model
+    type of a definition.
+
+    :type swagger_spec: :class:`bravado_core.spec.Spec`
+    :rtype: callable
+    """
+    unmarshallers = vars(swagger_spec).get(MODEL_UNMARSHALLERS_ATTRIBUTE)
+    if unmarshallers is None:
+        unmarshallers = {}
+        setattr(swagger_spec, MODEL_UNMARSHALLERS_ATTRIBUTE, unmarshallers)
+    try:
+        return unmarshallers[model_name]
+    except KeyError:
+        pass
+
+    deref = swagger_spec.deref
+    model_type = swagger_spec.definitions.get(model_name)
+    if model_type is None or isinstance(deref(model_spec.get('additionalProperties')), dict):
+        unmarshallers[model_name] = _fallback(swagger_spec, model_spec, True)
+        return unmarshallers[model_name]
+
+    # Registered before compiling the properties, which may refer back to
+    # the model
+    unmarshaller = unmarshallers[model_name] = _BravadoModelUnmarshaller(model_type, [])
+    for name, property_spec in iteritems(deref(model_spec.get('properties', {}))):
+        unmarshaller.property_unmarshallers.append(
+            (name, _compile(swagger_spec, property_spec, get_model_unmarshaller) or _identity),
+        )
+    return unmarshaller
+
+
+def _unmarshal_array(unmarshal_item, value):
+    return [None if item is None else unmarshal_item(item) for item in value]
+
+
+def _unmarshal_object(property_unmarshallers, include_missing_properties, value):
+    result = dict(value)
+    for name, unmarshal in property_unmarshallers:
+        property_value = result.get(name)
+        if property_value is not None:
+            result[name] = unmarshal(property_value)
+        elif include_missing_properties:
+            result[name] = None
+    return result
+
+
+def _as_dicts(unmarshal_function, value):
+    """Turn the models returned by bravado-core into dicts."""
+    return _models_as_dicts(unmarshal_function(value))
+
+
+def _models_as_dicts(value):
+    as_dict = getattr(value, '_as_dict', None)
+    if as_dict is not None:
+        return as_dict()
+    if isinstance(value, list):
+        return [_models_as_dicts(item) for item in value]
+    if isinstance(value, dict):
+        return {name: _models_as_dicts(item) for name, item in iteritems(value)}
+    return value
+
+
+def _compile(swagger_spec, schema, get_model_unmarshaller):
+    """Build the function unmarshalling values of a schema, or None when
+    values are returned as they are.
+
+    :param get_model_unmarshaller: function returning the unmarshaller of a
+        definition's model, or None to unmarshal objects into dicts
+    """
+    deref = swagger_spec.deref
+    schema = deref(schema)
+    use_models = get_model_unmarshaller is not None
+
+    if 'allOf' in schema or 'discriminator' in schema:
+        return _fallback(swagger_spec, schema, use_models)
+
+    model_name = deref(schema.get(MODEL_MARKER))
+    if use_models and model_name is not None and is_object(swagger_spec, schema):
+        return get_model_unmarshaller(swagger_spec, model_name, schema)
+
+    schema_type = deref(schema.get('type'))
+    if schema_type == 'array':
+        unmarshal_item = _compile(swagger_spec, schema.get('items', {}), get_model_unmarshaller)
+        return None if unmarshal_item is None else partial(_unmarshal_array, unmarshal_item)
+
+    if is_object(swagger_spec, schema):
+        if isinstance(deref(schema.get('additionalProperties')), dict):
+            return _fallback(swagger_spec, schema, use_models)
+        property_unmarshallers = [
+            (name, _compile(swagger_spec, property_spec, get_model_unmarshaller) or _identity)
+            for name, property_spec in iteritems(deref(schema.get('properties', {})))
+        ]
+        return partial(
+            _unmarshal_object, property_unmarshallers, swagger_spec.config['include_missing_properties'])
+
+    if 'format' in schema or 'default' in schema:
+        return partial(unmarshal_schema_object, swagger_spec, schema)
+    return None
+
+
+def _fallback(swagger_spec, schema, use_models):
+    """Unmarshal the schemas not handled here with bravado-core."""
+    unmarshal_function = partial(unmarshal_schema_object, swagger_spec, schema)
+    return unmarshal_function if use_models else partial(_as_dicts, unmarshal_function)
+
+
+def _identity(value):
+    return value
+
+
+def compile_unmarshaller(swagger_spec, schema, use_models=True, compact_models=True):
+    """Build a function unmarshalling values of a schema.
+
+    :type swagger_spec: :class:`bravado_core.spec.Spec`
+    :param schema: schema of the values
+    :param use_models: whether objects of the definitions become models, or
+        plain dicts
+    :param compact_models: whether the models are compact models, or the
+        bravado-core models of the definitions
+    :rtype: callable
+    """
+    if not use_models:
+        get_model_unmarshaller_function = None
+    elif compact_models:
+        get_model_unmarshaller_function = get_compact_model_unmarshaller
+    else:
+        get_model_unmarshaller_function = get_model_unmarshaller
+    return _compile(swagger_spec, schema, get_model_unmarshaller_function) or _identity
@@ -4,3 +4,20 @@ try:
     import simplejson as json  # pylint:disable=unused-import
 except ImportError:
     import json  # noqa
+
+# Fastest available JSON decoder accepting the raw (utf-8 encoded) bytes of a
+# response body, to be used as the ``json_decoder`` config value.
+try:
+    from orjson import loads as json_loads_bytes  # pylint:disable=unused-import
+except ImportError:
+    try:
+        from ujson import loads as json_loads_bytes  # noqa
+    except ImportError:
+        try:
+            from rapidjson import loads as json_loads_bytes  # noqa
+        except ImportError:
+            def json_loads_bytes(data):
+                # json.loads only accepts bytes since Python 3.6
+                if isinstance(data, (bytes, bytearray)):
+                    data = data.decode('utf-8')
+                return json.loads(data)
@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+"""
+Adaptive concurrency limits for service calls.
+
+A limiter caps the number of calls in flight to an operation or a host and
+adapts the cap to the observed latency: it grows while calls succeed quickly and
+shrinks when they time out, fail with a 5XX status code or exceed a latency
+threshold. Calls over the limit wait in a queue, or fail fast with
+:class:`aiobravado.exception.ConcurrencyLimitExceeded` once the queue is full.
+
+.. code-block:: python
+
+    limiters = LimiterRegistry(partial(AIMDLimiter, max_queue=100, latency_threshold=0.5), scope='host')
+    client = SwaggerClient.from_spec(spec_dict, config={'concurrency_limiters': limiters})
+    ...
+    limiters.metrics()  # {'petstore.swagger.io': {'limit': 17, 'in_flight': 17, 'queue_depth': 3, ...}}
+"""
+import asyncio
+import collections
+import time
+
+from six import iteritems
+from six.moves.urllib.parse import urlsplit
+
+from aiobravado.exception import BravadoConnectionError
+from aiobravado.exception import BravadoTimeoutError
+from aiobravado.exception import ConcurrencyLimitExceeded
+from aiobravado.http_future import FutureWrapper
+
+LIMITER_SCOPES = ('operation', 'host')
+
+
+def get_scope_key(scope, operation, request_params):
+    """
+    :param scope: ``'operation'`` or ``'host'``
+    :type operation: :class:`bravado_core.operation.Operation`
+    :param request_params: request dict of the call
+    :return: operation id or host of the call
+    """
+    if scope == 'operation':
+        return operation.operation_id
+    return urlsplit(request_params['url']).netloc
+
+
+class AIMDLimiter(object):
+    """Additive increase, multiplicative decrease concurrency limiter.
+
+    The limit grows by one after each successful call made while at least half
+    of the limit was in use, and is multiplied by ``backoff_ratio`` after each
+    dropped or slow call.
+
+    :param initial_limit: limit before any call completed
+    :param min_limit: lowest limit
+    :param max_limit: highest limit
+    :param backoff_ratio: factor applied to the limit when backing off
+    :param latency_threshold: number of seconds above which calls count as
+        dropped. Defaults to None, which means only failures do.
+    :param max_queue: maximum number of calls waiting for a slot. 0 fails
+        calls over the limit right away, None queues them all.
+    :param queue_timeout: maximum number of seconds a call waits for a slot.
+        Defaults to None, which means no limit.
+    """
+
+    def __init__(self, initial_limit=20, min_limit=1, max_limit=1000, backoff_ratio=0.9,
+                 latency_threshold=None, max_queue=None, queue_timeout=None):
+        self.limit = initial_limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff_ratio = backoff_ratio
+        self.latency_threshold = latency_threshold
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self.rejected = 0
+        self._waiters = collections.deque()
+
+    @property
+    def queue_depth(self):
+        return len(self._waiters)
+
+    def metrics(self):
+        """
+        :return: dict with the current limit, number of calls in flight and
+            queued, and number of calls rejected so far
+        """
+        return {
+            'limit': self.limit,
+            'in_flight': self.in_flight,
+            'queue_depth': self.queue_depth,
+            'rejected': self.rejected,
+        }
+
+    async def acquire(self):
+        """Wait for a slot to make a call.
+
+        :raises: ConcurrencyLimitExceeded when the queue is full or the call
+            waited longer than ``queue_timeout``.
+        """
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            return
+
+        if self.max_queue is not None and len(self._waiters) >= self.max_queue:
+            self.rejected += 1
+            raise ConcurrencyLimitExceeded(
+                'Concurrency limit of {0} reached with {1} calls queued'.format(self.limit, len(self._waiters)))
+
+        waiter = asyncio.get_event_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._discard_waiter(waiter)
+            self.rejected += 1
+            raise ConcurrencyLimitExceeded(
+                'Waited more than {0} seconds for a slot under the concurrency limit'.format(self.queue_timeout))
+        except BaseException:
+            self._discard_waiter(waiter)
+            raise
+
+    def release(self, latency=None, dropped=False):
+        """Free the slot of a completed call and adapt the limit.
+
+        :param latency: number of seconds the call took, or None if it did not
+            complete (e.g. it was cancelled) and should not affect the limit
+        :param dropped: whether the call failed because of the load on the
+            server (timeouts, 5XX status codes)
+        """
+        in_flight = self.in_flight
+        self.in_flight -= 1
+
+        if latency is not None:
+            if dropped or (self.latency_threshold is not None and latency > self.latency_threshold):
+                self.limit = max(self.min_limit, int(self.limit * self.backoff_ratio))
+            elif in_flight * 2 >= self.limit:
+                self.limit = min(self.max_limit, self.limit + 1)
+
+        self._wake_waiters()
+
+    def _discard_waiter(self, waiter):
+        if waiter.done() and not waiter.cancelled():
+            # A slot was handed over just before giving up, pass it on
+            self.in_flight -= 1
+            self._wake_waiters()
+        else:
+            try:
+                self._waiters.remove(waiter)
+            except ValueError:
+                pass
+
+    def _wake_waiters(self):
+        while self._waiters and self.in_flight < self.limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+
+class LimiterRegistry(object):
+    """Limiters of the calls of a client, one per operation or per host.
+
+    :param limiter_factory: callable returning a new limiter, e.g.
+        ``functools.partial(AIMDLimiter, max_queue=100)``
+    :param scope: ``'operation'`` for one limiter per operation id, ``'host'``
+        for one limiter per host the calls are sent to
+    """
+
+    def __init__(self, limiter_factory=AIMDLimiter, scope='operation'):
+        if scope not in LIMITER_SCOPES:
+            raise ValueError('Unknown limiter scope {0}, expected one of {1}'.format(scope, LIMITER_SCOPES))
+        self.limiter_factory = limiter_factory
+        self.scope = scope
+        self.limiters = {}
+
+    def get_limiter(self, operation, request_params):
+        """
+        :type operation: :class:`bravado_core.operation.Operation`
+        :param request_params: request dict of the call
+        :rtype: :class:`AIMDLimiter`
+        """
+        key = get_scope_key(self.scope, operation, request_params)
+        try:
+            return self.limiters[key]
+        except KeyError:
+            limiter = self.limiters[key] = self.limiter_factory()
+            return limiter
+
+    def metrics(self):
+        """
+        :return: dict of operation ids or hosts to the metrics of their
+            limiter
+        """
+        return {key: limiter.metrics() for key, limiter in iteritems(self.limiters)}
+
+
+class LimitedFuture(FutureWrapper):
+    """Future of a service call which is only sent once the concurrency
+    limiter grants it a slot.
+
+    :param limiter: :class:`AIMDLimiter` of the call
+    :param make_request: callable sending the request and returning its
+        :class:`aiobravado.http_future.HttpFuture`
+    :type operation: :class:`bravado_core.operation.Operation`
+    """
+
+    behaviour = 'concurrency limits'
+
+    def __init__(self, limiter, make_request, operation=None):
+        super(LimitedFuture, self).__init__(make_request, operation)
+        self.limiter = limiter
+
+    async def response(self, timeout=None):
+        """Wait for a slot, send the request and wait for the HTTP response.
+
+        The time spent waiting for a slot does not count towards the timeout.
+
+        :raises: ConcurrencyLimitExceeded when no slot is available.
+        """
+        await self.limiter.acquire()
+        start = time.monotonic()
+        latency = None
+        dropped = True
+        try:
+            self.http_future = self.send()
+            incoming_response = await self.http_future.response(timeout=timeout)
+            dropped = incoming_response.status_code >= 500
+            latency = time.monotonic() - start
+            return incoming_response
+        except (BravadoTimeoutError, BravadoConnectionError):
+            latency = time.monotonic() - start
+            raise
+        finally:
+            self.limiter.release(latency, dropped=dropped)
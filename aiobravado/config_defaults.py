@@ -3,6 +3,92 @@ CONFIG_DEFAULTS = {
     # See the constructor of :class:`bravado.http_future.HttpFuture` for an
     # in depth explanation of what this means.
     'also_return_response': False,
+
+    # Build a specialized request builder for each operation on its first call
+    # and use it instead of interpreting the operation on every request.
+    # See :class:`aiobravado.request_builder.RequestBuilder`.
+    'compile_operations': False,
+    # Validate the parameters of compiled operations with jsonschema validators
+    # built once per parameter instead of on every call. Only used with
+    # validate_requests. See :mod:`aiobravado.validate`.
+    'cache_request_validators': False,
+
+    # Build resources, operations and models the first time they are used
+    # instead of when the client is created. See aiobravado.lazy_spec.
+    'lazy_spec': False,
+
+    # Unmarshal responses into __slots__ based models, see
+    # :mod:`aiobravado.compact_model`.
+    'compact_models': False,
+
+    # Callable decoding the raw bytes of JSON response bodies. When None, the
+    # response adapter of the http client decodes the body, except for the
+    # offloaded responses which are decoded with json_loads_bytes.
+    # aiobravado.compat.json_loads_bytes is the fastest decoder available.
+    'json_decoder': None,
+
+    # Callable decoding the raw bytes of msgpack response bodies. When None,
+    # msgpack.unpackb is used.
+    'msgpack_decoder': None,
+
+    # Responses whose Content-Length is at least this number of bytes are
+    # decoded and unmarshalled in the offload_executor instead of on the event
+    # loop. None keeps every response on the event loop.
+    'offload_threshold': None,
+    # concurrent.futures.Executor used for large responses. None uses the
+    # default executor of the event loop. Process pools only decode bodies.
+    'offload_executor': None,
+
+    # Share the response of identical GET and HEAD calls made while one of
+    # them is in flight. See :mod:`aiobravado.coalescing`.
+    'coalesce_requests': False,
+
+    # :class:`aiobravado.response_cache.ResponseCache` holding the responses
+    # of GET and HEAD calls. None disables caching.
+    'response_cache': None,
+
+    # Whether cache hits return objects unmarshalled from the cached body
+    # ('body') or the cached unmarshalled result itself ('result').
+    'response_cache_mode': 'body',
+
+    # Connection pool of the http client built when none is passed to the
+    # SwaggerClient. When any of these is set, the client gets its own pool,
+    # see :class:`aiobravado.connection_pool.PooledAsyncioClient`. None keeps
+    # aiohttp's default.
+    #
+    # Maximum number of connections, 0 for no limit.
+    'connection_limit': None,
+    # Maximum number of connections to a single host, 0 for no limit.
+    'connection_limit_per_host': None,
+    # Number of seconds idle connections are kept open for reuse.
+    'keepalive_timeout': None,
+    # Number of seconds host name resolutions are cached for, 0 to disable.
+    'dns_cache_ttl': None,
+
+    # :class:`aiobravado.concurrency_limit.LimiterRegistry` adaptively
+    # limiting the number of calls in flight per operation or per host. None
+    # disables limiting.
+    'concurrency_limiters': None,
+
+    # :class:`aiobravado.circuit_breaker.BreakerRegistry` short-circuiting
+    # calls to failing hosts or operations. None disables circuit breaking.
+    'circuit_breakers': None,
+
+    # :class:`aiobravado.retry.RetryPolicy` of the operations without an
+    # x-retry-policy vendor extension. None disables retries.
+    'retry_policy': None,
+    # :class:`aiobravado.retry.HedgePolicy` of the operations without an
+    # x-hedge-policy vendor extension. None disables hedging.
+    'hedge_policy': None,
+
+    # :class:`aiobravado.response_validation.SampledValidator` validating a
+    # sample of the responses when validate_responses is not set. None
+    # disables sampled validation.
+    'response_validator': None,
+
+    # :class:`aiobravado.instrumentation.Instrumentation` receiving the
+    # duration of each phase of the service calls. None disables timing.
+    'instrumentation': None,
 }
 
 REQUEST_OPTIONS_DEFAULTS = {
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+Http client with a tunable connection pool.
+
+By default, :class:`bravado_asyncio.http_client.AsyncioClient` instances share
+one :class:`aiohttp.ClientSession` per event loop, with aiohttp's default
+connection limits. :class:`PooledAsyncioClient` owns its session instead, so
+that the pool can be sized for the backend it talks to. A single instance can
+be passed as the ``http_client`` of several :class:`aiobravado.client.SwaggerClient`
+instances talking to the same backend, which then share the pool:
+
+.. code-block:: python
+
+    http_client = PooledAsyncioClient(limit_per_host=50, keepalive_timeout=60)
+    pets = await SwaggerClient.from_url(pets_spec_url, http_client=http_client)
+    users = await SwaggerClient.from_url(users_spec_url, http_client=http_client)
+    ...
+    await http_client.close()
+"""
+import aiohttp
+from bravado_asyncio.definitions import RunMode
+from bravado_asyncio.http_client import AsyncioClient
+from six import iteritems
+
+# Config keys of :data:`aiobravado.config_defaults.CONFIG_DEFAULTS` mapped to
+# the :class:`PooledAsyncioClient` argument they set
+CONNECTION_POOL_CONFIG_KEYS = {
+    'connection_limit': 'limit',
+    'connection_limit_per_host': 'limit_per_host',
+    'keepalive_timeout': 'keepalive_timeout',
+    'dns_cache_ttl': 'dns_cache_ttl',
+}
+
+
+class PooledAsyncioClient(AsyncioClient):
+    """Fully asynchronous :class:`AsyncioClient` with its own connection pool.
+
+    The pool is created on the first request, and is bound to the event loop
+    running at that time.
+
+    :param limit: maximum number of connections, 0 for no limit
+    :param limit_per_host: maximum number of connections to a single host
+        (same host, port and scheme), 0 for no limit
+    :param keepalive_timeout: number of seconds idle connections are kept
+        open for reuse
+    :param dns_cache_ttl: number of seconds host name resolutions are cached
+        for, 0 to disable caching
+    :param kwargs: other arguments of :class:`AsyncioClient`
+    """
+
+    def __init__(self, limit=100, limit_per_host=0, keepalive_timeout=15, dns_cache_ttl=10, **kwargs):
+        super(PooledAsyncioClient, self).__init__(run_mode=RunMode.FULL_ASYNCIO, **kwargs)
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self._client_session = None
+
+    @property
+    def client_session(self):
+        if self._client_session is None or self._client_session.closed:
+            self._client_session = aiohttp.ClientSession(connector=self.make_connector())
+        return self._client_session
+
+    def make_connector(self):
+        """
+        :rtype: :class:`aiohttp.TCPConnector`
+        """
+        return aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            use_dns_cache=bool(self.dns_cache_ttl),
+            ttl_dns_cache=self.dns_cache_ttl or None,
+        )
+
+    async def close(self):
+        """Close the pooled connections."""
+        if self._client_session is not None:
+            await self._client_session.close()
+            self._client_session = None
+
+    def __repr__(self):
+        return '{0}(limit={1}, limit_per_host={2}, keepalive_timeout={3}, dns_cache_ttl={4})'.format(
+            type(self).__name__, self.limit, self.limit_per_host, self.keepalive_timeout, self.dns_cache_ttl,
+        )
+
+
+def make_http_client(config):
+    """Build the http client used when none is given to
+    :class:`aiobravado.client.SwaggerClient`.
+
+    :param config: aiobravado config dict
+    :return: a :class:`PooledAsyncioClient` when the connection pool is tuned
+        in the config, otherwise an :class:`AsyncioClient` sharing the default
+        pool of the event loop.
+    """
+    pool_kwargs = {
+        argument: config[config_key]
+        for config_key, argument in iteritems(CONNECTION_POOL_CONFIG_KEYS)
+        if config.get(config_key) is not None
+    }
+    if pool_kwargs:
+        return PooledAsyncioClient(**pool_kwargs)
+    return AsyncioClient(run_mode=RunMode.FULL_ASYNCIO)
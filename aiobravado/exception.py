@@ -240,3 +240,24 @@ class HTTPNetworkAuthenticationRequired(HTTPServerError):
 
 class BravadoTimeoutError(base_exception):
     pass
+
+
+class BravadoConnectionError(ConnectionError):
+    """Raised when the http client could not connect to the server, or lost
+    the connection before receiving the response.
+    """
+    pass
+
+
+class ConcurrencyLimitExceeded(Exception):
+    """Raised when a call is rejected by a concurrency limiter, either because
+    its queue is full or because the call waited too long in it.
+    """
+    pass
+
+
+class CircuitBreakerOpen(Exception):
+    """Raised instead of sending a call while the circuit breaker of its
+    host or operation is open.
+    """
+    pass
@@ -0,0 +1,522 @@
+# -*- coding: utf-8 -*-
+"""
+HTTP/2 http client multiplexing the service calls to a host over a few
+connections, instead of opening one HTTP/1.1 connection per concurrent call.
+
+It needs the optional ``h2`` dependency (``pip install aiobravado[http2]``):
+
+.. code-block:: python
+
+    http_client = HTTP2Client(connections_per_host=2)
+    client = await SwaggerClient.from_url(spec_url, http_client=http_client)
+    ...
+    await http_client.close()
+
+``https`` urls negotiate HTTP/2 through ALPN. Plain ``http`` urls use HTTP/2
+with prior knowledge (h2c), so the server has to accept HTTP/2 connections
+without an upgrade.
+"""
+import asyncio
+import ssl
+import uuid
+from collections.abc import Mapping
+from http import HTTPStatus
+
+import six
+from bravado_core.response import IncomingResponse
+from multidict import CIMultiDict
+from multidict import CIMultiDictProxy
+from six.moves.urllib.parse import urlencode
+from six.moves.urllib.parse import urlsplit
+
+from aiobravado.compat import json
+from aiobravado.http_client import APP_FORM
+from aiobravado.http_client import HttpClient
+from aiobravado.http_client import MULT_FORM
+from aiobravado.http_future import FutureAdapter
+from aiobravado.http_future import HttpFuture
+
+try:
+    import h2.config
+    import h2.connection
+    import h2.errors
+    import h2.events
+    import h2.exceptions
+except ImportError:  # pragma: no cover
+    h2 = None
+
+# Headers that are specific to HTTP/1.1 connections and forbidden in HTTP/2
+CONNECTION_HEADERS = frozenset(('connection', 'host', 'keep-alive', 'proxy-connection', 'transfer-encoding', 'upgrade'))
+
+READ_SIZE = 65536
+
+
+class HTTP2ConnectionError(ConnectionError):
+    pass
+
+
+class HTTP2Response(object):
+    """Complete response received on an HTTP/2 stream.
+
+    :param status: status code
+    :param headers: list of (name, value) tuples
+    :param body: bytes of the body
+    """
+
+    def __init__(self, status, headers, body):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+
+class HTTP2Stream(object):
+
+    def __init__(self):
+        self.future = asyncio.get_event_loop().create_future()
+        self.status = None
+        self.headers = []
+        self.data = []
+
+    def set_result(self):
+        if not self.future.done():
+            self.future.set_result(HTTP2Response(self.status, self.headers, b''.join(self.data)))
+
+    def set_exception(self, exception):
+        if not self.future.done():
+            self.future.set_exception(exception)
+
+
+class HTTP2Connection(object):
+    """HTTP/2 connection on top of asyncio streams, sending requests on
+    concurrent streams.
+
+    Use :meth:`open` to create connections.
+
+    :param reader: :class:`asyncio.StreamReader` of the connection
+    :param writer: :class:`asyncio.StreamWriter` of the connection
+    :param max_streams: maximum number of concurrent streams, further
+        capped by the server's SETTINGS_MAX_CONCURRENT_STREAMS
+    """
+
+    def __init__(self, reader, writer, max_streams=100):
+        self._reader = reader
+        self._writer = writer
+        self._max_streams = max_streams
+        self._h2 = h2.connection.H2Connection(
+            config=h2.config.H2Configuration(client_side=True, header_encoding='utf-8'),
+        )
+        self._streams = {}
+        self._write_lock = asyncio.Lock()
+        self._capacity_available = asyncio.Event()
+        self._window_updated = asyncio.Event()
+        self._read_task = None
+        self.closed = False
+
+    @classmethod
+    async def open(cls, host, port, ssl_context=None, max_streams=100):
+        """Connect to a server and start the HTTP/2 connection.
+
+        :param ssl_context: :class:`ssl.SSLContext` offering ``h2`` through
+            ALPN, or None for plain text HTTP/2.
+        :rtype: :class:`HTTP2Connection`
+        """
+        reader, writer = await asyncio.open_connection(host, port, ssl=ssl_context)
+        if ssl_context is not None:
+            protocol = writer.get_extra_info('ssl_object').selected_alpn_protocol()
+            if protocol != 'h2':
+                writer.close()
+                raise HTTP2ConnectionError('{0}:{1} does not support HTTP/2'.format(host, port))
+
+        connection = cls(reader, writer, max_streams=max_streams)
+        connection._h2.initiate_connection()
+        await connection._flush()
+        connection._read_task = asyncio.ensure_future(connection._read_loop())
+        return connection
+
+    @property
+    def open_streams(self):
+        return len(self._streams)
+
+    @property
+    def max_streams(self):
+        return min(self._max_streams, self._h2.remote_settings.max_concurrent_streams)
+
+    @property
+    def has_capacity(self):
+        return not self.closed and self.open_streams < self.max_streams
+
+    async def request(self, method, scheme, authority, path, headers, body=b''):
+        """Send a request on a new stream and wait for the whole response.
+
+        :param headers: list of (name, value) tuples of lowercase names
+        :param body: bytes of the body
+        :rtype: :class:`HTTP2Response`
+        """
+        while not self.has_capacity:
+            if self.closed:
+                raise HTTP2ConnectionError('Connection closed')
+            self._capacity_available.clear()
+            await self._capacity_available.wait()
+
+        stream_id = self._h2.get_next_available_stream_id()
+        stream = HTTP2Stream()
+        self._streams[stream_id] = stream
+        try:
+            request_headers = [
+                (':method', method),
+                (':scheme', scheme),
+                (':authority', authority),
+                (':path', path),
+            ] + headers
+            self._h2.send_headers(stream_id, request_headers, end_stream=not body)
+            await self._flush()
+            if body:
+                await self._send_body(stream_id, stream, body)
+            return await stream.future
+        except asyncio.CancelledError:
+            if not self.closed:
+                try:
+                    self._h2.reset_stream(stream_id, error_code=h2.errors.ErrorCodes.CANCEL)
+                except h2.exceptions.StreamClosedError:
+                    # The response was complete by the time of the cancellation
+                    pass
+                else:
+                    self._writer.write(self._h2.data_to_send())
+            raise
+        finally:
+            del self._streams[stream_id]
+            self._capacity_available.set()
+
+    async def close(self):
+        if self._read_task is not None:
+            self._read_task.cancel()
+        self._close(HTTP2ConnectionError('Connection closed'))
+
+    async def _send_body(self, stream_id, stream, body):
+        body = memoryview(body)
+        try:
+            while body:
+                window = self._h2.local_flow_control_window(stream_id)
+                while window < 1:
+                    if self.closed or stream.future.done():
+                        return
+                    self._window_updated.clear()
+                    await self._window_updated.wait()
+                    window = self._h2.local_flow_control_window(stream_id)
+
+                chunk_size = min(window, len(body), self._h2.max_outbound_frame_size)
+                self._h2.send_data(stream_id, body[:chunk_size].tobytes())
+                body = body[chunk_size:]
+                await self._flush()
+
+            self._h2.end_stream(stream_id)
+            await self._flush()
+        except h2.exceptions.StreamClosedError:
+            # The server responded without reading the whole body
+            pass
+
+    async def _flush(self):
+        data = self._h2.data_to_send()
+        if data:
+            self._writer.write(data)
+            async with self._write_lock:
+                await self._writer.drain()
+
+    async def _read_loop(self):
+        error = HTTP2ConnectionError('Connection closed by the server')
+        try:
+            while True:
+                data = await self._reader.read(READ_SIZE)
+                if not data:
+                    break
+                for event in self._h2.receive_data(data):
+                    self._handle_event(event)
+                await self._flush()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            error = e
+        finally:
+            self._close(error)
+
+    def _handle_event(self, event):
+        stream = self._streams.get(getattr(event, 'stream_id', None))
+
+        if isinstance(event, h2.events.ResponseReceived):
+            if stream is not None:
+                stream.headers = [(name, value) for name, value in event.headers if not name.startswith(':')]
+                stream.status = int(dict(event.headers)[':status'])
+        elif isinstance(event, h2.events.DataReceived):
+            if stream is not None:
+                stream.data.append(event.data)
+            self._h2.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+        elif isinstance(event, h2.events.StreamEnded):
+            if stream is not None:
+                stream.set_result()
+        elif isinstance(event, h2.events.StreamReset):
+            if stream is not None:
+                stream.set_exception(HTTP2ConnectionError(
+                    'Stream reset by the server with error code {0}'.format(event.error_code)))
+            self._window_updated.set()
+        elif isinstance(event, (h2.events.WindowUpdated, h2.events.RemoteSettingsChanged)):
+            self._window_updated.set()
+            self._capacity_available.set()
+        elif isinstance(event, h2.events.ConnectionTerminated):
+            self._close(HTTP2ConnectionError(
+                'Connection terminated by the server with error code {0}'.format(event.error_code)))
+
+    def _close(self, error):
+        if self.closed:
+            return
+        self.closed = True
+        for stream in list(self._streams.values()):
+            stream.set_exception(error)
+        self._writer.close()
+        self._capacity_available.set()
+        self._window_updated.set()
+
+
+def encode_multipart(fields, files):
+    """Encode form fields and files as a multipart/form-data body.
+
+    :param fields: list of (name, value) tuples
+    :param files: list of (name, (filename, file object)) tuples
+    :return: tuple of content type and body
+    """
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields:
+        parts.append(
+            '--{0}\r\nContent-Disposition: form-data; name="{1}"\r\n\r\n'.format(boundary, name).encode('utf-8') +
+            str(value).encode('utf-8') + b'\r\n'
+        )
+    for name, (filename, file_object) in files:
+        content = file_object.read()
+        if isinstance(content, six.text_type):
+            content = content.encode('utf-8')
+        parts.append(
+            '--{0}\r\nContent-Disposition: form-data; name="{1}"; filename="{2}"\r\n'
+            'Content-Type: application/octet-stream\r\n\r\n'.format(boundary, name, filename).encode('utf-8') +
+            content + b'\r\n'
+        )
+    parts.append('--{0}--\r\n'.format(boundary).encode('utf-8'))
+    return '{0}; boundary={1}'.format(MULT_FORM, boundary), b''.join(parts)
+
+
+def flatten_params(params):
+    """List query or form parameters as (name, str value) tuples, repeating
+    the names of list values, like bravado-asyncio does.
+    """
+    items = []
+    for name, value in six.iteritems(params or {}):
+        values = value if isinstance(value, (list, tuple)) else [value]
+        items.extend((name, str(item)) for item in values)
+    return items
+
+
+def encode_request(request_params):
+    """Turn a request dict into the parts of an HTTP/2 request.
+
+    :param request_params: request dict built by
+        :func:`aiobravado.client.construct_request`
+    :return: tuple of scheme, host, port, authority, path, headers and body
+    """
+    url = urlsplit(request_params.get('url', ''))
+    scheme = url.scheme or 'http'
+    port = url.port or (443 if scheme == 'https' else 80)
+
+    path = url.path or '/'
+    query = '&'.join(query for query in (url.query, urlencode(flatten_params(request_params.get('params')))) if query)
+    if query:
+        path = '{0}?{1}'.format(path, query)
+
+    headers = CIMultiDict(
+        (name, value.decode('utf-8') if isinstance(value, bytes) else str(value))
+        for name, value in six.iteritems(request_params.get('headers') or {})
+    )
+
+    data = request_params.get('data')
+    files = request_params.get('files')
+    if files:
+        content_type, body = encode_multipart(flatten_params(data if isinstance(data, Mapping) else {}), files)
+        headers['Content-Type'] = content_type
+    elif isinstance(data, Mapping):
+        body = urlencode(flatten_params(data)).encode('utf-8') if data else b''
+        if data:
+            headers.setdefault('Content-Type', APP_FORM)
+    elif isinstance(data, six.text_type):
+        body = data.encode('utf-8')
+    else:
+        body = data or b''
+
+    if body:
+        headers['Content-Length'] = str(len(body))
+
+    headers = [
+        (name.lower(), value)
+        for name, value in headers.items()
+        if name.lower() not in CONNECTION_HEADERS
+    ]
+    return scheme, url.hostname, port, url.netloc, path, headers, body
+
+
+class HTTP2FutureAdapter(FutureAdapter):
+    """Wraps the task sending a request of :class:`HTTP2Client`."""
+
+    timeout_errors = (asyncio.TimeoutError,)
+    # Refused connections raise an OSError, broken connections an
+    # HTTP2ConnectionError or a protocol error of h2
+    connection_errors = (HTTP2ConnectionError, OSError) + ((h2.exceptions.ProtocolError,) if h2 else ())
+
+    def __init__(self, future):
+        self.future = future
+
+    async def result(self, timeout=None):
+        return await asyncio.wait_for(self.future, timeout)
+
+    def cancel(self):
+        self.future.cancel()
+
+
+class HTTP2ResponseAdapter(IncomingResponse):
+    """Wraps an :class:`HTTP2Response` to provide the bravado-core response
+    interface. Headers are looked up case insensitively.
+    """
+
+    def __init__(self, response):
+        self._delegate = response
+        self.headers = CIMultiDictProxy(CIMultiDict(response.headers))
+
+    @property
+    def status_code(self):
+        return self._delegate.status
+
+    @property
+    def reason(self):
+        try:
+            return HTTPStatus(self._delegate.status).phrase
+        except ValueError:
+            return ''
+
+    @property
+    async def raw_bytes(self):
+        return self._delegate.body
+
+    @property
+    async def text(self):
+        return self._delegate.body.decode('utf-8')
+
+    async def json(self, **kwargs):
+        return json.loads(self._delegate.body.decode('utf-8'), **kwargs)
+
+
+class HTTP2Client(HttpClient):
+    """Fully asynchronous http client speaking HTTP/2.
+
+    Calls to a host are multiplexed over at most ``connections_per_host``
+    connections. A new connection is only opened when all the existing ones
+    have ``max_streams_per_connection`` calls in flight.
+
+    Connections are bound to the event loop running when they are opened.
+
+    :param connections_per_host: maximum number of connections to a single
+        host (same scheme, host and port)
+    :param max_streams_per_connection: maximum number of concurrent calls on
+        one connection, further capped by the server's settings
+    :param ssl_context: :class:`ssl.SSLContext` used for https urls. The
+        default context verifies certificates.
+    """
+
+    def __init__(self, connections_per_host=1, max_streams_per_connection=100, ssl_context=None):
+        if h2 is None:
+            raise ImportError('HTTP2Client needs the h2 package, install aiobravado[http2]')
+        self.connections_per_host = connections_per_host
+        self.max_streams_per_connection = max_streams_per_connection
+        if ssl_context is None:
+            ssl_context = ssl.create_default_context()
+        ssl_context.set_alpn_protocols(['h2'])
+        self.ssl_context = ssl_context
+        self._pools = {}
+
+    def request(self, request_params, operation=None, response_callbacks=None,
+                also_return_response=False):
+        """
+        :param request_params: complete request data. e.g. url, method,
+            headers, body, params, connect_timeout, timeout, etc.
+        :type request_params: dict
+        :param operation: operation that this http request is for. Defaults
+            to None - in which case, we're obviously just retrieving a Swagger
+            Spec.
+        :type operation: :class:`bravado_core.operation.Operation`
+        :param response_callbacks: List of callables to post-process the
+            incoming response. Expects args incoming_response and operation.
+        :param also_return_response: Consult the constructor documentation for
+            :class:`aiobravado.http_future.HttpFuture`.
+
+        :rtype: :class: `aiobravado.http_future.HttpFuture`
+        """
+        future = asyncio.ensure_future(self._send(request_params))
+        return HttpFuture(
+            HTTP2FutureAdapter(future),
+            HTTP2ResponseAdapter,
+            operation,
+            response_callbacks,
+            also_return_response,
+        )
+
+    async def close(self):
+        """Close all the connections."""
+        pools, self._pools = self._pools, {}
+        for pool in pools.values():
+            for connection_task in pool:
+                if not connection_task.done():
+                    connection_task.cancel()
+                elif not connection_task.cancelled() and connection_task.exception() is None:
+                    await connection_task.result().close()
+
+    async def _send(self, request_params):
+        scheme, host, port, authority, path, headers, body = encode_request(request_params)
+        connection = await self._get_connection(scheme, host, port, request_params.get('connect_timeout'))
+        response = connection.request(
+            request_params.get('method') or 'GET', scheme, authority, path, headers, body,
+        )
+        timeout = request_params.get('timeout')
+        if timeout:
+            return await asyncio.wait_for(response, timeout)
+        return await response
+
+    async def _get_connection(self, scheme, host, port, connect_timeout=None):
+        pool = self._pools.setdefault((scheme, host, port), [])
+        # Drop the connections that failed to open or were closed
+        pool[:] = [
+            connection_task for connection_task in pool
+            if not connection_task.done() or (
+                not connection_task.cancelled() and
+                connection_task.exception() is None and
+                not connection_task.result().closed
+            )
+        ]
+
+        connections = [connection_task.result() for connection_task in pool if connection_task.done()]
+        available = [connection for connection in connections if connection.has_capacity]
+        if available:
+            return min(available, key=lambda connection: connection.open_streams)
+
+        if len(pool) < self.connections_per_host:
+            connection_task = asyncio.ensure_future(HTTP2Connection.open(
+                host,
+                port,
+                ssl_context=self.ssl_context if scheme == 'https' else None,
+                max_streams=self.max_streams_per_connection,
+            ))
+            pool.append(connection_task)
+        elif connections:
+            # Every connection is busy, queue on the least loaded one
+            return min(connections, key=lambda connection: connection.open_streams)
+        else:
+            connection_task = pool[0]
+
+        return await asyncio.wait_for(asyncio.shield(connection_task), connect_timeout)
+
+    def __repr__(self):
+        return '{0}(connections_per_host={1})'.format(type(self).__name__, self.connections_per_host)
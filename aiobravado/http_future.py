@@ -1,19 +1,39 @@
 # -*- coding: utf-8 -*-
+import asyncio
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from functools import wraps
 
 import six
+from aiohttp import ClientConnectionError
 from bravado_core.content_type import APP_JSON
 from bravado_core.content_type import APP_MSGPACK
 from bravado_core.exception import MatchingResponseNotFound
+from bravado_core.exception import SwaggerMappingError
 from bravado_core.response import get_response_spec
-from bravado_core.unmarshal import unmarshal_schema_object
-from bravado_core.validate import validate_schema_object
 from msgpack import unpackb
 
+from aiobravado.compact_model import compile_unmarshaller
+from aiobravado.compat import json_loads_bytes
 from aiobravado.config_defaults import REQUEST_OPTIONS_DEFAULTS
+from aiobravado.exception import BravadoConnectionError
 from aiobravado.exception import BravadoTimeoutError
+from aiobravado.exception import HTTPError
 from aiobravado.exception import make_http_exception
+from aiobravado.instrumentation import get_instrumentation
+from aiobravado.instrumentation import measure
+from aiobravado.instrumentation import measure_async
+from aiobravado.json_stream import JSONArrayStreamParser
+from aiobravado.validate import validate_schema_object
+
+# Return the decoded response body, without validating or unmarshalling it
+RESULT_MODE_RAW = 'raw'
+# Unmarshal the response body into plain dicts, with formats converted
+RESULT_MODE_DICTS = 'dicts'
+# Unmarshal the response body into models (the default)
+RESULT_MODE_MODELS = 'models'
+RESULT_MODES = (RESULT_MODE_RAW, RESULT_MODE_DICTS, RESULT_MODE_MODELS)
 
 
 class FutureAdapter(object):
@@ -40,34 +60,85 @@ class FutureAdapter(object):
             "FutureAdapter must implement 'result' method"
         )
 
+    def cancel(self):
+        """
+        Must implement a cancel method which cancels the request.
+        """
+        raise NotImplementedError(
+            "FutureAdapter must implement 'cancel' method"
+        )
+
+
+def _get_error_type(future, attribute, adapter_errors, bravado_error):
+    """Return the type of the errors raised in place of the ``adapter_errors``
+    of a future adapter, generated once per adapter type. The type derives
+    from both, so that the errors can be caught either way.
+    """
+    future_type = type(future)
+    # Not inherited, subclasses may declare other errors
+    error_type = vars(future_type).get(attribute)
+    if error_type is None:
+        bases = []
+        for adapter_error in adapter_errors:
+            # Skip the errors the bravado error already derives from (e.g.
+            # TimeoutError), they would make the MRO inconsistent
+            if adapter_error not in bases and not issubclass(bravado_error, adapter_error):
+                bases.append(adapter_error)
+        error_type = type(
+            '{0}{1}'.format(future_type.__name__, bravado_error.__name__[len('Bravado'):]),
+            tuple(bases + [bravado_error]),
+            dict(),
+        )
+        setattr(future_type, attribute, error_type)
+    return error_type
+
+
+def convert_error(future, exception):
+    """Return the bravado error to raise in place of a timeout or connection
+    error of the http client, or None when the exception is raised as it is.
+
+    Besides the ``timeout_errors`` and ``connection_errors`` declared by the
+    future adapter, asyncio and aiohttp timeouts are turned into
+    :class:`BravadoTimeoutError` and aiohttp connection errors into
+    :class:`BravadoConnectionError`.
+
+    :type future: :class:`FutureAdapter`
+    :type exception: Exception
+    :rtype: Exception or None
+    """
+    # HTTPError is an IOError, it is never a connection error
+    if isinstance(exception, (BravadoTimeoutError, BravadoConnectionError, HTTPError)):
+        return None
+
+    # Checked first, some timeouts (e.g. aiohttp.ServerTimeoutError) are
+    # connection errors too
+    timeout_errors = tuple(getattr(future, 'timeout_errors', None) or ()) + (asyncio.TimeoutError,)
+    if isinstance(exception, timeout_errors):
+        error_type = _get_error_type(future, '__timeout_error_type', timeout_errors, BravadoTimeoutError)
+        return error_type(*exception.args)
+
+    connection_errors = tuple(getattr(future, 'connection_errors', None) or ()) + (ClientConnectionError,)
+    if isinstance(exception, connection_errors):
+        error_type = _get_error_type(future, '__connection_error_type', connection_errors, BravadoConnectionError)
+        return error_type(*exception.args)
+
+    return None
+
 
 def reraise_errors(func):
+    """Decorate a coroutine method of an object with a ``future`` adapter so
+    that it raises bravado errors in place of the timeout and connection
+    errors of the http client, see :func:`convert_error`.
+    """
     @wraps(func)
-    def wrapper(self, *args, **kwargs):
-        timeout_errors = tuple(getattr(self.future, 'timeout_errors', None) or ())
-
-        # Make sure that timeout error type for a specific future adapter is generated only once
-        if timeout_errors and getattr(self.future, '__timeout_error_type', None) is None:
-            setattr(
-                self.future, '__timeout_error_type',
-                type(
-                    '{}Timeout'.format(self.future.__class__.__name__),
-                    tuple(list(timeout_errors) + [BravadoTimeoutError]),
-                    dict(),
-                ),
-            )
-
-        if timeout_errors:
-            try:
-                return func(self, *args, **kwargs)
-            except timeout_errors as exception:
-                six.reraise(
-                    self.future.__timeout_error_type,
-                    self.future.__timeout_error_type(*exception.args),
-                    sys.exc_info()[2],
-                )
-        else:
-            return func(self, *args, **kwargs)
+    async def wrapper(self, *args, **kwargs):
+        try:
+            return await func(self, *args, **kwargs)
+        except Exception as exception:
+            error = convert_error(self.future, exception)
+            if error is None:
+                raise
+            six.reraise(type(error), error, sys.exc_info()[2])
 
     return wrapper
 
@@ -91,17 +162,20 @@ class HttpFuture():
         accessible from the swagger result. e.g. http headers,
         http response code, etc.
         Defaults to False for backwards compatibility.
+    :param result_mode: one of :data:`RESULT_MODES`, what the response body
+        is turned into. Defaults to models.
     """
 
     def __init__(self, future, response_adapter, operation=None,
-                 response_callbacks=None, also_return_response=False):
+                 response_callbacks=None, also_return_response=False,
+                 result_mode=RESULT_MODE_MODELS):
         self.future = future
         self.response_adapter = response_adapter
         self.operation = operation
         self.response_callbacks = response_callbacks or REQUEST_OPTIONS_DEFAULTS['response_callbacks']
         self.also_return_response = also_return_response
+        self.result_mode = result_mode
 
-    @reraise_errors
     async def result(self, timeout=None):
         """Blocking call to wait for the HTTP response.
 
@@ -111,14 +185,39 @@ class HttpFuture():
         :return: Depends on the value of also_return_response sent in
             to the constructor.
         """
-        inner_response = await self.future.result(timeout=timeout)
-        incoming_response = self.response_adapter(inner_response)
+        incoming_response = await self.response(timeout=timeout)
+        return await self.make_result(incoming_response)
+
+    @reraise_errors
+    async def response(self, timeout=None):
+        """Wait for the HTTP response, without validating or unmarshalling it.
+
+        :param timeout: Number of seconds to wait for a response. Defaults to
+            None which means wait indefinitely.
+        :type timeout: float
+        :rtype: :class:`bravado_core.response.IncomingResponse`
+        """
+        inner_response = await measure_async(
+            get_instrumentation(self.operation),
+            'network',
+            self.operation,
+            self.future.result(timeout=timeout),
+        )
+        return self.response_adapter(inner_response)
 
+    @reraise_errors
+    async def make_result(self, incoming_response):
+        """Turn the HTTP response into the return value of :meth:`result`.
+
+        :type incoming_response: :class:`bravado_core.response.IncomingResponse`
+        :raises: HTTPError on non-2XX responses.
+        """
         if self.operation is not None:
             await unmarshal_response(
                 incoming_response,
                 self.operation,
-                self.response_callbacks)
+                self.response_callbacks,
+                self.result_mode)
 
             swagger_result = incoming_response.swagger_result
             if self.also_return_response:
@@ -130,8 +229,275 @@ class HttpFuture():
 
         raise make_http_exception(response=incoming_response)
 
+    def stream(self, timeout=None):
+        """Iterate over the items of an array response as they are received.
+
+        The top-level JSON array of the response body is parsed incrementally
+        and every item is validated and unmarshalled on its own, so the whole
+        body is never held in memory at once.
+
+        .. code-block:: python
+
+            async for pet in client.pet.findPetsByStatus(status=['sold']).stream():
+                print(pet.name)
+
+        Responses that can not be streamed (non-2XX status codes, non-JSON
+        content types, schemas other than arrays) go through the regular
+        unmarshalling, raising the same errors as :meth:`result`.
+
+        :param timeout: Number of seconds to wait for the response headers.
+            Defaults to None which means wait indefinitely.
+        :type timeout: float
+        :rtype: :class:`StreamedResult`
+        """
+        return StreamedResult(self, timeout=timeout)
+
+    def cancel(self):
+        """Cancel the request, the pending :meth:`result` raises
+        :class:`asyncio.CancelledError`.
+        """
+        return self.future.cancel()
+
+
+class FutureWrapper(object):
+    """Base class of the futures adding a behaviour to service calls
+    (concurrency limits, circuit breaking, retries, response caching,
+    coalescing), which support the interface of :class:`HttpFuture`.
+
+    The request is sent with :meth:`send` once the response is awaited, and
+    possibly more than once (e.g. retries). Subclasses implement
+    :meth:`response` and set ``http_future`` to the future whose response it
+    returns.
+
+    Responses can not be streamed through wrappers: they act on whole
+    responses, which they retry, cache or share between callers.
+
+    :param make_request: callable sending the request and returning its
+        :class:`HttpFuture`, or the future of another wrapper
+    :type operation: :class:`bravado_core.operation.Operation`
+    """
+
+    #: Behaviour of the wrapper, for error messages
+    behaviour = None
+
+    def __init__(self, make_request, operation=None):
+        self.make_request = make_request
+        self.operation = operation
+        self.http_future = None
+        self._cancelled = False
+        self._sent = []
+
+    @property
+    def future(self):
+        """Future adapter of the last request sent, or None."""
+        return self._sent[-1].future if self._sent else None
+
+    async def result(self, timeout=None):
+        incoming_response = await self.response(timeout=timeout)
+        return await self.make_result(incoming_response)
+
+    async def response(self, timeout=None):
+        raise NotImplementedError(
+            "{0} must implement 'response' method".format(type(self).__name__)
+        )
+
+    async def make_result(self, incoming_response):
+        return await self.http_future.make_result(incoming_response)
+
+    def send(self):
+        """Send the request with ``make_request``.
+
+        :rtype: :class:`HttpFuture`
+        :raises: asyncio.CancelledError once the call was cancelled.
+        """
+        if self._cancelled:
+            raise asyncio.CancelledError()
+        http_future = self.make_request()
+        self._sent.append(http_future)
+        return http_future
+
+    def cancel(self):
+        """Cancel the requests in flight and keep new ones (e.g. retries)
+        from being sent, the pending :meth:`result` raises
+        :class:`asyncio.CancelledError`.
+        """
+        self._cancelled = True
+        for http_future in self._sent:
+            http_future.cancel()
+
+    def stream(self, timeout=None):
+        """
+        :raises: ValueError, responses can not be streamed through wrappers.
+        """
+        raise ValueError(
+            'Responses of calls with {0} can not be streamed'.format(self.behaviour or type(self).__name__))
+
+
+def with_result_mode(make_request, result_mode):
+    """Send a request with ``make_request`` and set the result mode of the
+    :class:`HttpFuture` it returns.
+
+    Http clients create their futures with the default result mode, this is
+    how per-request result modes reach them.
+
+    :param make_request: callable sending the request and returning its
+        :class:`HttpFuture`
+    :param result_mode: one of :data:`RESULT_MODES`
+    :rtype: :class:`HttpFuture`
+    """
+    http_future = make_request()
+    http_future.result_mode = result_mode
+    return http_future
+
+
+def check_result_mode(result_mode):
+    """
+    :raises: ValueError when result_mode is not one of :data:`RESULT_MODES`
+    """
+    if result_mode not in RESULT_MODES:
+        raise ValueError('Unknown result mode {0}, expected one of {1}'.format(result_mode, RESULT_MODES))
+
+
+def get_body_reader(inner_response):
+    """Return a coroutine function reading the next available chunk of the
+    response body (b'' at the end), or None if the http client does not
+    expose the body as a stream.
+
+    aiohttp based clients expose it as a StreamReader in ``content``,
+    possibly wrapped together with the remaining timeout.
+    """
+    inner_response = getattr(inner_response, 'response', inner_response)
+    return getattr(getattr(inner_response, 'content', None), 'readany', None)
+
+
+class StreamedResult(object):
+    """Async iterator over the unmarshalled items of an array response,
+    returned by :meth:`HttpFuture.stream`.
 
-async def unmarshal_response(incoming_response, operation, response_callbacks=None):
+    Array level constraints (e.g. ``maxItems``) are not validated, since the
+    array is never materialized. Response callbacks are run once the whole
+    body has been consumed, with ``swagger_result`` set to None.
+
+    :type http_future: :class:`HttpFuture`
+    :param timeout: Number of seconds to wait for the response headers.
+    """
+
+    def __init__(self, http_future, timeout=None):
+        self.http_future = http_future
+        self.timeout = timeout
+        self.incoming_response = None
+        self._items = None
+        self._read_chunk = None
+        self._parser = None
+        self._unmarshal_item = None
+        self._validate_item = None
+
+    @property
+    def future(self):
+        """Future adapter of the call, see :func:`reraise_errors`."""
+        return self.http_future.future
+
+    def __aiter__(self):
+        return self
+
+    @reraise_errors
+    async def __anext__(self):
+        if self._items is None:
+            await self._start()
+
+        while not self._items:
+            if self._parser is None:
+                raise StopAsyncIteration
+            await self._read_items()
+
+        return self._items.pop()
+
+    async def _start(self):
+        http_future = self.http_future
+        operation = http_future.operation
+        if operation is None:
+            raise ValueError('Only service calls can be streamed')
+
+        inner_response = await http_future.future.result(timeout=self.timeout)
+        self.incoming_response = http_future.response_adapter(inner_response)
+
+        item_spec = self._get_item_spec(operation)
+        result_mode = http_future.result_mode
+        if item_spec is None:
+            await unmarshal_response(
+                self.incoming_response,
+                operation,
+                http_future.response_callbacks,
+                result_mode)
+            result = self.incoming_response.swagger_result
+            if not isinstance(result, list):
+                raise SwaggerMappingError(
+                    '{0} did not return an array'.format(operation.operation_id))
+            self._items = result[::-1]
+            return
+
+        swagger_spec = operation.swagger_spec
+        self._unmarshal_item = make_unmarshal_function(swagger_spec, item_spec, result_mode)
+        if result_mode != RESULT_MODE_RAW and swagger_spec.config.get('validate_responses', False):
+            self._validate_item = partial(validate_schema_object, swagger_spec, item_spec)
+        self._parser = JSONArrayStreamParser()
+        self._read_chunk = get_body_reader(inner_response)
+        self._items = []
+
+    def _get_item_spec(self, operation):
+        """Return the schema of the array items, or None when the response
+        can not be streamed.
+        """
+        incoming_response = self.incoming_response
+        if not 200 <= incoming_response.status_code < 300:
+            return None
+        content_type = incoming_response.headers.get('content-type', '').lower()
+        if not content_type.startswith(APP_JSON) or not is_utf8_content_type(content_type):
+            return None
+        try:
+            plan = get_unmarshal_plan(operation, incoming_response.status_code)
+        except MatchingResponseNotFound:
+            return None
+        deref = operation.swagger_spec.deref
+        if not plan.has_schema or deref(plan.content_spec).get('type') != 'array':
+            return None
+        return deref(plan.content_spec.get('items', {}))
+
+    async def _read_items(self):
+        if self._read_chunk is None:
+            # The whole body is read at once but still parsed and unmarshalled
+            # one item at a time
+            chunk = await self.incoming_response.raw_bytes
+            self._read_chunk = _read_nothing
+        else:
+            chunk = await self._read_chunk()
+
+        if chunk:
+            items = self._parser.feed(chunk)
+        else:
+            try:
+                items = self._parser.close()
+            finally:
+                self._parser = None
+                self._run_response_callbacks()
+
+        if self._validate_item is not None:
+            for item in items:
+                self._validate_item(item)
+        self._items = [self._unmarshal_item(item) for item in reversed(items)]
+
+    def _run_response_callbacks(self):
+        self.incoming_response.swagger_result = None
+        for response_callback in self.http_future.response_callbacks:
+            response_callback(self.incoming_response, self.http_future.operation)
+
+
+async def _read_nothing():
+    return b''
+
+
+async def unmarshal_response(incoming_response, operation, response_callbacks=None,
+                             result_mode=RESULT_MODE_MODELS):
     """So the http_client is finished with its part of processing the response.
     This hands the response over to bravado_core for validation and
     unmarshalling and then runs any response callbacks. On success, the
@@ -140,6 +506,7 @@ async def unmarshal_response(incoming_response, operation, response_callbacks=No
     :type operation: :class:`bravado_core.operation.Operation`
     :type response_callbacks: list of callable. See
         bravado_core.client.REQUEST_OPTIONS_DEFAULTS.
+    :param result_mode: one of :data:`RESULT_MODES`
     :raises: HTTPError
         - On 5XX status code, the HTTPError has minimal information.
         - On non-2XX status code with no matching response, the HTTPError
@@ -154,6 +521,7 @@ async def unmarshal_response(incoming_response, operation, response_callbacks=No
         incoming_response.swagger_result = await unmarshal_response_inner(
             response=incoming_response,
             op=operation,
+            result_mode=result_mode,
         )
     except MatchingResponseNotFound as e:
         exception = make_http_exception(
@@ -172,38 +540,237 @@ async def unmarshal_response(incoming_response, operation, response_callbacks=No
     raise_on_expected(incoming_response)
 
 
-async def unmarshal_response_inner(response, op):
+def make_unmarshal_function(swagger_spec, schema, result_mode=RESULT_MODE_MODELS):
+    """Build the function unmarshalling values of a schema in a result mode.
+
+    :type swagger_spec: :class:`bravado_core.spec.Spec`
+    :param schema: schema of the values
+    :param result_mode: one of :data:`RESULT_MODES`
+    :rtype: callable
+    """
+    if result_mode == RESULT_MODE_RAW:
+        return _identity
+    if result_mode == RESULT_MODE_DICTS:
+        return compile_unmarshaller(swagger_spec, schema, use_models=False)
+    if swagger_spec.config.get('compact_models', False):
+        return compile_unmarshaller(swagger_spec, schema)
+    return compile_unmarshaller(
+        swagger_spec, schema, use_models=swagger_spec.config['use_models'], compact_models=False)
+
+
+def _identity(value):
+    return value
+
+
+class UnmarshalPlan(object):
+    """Everything :func:`unmarshal_response_inner` derives from the spec to
+    unmarshal the responses of an operation with a given status code.
+
+    :type op: :class:`bravado_core.operation.Operation`
+    :param response_spec: response specification matching the status code
+    :type response_spec: dict
+    """
+
+    def __init__(self, op, response_spec):
+        self.swagger_spec = op.swagger_spec
+        self.has_schema = 'schema' in response_spec
+        self.content_spec = None
+        self.unmarshal = None
+        # Unmarshal functions of the other result modes, built on first use
+        self._unmarshal_functions = {}
+        if not self.has_schema:
+            return
+
+        self.content_spec = self.swagger_spec.deref(response_spec['schema'])
+        self.unmarshal = make_unmarshal_function(self.swagger_spec, self.content_spec)
+
+    def get_unmarshal(self, result_mode):
+        """
+        :param result_mode: one of :data:`RESULT_MODES`
+        :return: the function unmarshalling response bodies in that mode
+        :rtype: callable
+        """
+        if result_mode == RESULT_MODE_MODELS:
+            return self.unmarshal
+        try:
+            return self._unmarshal_functions[result_mode]
+        except KeyError:
+            unmarshal_function = self._unmarshal_functions[result_mode] = make_unmarshal_function(
+                self.swagger_spec, self.content_spec, result_mode)
+            return unmarshal_function
+
+
+# Attribute of the operations holding their unmarshal plans, keyed by status
+# code. Plans reference the spec, so they are kept on the operation to go away
+# together with the spec rather than in a global cache keeping it alive.
+UNMARSHAL_PLANS_ATTRIBUTE = '_aiobravado_unmarshal_plans'
+
+
+def get_unmarshal_plan(op, status_code):
+    """Return the cached :class:`UnmarshalPlan` for the given operation and
+    response status code, building it on first use.
+
+    :type op: :class:`bravado_core.operation.Operation`
+    :type status_code: int
+    :rtype: :class:`UnmarshalPlan`
+    :raises: MatchingResponseNotFound when the status_code could not be mapped
+        to a response specification.
+    """
+    plans = vars(op).get(UNMARSHAL_PLANS_ATTRIBUTE)
+    if plans is None:
+        plans = {}
+        setattr(op, UNMARSHAL_PLANS_ATTRIBUTE, plans)
+    try:
+        return plans[status_code]
+    except KeyError:
+        plan = plans[status_code] = UnmarshalPlan(
+            op, get_response_spec(status_code=status_code, op=op))
+        return plan
+
+
+def is_utf8_content_type(content_type):
+    """Check whether a (lowercase) content type header declares a utf-8 body,
+    which is implied for JSON when no charset is given.
+    """
+    _, _, charset = content_type.partition('charset=')
+    return charset.strip('" ') in ('', 'utf-8', 'utf8')
+
+
+async def decode_response(response, content_type, config):
+    """Decode the body of a JSON or msgpack response.
+
+    Decoders can be plugged in through the ``json_decoder`` and
+    ``msgpack_decoder`` config keys. Both take the raw bytes of the body, so
+    a bytes-in decoder (see :data:`aiobravado.compat.json_loads_bytes`) does
+    not need the body to be decoded to text first.
+
+    :type response: :class:`bravado_core.response.IncomingResponse`
+    :param content_type: lowercase content type of the response
+    :param config: config dict of the swagger spec
+    :returns: the decoded body
+    """
+    if content_type.startswith(APP_JSON):
+        json_decoder = config.get('json_decoder')
+        if json_decoder is not None and is_utf8_content_type(content_type):
+            return json_decoder(await response.raw_bytes)
+        return await response.json()
+
+    return get_body_decoder(content_type, config)(await response.raw_bytes)
+
+
+def get_body_decoder(content_type, config):
+    """Return the function decoding the raw bytes of utf-8 JSON or msgpack
+    bodies. JSON bodies are decoded with :data:`aiobravado.compat.json_loads_bytes`
+    unless a ``json_decoder`` is configured.
+
+    :param content_type: lowercase content type of the response
+    :param config: config dict of the swagger spec
+    :rtype: callable
+    """
+    if content_type.startswith(APP_JSON):
+        return config.get('json_decoder') or json_loads_bytes
+    return config.get('msgpack_decoder') or partial(unpackb, raw=False)
+
+
+def should_offload(response, content_type, config):
+    """Check whether the body of a response is large enough to be decoded and
+    unmarshalled in the ``offload_executor`` rather than on the event loop.
+
+    The size of the body is read from its Content-Length header, so bodies
+    of unknown size are never offloaded.
+
+    :type response: :class:`bravado_core.response.IncomingResponse`
+    :param content_type: lowercase content type of the response
+    :param config: config dict of the swagger spec
+    :rtype: bool
+    """
+    threshold = config.get('offload_threshold')
+    if threshold is None:
+        return False
+    if content_type.startswith(APP_JSON) and not is_utf8_content_type(content_type):
+        return False
+    try:
+        return int(response.headers.get('content-length')) >= threshold
+    except (TypeError, ValueError):
+        return False
+
+
+def run_in_offload_executor(config, func, *args):
+    """Run ``func(*args)`` in the ``offload_executor``, the default executor
+    of the event loop when it is None.
+
+    :param config: config dict of the swagger spec
+    :return: awaitable of the return value of func
+    """
+    return asyncio.get_event_loop().run_in_executor(config.get('offload_executor'), func, *args)
+
+
+async def decode_response_in_executor(response, content_type, config):
+    """Like :func:`decode_response`, decoding the body in the
+    ``offload_executor``. JSON bodies of response adapters without
+    ``raw_bytes`` are decoded by the adapter, on the event loop.
+    """
+    try:
+        reading = response.raw_bytes
+    except NotImplementedError:
+        if not content_type.startswith(APP_JSON):
+            raise
+        return await response.json()
+    body = await reading
+    return await run_in_offload_executor(config, get_body_decoder(content_type, config), body)
+
+
+async def unmarshal_response_inner(response, op, result_mode=RESULT_MODE_MODELS):
     """
     Unmarshal incoming http response into a value based on the
     response specification.
     :type response: :class:`bravado_core.response.IncomingResponse`
     :type op: :class:`bravado_core.operation.Operation`
+    :param result_mode: one of :data:`RESULT_MODES`. In raw mode, the decoded
+        body is returned without being validated.
     :returns: value where type(value) matches response_spec['schema']['type']
         if it exists, None otherwise.
     """
-    deref = op.swagger_spec.deref
-    response_spec = get_response_spec(status_code=response.status_code, op=op)
+    plan = get_unmarshal_plan(op, response.status_code)
 
-    if 'schema' not in response_spec:
+    if not plan.has_schema:
         return None
 
     content_type = response.headers.get('content-type', '').lower()
 
     if content_type.startswith(APP_JSON) or content_type.startswith(APP_MSGPACK):
-        content_spec = deref(response_spec['schema'])
-        if content_type.startswith(APP_JSON):
-            content_value = await response.json()
+        config = op.swagger_spec.config
+        instrumentation = config.get('instrumentation')
+        offload = should_offload(response, content_type, config)
+        if offload:
+            decoding = decode_response_in_executor(response, content_type, config)
         else:
-            content_value = unpackb(await response.raw_bytes, encoding='utf-8')
-
-        if op.swagger_spec.config.get('validate_responses', False):
-            validate_schema_object(op.swagger_spec, content_spec, content_value)
-
-        return unmarshal_schema_object(
-            swagger_spec=op.swagger_spec,
-            schema_object_spec=content_spec,
-            value=content_value,
-        )
+            decoding = decode_response(response, content_type, config)
+        content_value = await measure_async(instrumentation, 'decode', op, decoding)
+
+        if result_mode == RESULT_MODE_RAW:
+            return content_value
+
+        # Models can not be sent back from other processes, process pools
+        # only decode bodies
+        offload = offload and not isinstance(config.get('offload_executor'), ProcessPoolExecutor)
+
+        if config.get('validate_responses', False):
+            validate = partial(validate_schema_object, op.swagger_spec, plan.content_spec, content_value)
+            if offload:
+                await measure_async(instrumentation, 'validate', op, run_in_offload_executor(config, validate))
+            else:
+                measure(instrumentation, 'validate', op, validate)
+        else:
+            response_validator = config.get('response_validator')
+            if response_validator is not None:
+                await response_validator.validate(op, plan.content_spec, content_value)
+
+        unmarshal = plan.get_unmarshal(result_mode)
+        if offload:
+            return await measure_async(
+                instrumentation, 'unmarshal', op, run_in_offload_executor(config, unmarshal, content_value))
+        return measure(instrumentation, 'unmarshal', op, unmarshal, content_value)
 
     # TODO: Non-json response contents
     return await response.text
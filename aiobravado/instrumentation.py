@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+Timing of the phases of service calls.
+
+The ``instrumentation`` config key takes an :class:`Instrumentation` whose
+:meth:`Instrumentation.observe` is called once each phase of a call completed:
+
+- ``construct_request``: validating and marshalling the parameters
+- ``network``: sending the request and waiting for the response
+- ``decode``: decoding the JSON or msgpack body
+- ``validate``: validating the body against its schema, when
+  ``validate_responses`` is set
+- ``unmarshal``: unmarshalling the body into python objects
+
+Without instrumentation the phases run as they are, without any clock reads.
+
+.. code-block:: python
+
+    from opentelemetry import trace
+    from prometheus_client import Histogram
+
+    histogram = Histogram('aiobravado_phase_seconds', 'Duration of the phases of calls', ['operation', 'phase'])
+    instrumentation = MultiInstrumentation(
+        SpanInstrumentation(trace.get_tracer('aiobravado')),
+        HistogramInstrumentation(histogram),
+    )
+    client = SwaggerClient.from_spec(spec_dict, config={'instrumentation': instrumentation})
+"""
+import time
+
+PHASES = ('construct_request', 'network', 'decode', 'validate', 'unmarshal')
+
+
+class Instrumentation(object):
+    """Receives the timing of every phase of the service calls."""
+
+    def observe(self, phase, operation, start, duration, error=None):
+        """Called once a phase completed.
+
+        :param phase: one of :data:`PHASES`
+        :type operation: :class:`bravado_core.operation.Operation`
+        :param start: time the phase started at, in seconds since the epoch
+        :param duration: number of seconds the phase took
+        :param error: exception raised by the phase, if any
+        """
+        raise NotImplementedError
+
+
+class MultiInstrumentation(Instrumentation):
+    """Forwards the timings to several instrumentations."""
+
+    def __init__(self, *instrumentations):
+        self.instrumentations = instrumentations
+
+    def observe(self, phase, operation, start, duration, error=None):
+        for instrumentation in self.instrumentations:
+            instrumentation.observe(phase, operation, start, duration, error)
+
+
+class SpanInstrumentation(Instrumentation):
+    """Records every phase as an OpenTelemetry-style span named
+    ``aiobravado.<phase>``.
+
+    :param tracer: tracer with a ``start_span(name, start_time, attributes)``
+        method, e.g. ``opentelemetry.trace.get_tracer(__name__)``
+    """
+
+    def __init__(self, tracer):
+        self.tracer = tracer
+
+    def observe(self, phase, operation, start, duration, error=None):
+        span = self.tracer.start_span(
+            'aiobravado.' + phase,
+            start_time=int(start * 1e9),
+            attributes={'aiobravado.operation_id': operation.operation_id},
+        )
+        if error is not None:
+            span.record_exception(error)
+        span.end(end_time=int((start + duration) * 1e9))
+
+
+class HistogramInstrumentation(Instrumentation):
+    """Observes the duration of every phase in a Prometheus-style histogram.
+
+    :param histogram: histogram with ``operation`` and ``phase`` labels, e.g.
+        a ``prometheus_client.Histogram``
+    """
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def observe(self, phase, operation, start, duration, error=None):
+        self.histogram.labels(operation=operation.operation_id, phase=phase).observe(duration)
+
+
+def get_instrumentation(operation):
+    """
+    :param operation: :class:`bravado_core.operation.Operation` of a service
+        call, None for other requests (e.g. fetching the spec)
+    :return: the configured :class:`Instrumentation`, or None
+    """
+    swagger_spec = getattr(operation, 'swagger_spec', None)
+    if swagger_spec is None:
+        return None
+    return swagger_spec.config.get('instrumentation')
+
+
+def measure(instrumentation, phase, operation, func, *args):
+    """Call ``func`` with ``args`` and report how long it took.
+
+    :type instrumentation: :class:`Instrumentation` or None
+    :return: the return value of ``func``
+    """
+    if instrumentation is None:
+        return func(*args)
+
+    start = time.time()
+    counter = time.perf_counter()
+    try:
+        result = func(*args)
+    except Exception as e:
+        instrumentation.observe(phase, operation, start, time.perf_counter() - counter, e)
+        raise
+    instrumentation.observe(phase, operation, start, time.perf_counter() - counter)
+    return result
+
+
+def measure_async(instrumentation, phase, operation, awaitable):
+    """Wrap ``awaitable`` to report how long awaiting it took.
+
+    :type instrumentation: :class:`Instrumentation` or None
+    :return: ``awaitable`` itself without instrumentation, otherwise an
+        awaitable with the same result
+    """
+    if instrumentation is None:
+        return awaitable
+    return _measure_async(instrumentation, phase, operation, awaitable)
+
+
+async def _measure_async(instrumentation, phase, operation, awaitable):
+    start = time.time()
+    counter = time.perf_counter()
+    try:
+        result = await awaitable
+    except Exception as e:
+        instrumentation.observe(phase, operation, start, time.perf_counter() - counter, e)
+        raise
+    instrumentation.observe(phase, operation, start, time.perf_counter() - counter)
+    return result
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""
+Incremental parsing of JSON documents whose top-level value is an array, so
+that the items of a large response body can be handled while the rest of the
+body is still being received.
+"""
+import codecs
+
+from aiobravado.compat import json
+
+
+WHITESPACE = ' \t\n\r'
+ITEM_TERMINATORS = WHITESPACE + ',]'
+
+
+class JSONArrayStreamParser(object):
+    """Parse a top-level JSON array fed in chunks of utf-8 encoded bytes.
+
+    Usage::
+
+        parser = JSONArrayStreamParser()
+        for chunk in chunks:
+            for item in parser.feed(chunk):
+                ...
+        for item in parser.close():
+            ...
+
+    Only the not yet parsed tail of the body is kept in memory.
+
+    :raises: ValueError when the body is not a JSON array.
+    """
+
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self._buffer = u''
+        self._started = False
+        self._finished = False
+        self._expect_value = True
+        self._is_first_item = True
+
+    def feed(self, chunk):
+        """Feed the next chunk of the body.
+
+        :type chunk: bytes
+        :return: list of the items completed by this chunk
+        """
+        self._buffer += self._text_decoder.decode(chunk)
+        return self._parse(final=False)
+
+    def close(self):
+        """Signal the end of the body.
+
+        :return: list of the remaining items
+        :raises: ValueError if the array is incomplete.
+        """
+        self._buffer += self._text_decoder.decode(b'', final=True)
+        items = self._parse(final=True)
+        if not self._finished:
+            raise ValueError('Incomplete JSON array')
+        return items
+
+    def _parse(self, final):
+        items = []
+        buffer = self._buffer
+        buffer_length = len(buffer)
+        position = 0
+        while True:
+            while position < buffer_length and buffer[position] in WHITESPACE:
+                position += 1
+            if position >= buffer_length:
+                break
+
+            if self._finished:
+                raise ValueError('Extra data after the JSON array at position {0}'.format(position))
+
+            if not self._started:
+                if buffer[position] != '[':
+                    raise ValueError('Expected a JSON array')
+                self._started = True
+                position += 1
+                continue
+
+            if not self._expect_value:
+                if buffer[position] == ',':
+                    self._expect_value = True
+                    position += 1
+                elif buffer[position] == ']':
+                    self._finished = True
+                    position += 1
+                else:
+                    raise ValueError("Expected ',' or ']' in the JSON array")
+                continue
+
+            if self._is_first_item and buffer[position] == ']':
+                self._finished = True
+                position += 1
+                continue
+
+            try:
+                item, end = self._decoder.raw_decode(buffer, position)
+            except ValueError:
+                if final:
+                    raise
+                break  # wait for the rest of the item
+
+            # A number might continue in the next chunk (e.g. "-1" of "-1.5e3"),
+            # so only accept items followed by a terminator
+            if not final and (end >= buffer_length or buffer[end] not in ITEM_TERMINATORS):
+                break
+
+            items.append(item)
+            position = end
+            self._expect_value = False
+            self._is_first_item = False
+
+        self._buffer = buffer[position:]
+        return items
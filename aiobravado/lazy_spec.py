@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+Spec building resources, operations and models on first use.
+
+:meth:`bravado_core.spec.Spec.build` walks the whole spec up front: it
+discovers and creates a type for every model, then builds every resource and
+operation. :class:`LazySpec` only indexes the operations when it is built. It
+creates each resource (with its operations) the first time it is looked up, and
+discovers the models with :func:`bravado_core.model.model_discovery` the first
+time a resource or a model is looked up. This keeps start up time and memory low
+for clients of large specs that only use a few of their operations.
+
+Enabled with the ``lazy_spec`` config key:
+
+.. code-block:: python
+
+    client = SwaggerClient.from_spec(spec_dict, config={'lazy_spec': True})
+
+When ``internally_dereference_refs`` is set, the spec is built eagerly since
+the dereferenced spec is computed from the whole spec anyway.
+"""
+from collections import defaultdict
+from collections.abc import Mapping
+from collections.abc import MutableMapping
+
+from bravado_core.model import model_discovery
+from bravado_core.operation import Operation
+from bravado_core.resource import convert_path_to_resource
+from bravado_core.resource import Resource
+from bravado_core.spec import build_api_serving_url
+from bravado_core.spec import Spec
+from bravado_core.util import AliasKeyDict
+from bravado_core.util import sanitize_name
+from six import iteritems
+
+
+class LazyResources(Mapping):
+    """Resources of a spec, keyed by sanitized tag, built on first access.
+
+    Like the mapping built by bravado-core, resources can also be looked up
+    by their unsanitized tag, and operations with several tags are shared
+    between their resources.
+
+    :type swagger_spec: :class:`bravado_core.spec.Spec`
+    """
+
+    def __init__(self, swagger_spec):
+        self.swagger_spec = swagger_spec
+        self._resources = {}
+        self._operations = {}
+
+        # Operations are grouped by tag like bravado_core.resource.build_resources
+        # does, without being built
+        tag_to_op_specs = defaultdict(list)
+        deref = swagger_spec.deref
+        spec_dict = deref(swagger_spec._internal_spec_dict)
+        for path_name, path_spec in iteritems(deref(spec_dict.get('paths', {}))):
+            for http_method, op_spec in iteritems(deref(path_spec)):
+                op_spec = deref(op_spec)
+                # Vendor extensions and parameters shared by all operations
+                # of the path are not operations
+                if http_method.startswith('x-') or http_method == 'parameters':
+                    continue
+                tags = deref(op_spec.get('tags', [])) or [convert_path_to_resource(path_name)]
+                for tag in tags:
+                    tag_to_op_specs[deref(tag)].append((path_name, http_method, op_spec))
+
+        # sanitized tag -> list of (path name, http method, operation spec)
+        self._operation_specs = AliasKeyDict()
+        for tag, op_specs in iteritems(tag_to_op_specs):
+            sanitized_tag = sanitize_name(tag)
+            self._operation_specs[sanitized_tag] = op_specs
+            self._operation_specs.add_alias(tag, sanitized_tag)
+
+    def __getitem__(self, name):
+        name = self._operation_specs.determine_key(name)
+        try:
+            return self._resources[name]
+        except KeyError:
+            pass
+
+        # Responses are only unmarshalled into models once the schemas of
+        # the models are tagged by the discovery
+        discover_models(self.swagger_spec)
+        operations = {}
+        for path_name, http_method, op_spec in self._operation_specs[name]:
+            operation = self._get_operation(path_name, http_method, op_spec)
+            operations[operation.operation_id] = operation
+        resource = self._resources[name] = Resource(name, operations)
+        return resource
+
+    def __iter__(self):
+        return iter(self._operation_specs)
+
+    def __len__(self):
+        return len(self._operation_specs)
+
+    def __contains__(self, name):
+        return name in self._operation_specs
+
+    def _get_operation(self, path_name, http_method, op_spec):
+        key = (path_name, http_method)
+        try:
+            return self._operations[key]
+        except KeyError:
+            operation = self._operations[key] = Operation.from_spec(
+                self.swagger_spec, path_name, http_method, op_spec)
+            return operation
+
+
+def discover_models(swagger_spec):
+    """Discover the models of a spec built by :class:`LazySpec`, unless it
+    was already done.
+
+    :type swagger_spec: :class:`bravado_core.spec.Spec`
+    """
+    if isinstance(swagger_spec.definitions, LazyDefinitions):
+        swagger_spec.definitions.discover()
+
+
+class LazyDefinitions(MutableMapping):
+    """Model types of a spec, keyed by model name, discovered the first
+    time one is looked up.
+
+    :func:`bravado_core.model.model_discovery` replaces
+    ``swagger_spec.definitions`` with the dict of the model types it finds,
+    in the root document as well as in the documents it references, which
+    this mapping then delegates to. Models are not built one at a time: the
+    schemas of responses are unmarshalled into models once the discovery has
+    tagged them with ``x-model``, which takes a walk of every document anyway.
+
+    :type swagger_spec: :class:`bravado_core.spec.Spec`
+    """
+
+    def __init__(self, swagger_spec):
+        self.swagger_spec = swagger_spec
+        self._models = None
+
+    def discover(self):
+        """
+        :return: dict of model names to model types
+        """
+        if self._models is None:
+            # Collected into swagger_spec.definitions
+            self._models = self.swagger_spec.definitions = {}
+            model_discovery(self.swagger_spec)
+        return self._models
+
+    def __getitem__(self, model_name):
+        return self.discover()[model_name]
+
+    def __setitem__(self, model_name, model_type):
+        self.discover()[model_name] = model_type
+
+    def __delitem__(self, model_name):
+        del self.discover()[model_name]
+
+    def __iter__(self):
+        return iter(self.discover())
+
+    def __len__(self):
+        return len(self.discover())
+
+    def __contains__(self, model_name):
+        return model_name in self.discover()
+
+
+class LazySpec(Spec):
+    """:class:`bravado_core.spec.Spec` whose resources and definitions are
+    :class:`LazyResources` and :class:`LazyDefinitions`.
+    """
+
+    def build(self):
+        if self.config['internally_dereference_refs']:
+            return super(LazySpec, self).build()
+
+        # Same steps as Spec.build, with model discovery and the building of
+        # the resources deferred to their first use. Spec.build calls both as
+        # functions of bravado_core.spec, so it can not be reused for the rest.
+        self._validate_spec()
+
+        for user_defined_format in self.config['formats']:
+            self.register_format(user_defined_format)
+
+        self.definitions = LazyDefinitions(self)
+        self.resources = LazyResources(self)
+
+        self.api_url = build_api_serving_url(
+            spec_dict=self.spec_dict,
+            origin_url=self.origin_url,
+            use_spec_url_for_base_path=self.config['use_spec_url_for_base_path'],
+        )
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""
+Per-operation request builders.
+
+:func:`aiobravado.client.construct_request` interprets the operation on every
+call: it copies the parameter dict, rebuilds the url and walks every parameter
+to find the missing ones. A :class:`RequestBuilder` does that analysis once per
+:class:`bravado_core.operation.Operation` so that building a request only has
+to marshal the values that were actually passed in.
+
+Builders are used by :class:`aiobravado.client.CallableOperation` when the
+``compile_operations`` config key is enabled.
+"""
+from copy import copy
+from functools import partial
+
+from bravado_core.exception import SwaggerMappingError
+from bravado_core.marshal import marshal_schema_object
+from bravado_core.param import get_param_type_spec
+from bravado_core.param import marshal_param
+from six import iteritems
+
+from aiobravado.validate import validate_schema_object
+
+
+def marshals_default(param):
+    """Check whether marshalling the default of a non-required parameter
+    changes the outgoing request.
+
+    bravado-core relies on the server applying parameter defaults, so this is
+    usually False and the parameter can be skipped entirely when it is not
+    supplied.
+
+    :type param: :class:`bravado_core.param.Param`
+    :rtype: bool
+    """
+    scratch_request = {'url': '', 'params': {}, 'headers': {}}
+    marshal_param(param, None, scratch_request)
+    return scratch_request != {'url': '', 'params': {}, 'headers': {}}
+
+
+def unvalidated_spec(swagger_spec):
+    """Return a view of a spec with the same resolver, models and formats
+    whose requests are not validated by :func:`bravado_core.param.marshal_param`.
+
+    :type swagger_spec: :class:`bravado_core.spec.Spec`
+    :rtype: :class:`bravado_core.spec.Spec`
+    """
+    # Attributes are shared, like Spec.__deepcopy__ does with copies of them
+    spec_view = swagger_spec.__class__(spec_dict=None)
+    vars(spec_view).update(vars(swagger_spec))
+    spec_view.config = dict(swagger_spec.config, validate_requests=False)
+    return spec_view
+
+
+class CachedValidatorMarshaller(object):
+    """Marshal the parameters of an operation like
+    :func:`bravado_core.param.marshal_param`, validating them with the cached
+    validators of :mod:`aiobravado.validate`.
+
+    bravado-core places the values with a copy of the parameters that is not
+    validated. It does not return the values it marshals, so they are
+    marshalled a second time to be validated.
+
+    :type operation: :class:`bravado_core.operation.Operation`
+    """
+
+    def __init__(self, operation):
+        swagger_spec = operation.swagger_spec
+        spec_view = unvalidated_spec(swagger_spec)
+        self.params = {}
+        for param in operation.params.values():
+            param_spec = swagger_spec.deref(get_param_type_spec(param))
+            unvalidated_param = copy(param)
+            unvalidated_param.swagger_spec = spec_view
+            self.params[param] = (
+                unvalidated_param,
+                partial(marshal_schema_object, swagger_spec, param_spec),
+                partial(validate_schema_object, swagger_spec, param_spec),
+            )
+
+    def __call__(self, param, value, request):
+        unvalidated_param, marshal, validate = self.params[param]
+        if value is not None or param.required:
+            validate(marshal(value))
+        marshal_param(unvalidated_param, value, request)
+
+
+class RequestBuilder(object):
+    """Precomputed request construction for a single operation.
+
+    The output of :meth:`build` is the same request dict that
+    :func:`aiobravado.client.construct_request` returns.
+
+    :type operation: :class:`bravado_core.operation.Operation`
+    """
+
+    def __init__(self, operation):
+        self.operation = operation
+        self.operation_id = operation.operation_id
+        self.method = str(operation.http_method.upper())
+        self.url = operation.swagger_spec.api_url.rstrip('/') + operation.path_name
+
+        config = operation.swagger_spec.config
+        if config['validate_requests'] and config.get('cache_request_validators', False):
+            self.marshal_param = CachedValidatorMarshaller(operation)
+        else:
+            self.marshal_param = marshal_param
+
+        # Accept both the sanitized parameter names and their aliases
+        params = operation.params
+        self.aliases = dict(getattr(params, 'alias_to_key', {}))
+        self.params_by_name = dict(params)
+        for alias, key in iteritems(self.aliases):
+            self.params_by_name[alias] = params[key]
+
+        # Only parameters that may need work when they are not supplied are
+        # visited after the supplied ones, in the same order as construct_params
+        names_by_key = {key: (key,) for key in params}
+        for alias, key in iteritems(self.aliases):
+            names_by_key[key] += (alias,)
+        self.unsupplied_params = tuple(
+            (names_by_key[key], param)
+            for key, param in iteritems(params)
+            if param.location == 'header' or param.required or (param.has_default() and marshals_default(param))
+        )
+
+    def build(self, request_options, op_kwargs):
+        """Construct the outgoing request dict.
+
+        :param request_options: _request_options passed into the operation
+            invocation.
+        :param op_kwargs: parameter name/value pairs passed to the invocation
+            of the operation.
+        :raises: SwaggerMappingError on extra parameters or when a required
+            parameter is not supplied.
+        :return: request in dict form
+        """
+        request = {
+            'method': self.method,
+            'url': self.url,
+            'params': {},  # filled in below
+            'headers': request_options.get('headers', {}),
+        }
+        # Adds Accept header to request for msgpack response if specified
+        if request_options.get('use_msgpack', False):
+            request['headers']['Accept'] = 'application/msgpack'
+
+        # Copy over optional request options
+        for request_option in ('connect_timeout', 'timeout'):
+            if request_option in request_options:
+                request[request_option] = request_options[request_option]
+
+        if self.aliases:
+            self._check_duplicate_aliases(op_kwargs)
+
+        params_by_name = self.params_by_name
+        marshal = self.marshal_param
+        for param_name, param_value in iteritems(op_kwargs):
+            param = params_by_name.get(param_name)
+            if param is None:
+                raise SwaggerMappingError(
+                    "{0} does not have parameter {1}"
+                    .format(self.operation_id, param_name))
+            marshal(param, param_value, request)
+
+        for param_names, param in self.unsupplied_params:
+            if any(param_name in op_kwargs for param_name in param_names):
+                continue
+            if param.location == 'header' and param.name in request['headers']:
+                marshal(param, request['headers'][param.name], request)
+            elif param.required:
+                raise SwaggerMappingError(
+                    '{0} is a required parameter'.format(param.name))
+            else:
+                marshal(param, None, request)
+
+        return request
+
+    def _check_duplicate_aliases(self, op_kwargs):
+        """Reject a parameter supplied both by name and by alias, like
+        :func:`aiobravado.client.construct_params` does.
+        """
+        for alias, key in iteritems(self.aliases):
+            if alias in op_kwargs and key in op_kwargs:
+                raise SwaggerMappingError(
+                    "{0} does not have parameter {1}"
+                    .format(self.operation_id, key))
@@ -0,0 +1,336 @@
+# -*- coding: utf-8 -*-
+"""
+Client-side cache of the responses of service calls.
+
+Caching is enabled by setting the ``response_cache`` config key to a
+:class:`ResponseCache` backend, for instance the in-memory
+:class:`LRUResponseCache`:
+
+.. code-block:: python
+
+    client = SwaggerClient.from_spec(spec_dict, config={
+        'response_cache': LRUResponseCache(max_size=1000, ttl=300),
+    })
+
+Only GET and HEAD calls are cached, keyed by operation and marshalled request.
+Responses are used without contacting the server for as long as their
+``Cache-Control: max-age`` allows. Once stale, responses with an ``ETag`` or
+``Last-Modified`` header are revalidated with a conditional request, and a
+``304 Not Modified`` response reuses the cached one. ``Cache-Control:
+no-store`` responses are never cached.
+
+The cache holds the raw response bodies, which are unmarshalled again on every
+hit. In the ``result`` cache mode the unmarshalled results are kept as well and
+returned as they are, so they are shared between calls and should be treated as
+read-only.
+"""
+import time
+from collections import OrderedDict
+
+from bravado_core.response import IncomingResponse
+
+from aiobravado.compat import json
+from aiobravado.http_future import FutureWrapper
+from aiobravado.http_future import RESULT_MODE_MODELS
+from aiobravado.http_future import unmarshal_response
+
+# Status codes of the responses that can be cached
+CACHEABLE_STATUS_CODES = frozenset((200, 203))
+
+# Return fresh objects unmarshalled from the cached body on every hit
+CACHE_MODE_BODY = 'body'
+# Return the cached unmarshalled result itself
+CACHE_MODE_RESULT = 'result'
+
+CACHE_MODES = (CACHE_MODE_BODY, CACHE_MODE_RESULT)
+
+
+def get_header(headers, name):
+    """Case insensitive header lookup for plain dicts of headers as well as
+    the case insensitive mappings of http clients.
+    """
+    value = headers.get(name)
+    if value is None:
+        lower_name = name.lower()
+        for header_name, header_value in headers.items():
+            if header_name.lower() == lower_name:
+                return header_value
+    return value
+
+
+def parse_cache_control(value):
+    """Parse a Cache-Control header.
+
+    :param value: value of the header
+    :return: dict of lowercase directive names to their value, or None for
+        directives without a value.
+    """
+    directives = {}
+    for directive in value.split(','):
+        name, _, argument = directive.strip().partition('=')
+        if name:
+            directives[name.lower()] = argument.strip('"') if argument else None
+    return directives
+
+
+def get_freshness_lifetime(headers):
+    """Number of seconds a response can be used without revalidation.
+
+    :param headers: headers of the response
+    :return: the lifetime in seconds, or None if the response must not be
+        stored at all.
+    """
+    directives = parse_cache_control(get_header(headers, 'Cache-Control') or '')
+    if 'no-store' in directives:
+        return None
+    if 'no-cache' in directives:
+        return 0
+    try:
+        return max(0, int(directives['max-age']))
+    except (KeyError, TypeError, ValueError):
+        return 0
+
+
+class CacheEntry(object):
+    """A cached response.
+
+    :param status_code: status code of the response
+    :param reason: reason phrase of the response
+    :param headers: headers of the response
+    :param body: raw bytes of the response body
+    :param fresh_until: unix timestamp until which the response can be used
+        without revalidation
+    """
+
+    def __init__(self, status_code, reason, headers, body, fresh_until=0):
+        self.status_code = status_code
+        self.reason = reason
+        self.headers = headers
+        self.body = body
+        self.fresh_until = fresh_until
+        self.has_result = False
+        self.swagger_result = None
+
+    @property
+    def etag(self):
+        return get_header(self.headers, 'ETag')
+
+    @property
+    def last_modified(self):
+        return get_header(self.headers, 'Last-Modified')
+
+    def is_fresh(self):
+        return time.time() < self.fresh_until
+
+    def conditional_headers(self):
+        """Request headers asking the server to only send the response if it
+        changed since it was cached.
+
+        :rtype: dict
+        """
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+    def refresh(self, headers):
+        """Extend the freshness of the entry after a ``304 Not Modified``
+        response.
+
+        :param headers: headers of the 304 response
+        """
+        lifetime = get_freshness_lifetime(headers)
+        self.fresh_until = time.time() + (lifetime or 0)
+
+
+class CachedResponse(IncomingResponse):
+    """Response replayed from a :class:`CacheEntry`.
+
+    :type entry: :class:`CacheEntry`
+    """
+
+    def __init__(self, entry):
+        self.status_code = entry.status_code
+        self.reason = entry.reason
+        self.headers = entry.headers
+        self._body = entry.body
+
+    @property
+    async def raw_bytes(self):
+        return self._body
+
+    @property
+    async def text(self):
+        return self._body.decode('utf-8')
+
+    async def json(self, **kwargs):
+        return json.loads(self._body.decode('utf-8'), **kwargs)
+
+
+class ResponseCache(object):
+    """Interface of the response cache backends.
+
+    Keys are hashable tuples, values are :class:`CacheEntry` instances.
+    """
+
+    async def get(self, key):
+        """
+        :return: the entry stored with the key, or None.
+        :rtype: :class:`CacheEntry`
+        """
+        raise NotImplementedError("ResponseCache must implement 'get' method")
+
+    async def set(self, key, entry):
+        """
+        :type entry: :class:`CacheEntry`
+        """
+        raise NotImplementedError("ResponseCache must implement 'set' method")
+
+    async def delete(self, key):
+        raise NotImplementedError("ResponseCache must implement 'delete' method")
+
+
+class LRUResponseCache(ResponseCache):
+    """In-memory response cache evicting the least recently used entries.
+
+    :param max_size: maximum number of entries
+    :param ttl: number of seconds after which entries are evicted, even when
+        they could be revalidated. Defaults to None, which means never.
+    """
+
+    def __init__(self, max_size=1024, ttl=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+
+    async def get(self, key):
+        try:
+            stored_at, entry = self._entries[key]
+        except KeyError:
+            return None
+        if self.ttl is not None and time.time() - stored_at >= self.ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    async def set(self, key, entry):
+        self._entries[key] = (time.time(), entry)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def delete(self, key):
+        self._entries.pop(key, None)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class CachedFuture(FutureWrapper):
+    """Future of a service call going through a response cache.
+
+    The cache is looked up when the result is requested, and the request is
+    only sent if there is no fresh cached response. Only :meth:`result` is
+    supported, cached responses are not http responses of the call.
+
+    :type cache: :class:`ResponseCache`
+    :param key: cache key of the request
+    :param make_request: callable sending the request and returning its
+        :class:`aiobravado.http_future.HttpFuture`
+    :param request_params: request dict sent by ``make_request``, updated
+        with the conditional headers when revalidating
+    :type operation: :class:`bravado_core.operation.Operation`
+    :param response_callbacks: See aiobravado.client.REQUEST_OPTIONS_DEFAULTS
+    :param also_return_response: whether the http response is returned too
+    :param result_mode: one of :data:`aiobravado.http_future.RESULT_MODES`
+    :param mode: one of :data:`CACHE_MODES`
+    """
+
+    behaviour = 'response caching'
+
+    def __init__(self, cache, key, make_request, request_params, operation, response_callbacks=None,
+                 also_return_response=False, result_mode=RESULT_MODE_MODELS, mode=CACHE_MODE_BODY):
+        if mode not in CACHE_MODES:
+            raise ValueError('Unknown response cache mode {0}, expected one of {1}'.format(mode, CACHE_MODES))
+        super(CachedFuture, self).__init__(make_request, operation)
+        self.cache = cache
+        self.key = key
+        self.request_params = request_params
+        self.response_callbacks = response_callbacks or []
+        self.also_return_response = also_return_response
+        self.result_mode = result_mode
+        self.mode = mode
+
+    async def result(self, timeout=None):
+        """Return the result of the call, from the cache when possible.
+
+        :param timeout: Number of seconds to wait for a response. Defaults to
+            None which means wait indefinitely.
+        """
+        entry = await self.cache.get(self.key)
+        if entry is not None and entry.is_fresh():
+            return await self._replay(entry)
+
+        if entry is not None:
+            self.request_params['headers'] = dict(self.request_params['headers'], **entry.conditional_headers())
+
+        http_future = self.http_future = self.send()
+        incoming_response = await http_future.response(timeout=timeout)
+
+        if entry is not None and incoming_response.status_code == 304:
+            entry.refresh(incoming_response.headers)
+            await self.cache.set(self.key, entry)
+            return await self._replay(entry)
+
+        result = await http_future.make_result(incoming_response)
+
+        entry = await self._make_entry(incoming_response)
+        if entry is not None:
+            await self.cache.set(self.key, entry)
+        return result
+
+    async def response(self, timeout=None):
+        """
+        :raises: TypeError, results may come from the cache without any http
+            response. Use :meth:`result` with ``also_return_response`` to get
+            the response, which is a :class:`CachedResponse` on cache hits.
+        """
+        raise TypeError('The responses of calls with {0} can only be read through result()'.format(self.behaviour))
+
+    async def _make_entry(self, incoming_response):
+        if incoming_response.status_code not in CACHEABLE_STATUS_CODES:
+            return None
+        lifetime = get_freshness_lifetime(incoming_response.headers)
+        if lifetime is None:
+            return None
+
+        entry = CacheEntry(
+            status_code=incoming_response.status_code,
+            reason=incoming_response.reason,
+            headers=incoming_response.headers,
+            body=await incoming_response.raw_bytes,
+            fresh_until=time.time() + lifetime,
+        )
+        if not lifetime and not entry.etag and not entry.last_modified:
+            # Would never be used
+            return None
+        if self.mode == CACHE_MODE_RESULT:
+            entry.has_result = True
+            entry.swagger_result = incoming_response.swagger_result
+        return entry
+
+    async def _replay(self, entry):
+        response = CachedResponse(entry)
+        if self.mode == CACHE_MODE_RESULT and entry.has_result:
+            response.swagger_result = entry.swagger_result
+            for response_callback in self.response_callbacks:
+                response_callback(response, self.operation)
+        else:
+            await unmarshal_response(response, self.operation, self.response_callbacks, self.result_mode)
+
+        if self.also_return_response:
+            return response.swagger_result, response
+        return response.swagger_result
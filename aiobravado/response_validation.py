@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+Sampled validation of responses.
+
+``validate_responses`` validates every response body against its schema on the
+event loop, which gets slow for large bodies. The ``response_validator`` config
+key takes a :class:`SampledValidator` validating only a fraction of the
+responses of each operation in a thread pool, so that the event loop keeps
+running other calls meanwhile. Mismatches are logged and counted.
+
+.. code-block:: python
+
+    validator = SampledValidator(sample_rate=0.01, sample_rates={'getPetById': 1})
+    client = SwaggerClient.from_spec(spec_dict, config={'response_validator': validator})
+    ...
+    validator.metrics()  # {'getPetById': {'validated': 120, 'failed': 2}}
+
+``validate_responses`` takes precedence: when it is set, every response is
+validated as before. Streamed responses are never sampled.
+"""
+import asyncio
+import logging
+import random
+from functools import partial
+
+from six import iteritems
+
+from aiobravado.validate import validate_schema_object
+
+log = logging.getLogger(__name__)
+
+
+class SampledValidator(object):
+    """Validates a random sample of the response bodies.
+
+    :param sample_rate: fraction of the responses of each operation to
+        validate, between 0 and 1
+    :param sample_rates: dict of operation ids to the sample rate of their
+        responses, overriding ``sample_rate``
+    :param executor: :class:`concurrent.futures.Executor` the validations run
+        in. Defaults to the default executor of the event loop.
+    :param raise_errors: whether calls raise the validation errors of their
+        response, instead of only logging them
+    """
+
+    def __init__(self, sample_rate=0.01, sample_rates=None, executor=None, raise_errors=False):
+        self.sample_rate = sample_rate
+        self.sample_rates = sample_rates or {}
+        self.executor = executor
+        self.raise_errors = raise_errors
+        # operation id -> {'validated': count, 'failed': count}
+        self._counters = {}
+        self._pending = set()
+
+    def should_validate(self, operation):
+        """Draw whether a response of the operation is validated.
+
+        :type operation: :class:`bravado_core.operation.Operation`
+        :rtype: bool
+        """
+        sample_rate = self.sample_rates.get(operation.operation_id, self.sample_rate)
+        return sample_rate >= 1 or (sample_rate > 0 and random.random() < sample_rate)
+
+    async def validate(self, operation, schema, value):
+        """Validate a response body if it is part of the sample.
+
+        The body is validated in the executor before it is unmarshalled and
+        handed out, so the caller can not modify it during the validation and
+        no copy of it is needed.
+
+        :type operation: :class:`bravado_core.operation.Operation`
+        :param schema: schema of the response body
+        :param value: decoded response body
+        :raises: the validation error of the body when ``raise_errors`` is set
+        """
+        if not self.should_validate(operation):
+            return
+
+        future = asyncio.get_event_loop().run_in_executor(
+            self.executor, partial(validate_schema_object, operation.swagger_spec, schema, value))
+        # Tracked until done, even when the call is cancelled meanwhile
+        self._pending.add(future)
+        future.add_done_callback(self._pending.discard)
+        try:
+            await asyncio.shield(future)
+        except Exception as e:
+            self._record(operation, e)
+            if self.raise_errors:
+                raise
+        else:
+            self._record(operation, None)
+
+    async def drain(self):
+        """Wait for the validations in progress, e.g. before shutting down."""
+        while self._pending:
+            await asyncio.wait(list(self._pending))
+
+    def metrics(self):
+        """
+        :return: dict of operation ids to the number of their responses
+            validated, and of those which failed validation
+        """
+        return {operation_id: dict(counters) for operation_id, counters in iteritems(self._counters)}
+
+    def _record(self, operation, error):
+        counters = self._counters.setdefault(operation.operation_id, {'validated': 0, 'failed': 0})
+        counters['validated'] += 1
+        if error is not None:
+            counters['failed'] += 1
+            log.warning(u'Response of %s does not match its schema: %s', operation.operation_id, error)
@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+"""
+Retries and hedged requests for service calls.
+
+A :class:`RetryPolicy` makes a call again, after an exponential backoff with
+jitter, when it fails with one of the ``retry_on`` errors. A
+:class:`HedgePolicy` sends a second, identical request when the first one did
+not complete within a delay (by default the 95th percentile of the latency of
+the operation), uses the first response and cancels the other request.
+
+Both only apply to idempotent HTTP methods by default. They are taken, in order
+of precedence, from the ``retry_policy`` and ``hedge_policy`` request options,
+from the ``x-retry-policy`` and ``x-hedge-policy`` vendor extensions of the
+operation and from the config keys of the same names:
+
+.. code-block:: yaml
+
+    paths:
+      /pet/{petId}:
+        get:
+          x-retry-policy:
+            max_attempts: 3
+            backoff: 0.05
+          x-hedge-policy:
+            quantile: 0.95
+"""
+import asyncio
+import collections
+import math
+import random
+import time
+
+from aiobravado import exception
+from aiobravado.exception import BravadoConnectionError
+from aiobravado.exception import BravadoTimeoutError
+from aiobravado.exception import HTTPError
+from aiobravado.exception import HTTPServiceUnavailable
+from aiobravado.exception import status_map
+from aiobravado.http_future import FutureWrapper
+
+# Methods which can be sent several times with the same effect
+IDEMPOTENT_METHODS = frozenset(('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'))
+
+
+class RetryPolicy(object):
+    """When and how to make a failed call again.
+
+    :param max_attempts: maximum number of attempts, including the first one
+    :param backoff: number of seconds to wait before the first retry, doubled
+        for every further retry
+    :param max_backoff: maximum number of seconds to wait before a retry
+    :param jitter: whether to wait a random duration between 0 and the
+        backoff ("full jitter") instead of the backoff itself
+    :param retry_on: exception classes to retry on. HTTP errors are matched
+        by the status code of the response.
+    :param methods: HTTP methods of the calls to retry
+    """
+
+    def __init__(self, max_attempts=3, backoff=0.1, max_backoff=5, jitter=True,
+                 retry_on=(BravadoTimeoutError, BravadoConnectionError, HTTPServiceUnavailable),
+                 methods=IDEMPOTENT_METHODS):
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.retry_on = tuple(retry_on)
+        self.methods = frozenset(method.upper() for method in methods)
+
+    @classmethod
+    def from_dict(cls, policy_dict):
+        """Build a policy from a vendor extension of the spec, naming the
+        exceptions of :mod:`aiobravado.exception` to retry on.
+
+        :rtype: :class:`RetryPolicy`
+        """
+        policy_dict = dict(policy_dict)
+        if 'retry_on' in policy_dict:
+            policy_dict['retry_on'] = [getattr(exception, name) for name in policy_dict['retry_on']]
+        return cls(**policy_dict)
+
+    def should_retry(self, attempt, error=None, status_code=None):
+        """
+        :param attempt: number of the attempt that just completed, from 1
+        :param error: exception raised by the attempt, if any
+        :param status_code: status code of the response of the attempt
+        :rtype: bool
+        """
+        if attempt >= self.max_attempts:
+            return False
+        if error is not None:
+            return isinstance(error, self.retry_on)
+        return issubclass(status_map.get(status_code, HTTPError), self.retry_on) and status_code >= 300
+
+    def get_delay(self, attempt):
+        """
+        :param attempt: number of the attempt that just failed, from 1
+        :return: number of seconds to wait before the next attempt
+        """
+        delay = min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+        if self.jitter:
+            return random.uniform(0, delay)
+        return delay
+
+
+class LatencyTracker(object):
+    """Latencies of the most recent calls of an operation.
+
+    :param size: number of calls to remember
+    """
+
+    # Number of new samples after which quantiles are computed again
+    RESORT_INTERVAL = 10
+
+    def __init__(self, size=1000):
+        self._latencies = collections.deque(maxlen=size)
+        self._sorted = None
+        self._new_samples = 0
+
+    def __len__(self):
+        return len(self._latencies)
+
+    def record(self, latency):
+        self._latencies.append(latency)
+        self._new_samples += 1
+
+    def quantile(self, quantile):
+        """
+        :param quantile: between 0 and 1, e.g. 0.95 for the 95th percentile
+        :return: the latency in seconds, or None without samples
+        """
+        if not self._latencies:
+            return None
+        if self._sorted is None or self._new_samples >= self.RESORT_INTERVAL:
+            self._sorted = sorted(self._latencies)
+            self._new_samples = 0
+        index = min(len(self._sorted) - 1, int(math.ceil(quantile * len(self._sorted))) - 1)
+        return self._sorted[max(0, index)]
+
+
+class HedgePolicy(object):
+    """When to send a duplicate of a slow call.
+
+    :param delay: number of seconds after which the duplicate is sent. When
+        None, the ``quantile`` of the recent latencies of the operation is
+        used.
+    :param quantile: quantile of the recent latencies used as delay
+    :param min_samples: number of latencies needed before hedging based on
+        the quantile
+    :param methods: HTTP methods of the calls to hedge
+    """
+
+    def __init__(self, delay=None, quantile=0.95, min_samples=20, methods=IDEMPOTENT_METHODS):
+        self.delay = delay
+        self.quantile = quantile
+        self.min_samples = min_samples
+        self.methods = frozenset(method.upper() for method in methods)
+
+    @classmethod
+    def from_dict(cls, policy_dict):
+        """Build a policy from a vendor extension of the spec.
+
+        :rtype: :class:`HedgePolicy`
+        """
+        return cls(**policy_dict)
+
+    def get_delay(self, latency_tracker):
+        """
+        :type latency_tracker: :class:`LatencyTracker`
+        :return: number of seconds to wait before sending a duplicate, or None
+            to not hedge.
+        """
+        if self.delay is not None:
+            return self.delay
+        if len(latency_tracker) < self.min_samples:
+            return None
+        return latency_tracker.quantile(self.quantile)
+
+
+class ResilientFuture(FutureWrapper):
+    """Future of a service call made according to retry and hedge policies.
+
+    :param make_request: callable sending the request and returning its
+        :class:`aiobravado.http_future.HttpFuture`
+    :param method: HTTP method of the call
+    :type retry_policy: :class:`RetryPolicy` or None
+    :type hedge_policy: :class:`HedgePolicy` or None
+    :param latency_tracker: :class:`LatencyTracker` of the operation
+    :type operation: :class:`bravado_core.operation.Operation`
+    """
+
+    behaviour = 'retry or hedge policies'
+
+    def __init__(self, make_request, method, retry_policy=None, hedge_policy=None, latency_tracker=None,
+                 operation=None):
+        super(ResilientFuture, self).__init__(make_request, operation)
+        self.retry_policy = retry_policy if retry_policy is not None and method in retry_policy.methods else None
+        self.hedge_policy = hedge_policy if hedge_policy is not None and method in hedge_policy.methods else None
+        self.latency_tracker = latency_tracker if latency_tracker is not None else LatencyTracker()
+
+    async def response(self, timeout=None):
+        """Wait for the HTTP response of the first successful attempt, or of
+        the last one.
+
+        :param timeout: Number of seconds to wait for the response of each
+            attempt. Defaults to None which means wait indefinitely.
+        """
+        retry_policy = self.retry_policy
+        attempt = 1
+        while True:
+            try:
+                http_future, incoming_response = await self._hedged_attempt(timeout)
+            except Exception as e:
+                if retry_policy is None or not retry_policy.should_retry(attempt, error=e):
+                    raise
+            else:
+                if retry_policy is None or not retry_policy.should_retry(
+                        attempt, status_code=incoming_response.status_code):
+                    self.http_future = http_future
+                    return incoming_response
+
+            await asyncio.sleep(retry_policy.get_delay(attempt))
+            attempt += 1
+
+    async def _attempt(self, timeout):
+        start = time.monotonic()
+        http_future = self.send()
+        incoming_response = await http_future.response(timeout=timeout)
+        self.latency_tracker.record(time.monotonic() - start)
+        return http_future, incoming_response
+
+    async def _hedged_attempt(self, timeout):
+        delay = self.hedge_policy.get_delay(self.latency_tracker) if self.hedge_policy is not None else None
+        if delay is None:
+            return await self._attempt(timeout)
+
+        attempts = [asyncio.ensure_future(self._attempt(timeout))]
+        try:
+            done, _ = await asyncio.wait(attempts, timeout=delay)
+            if not done:
+                attempts.append(asyncio.ensure_future(self._attempt(timeout)))
+
+            while True:
+                done, _ = await asyncio.wait(attempts, return_when=asyncio.FIRST_COMPLETED)
+                for attempt in done:
+                    attempts.remove(attempt)
+                    if attempt.exception() is None or not attempts:
+                        return attempt.result()
+        finally:
+            # Cancel the slower request
+            for attempt in attempts:
+                attempt.cancel()
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""
+On-disk cache of parsed Swagger specs, shared by all the processes of a
+service so that they don't all download and parse the same spec on startup.
+
+.. code-block:: python
+
+    spec_cache = SpecCache('/var/cache/my-service/specs', max_age=60)
+    client = await SwaggerClient.from_url(spec_url, spec_cache=spec_cache)
+
+Entries are keyed by the spec url and remember the ``ETag`` and
+``Last-Modified`` headers of the response they were parsed from. Stale entries
+are revalidated with a conditional GET: a ``304 Not Modified`` response reuses
+the cached spec dict without downloading or parsing it again.
+
+Entries are stored as JSON rather than pickled, so that a cache directory
+writable by other users can not be used to run code in the processes reading
+it. Specs loaded from YAML are normalised first: mapping keys become strings
+and values JSON can not represent, such as dates, are stored as their string.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import os.path
+import tempfile
+import time
+
+from aiobravado.compat import json
+
+log = logging.getLogger(__name__)
+
+
+def to_json_document(value):
+    """Normalise a spec loaded from YAML into a document JSON round-trips:
+    non-string mapping keys are stringified, like
+    :class:`aiobravado.swagger_model.SpecYAMLLoader` does for status codes.
+    Other non-JSON values are left to the ``default`` of :func:`json.dump`.
+
+    :param value: spec dict or any value within it
+    """
+    if isinstance(value, dict):
+        return {
+            key if isinstance(key, str) else str(key): to_json_document(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [to_json_document(item) for item in value]
+    return value
+
+
+class SpecCacheEntry(object):
+    """A parsed spec dict together with the validators of the response it was
+    parsed from.
+
+    :param spec_dict: the parsed spec
+    :param etag: value of the ETag response header, if any
+    :param last_modified: value of the Last-Modified response header, if any
+    :param stored_at: unix timestamp of when the entry was stored
+    """
+
+    def __init__(self, spec_dict, etag=None, last_modified=None, stored_at=None):
+        self.spec_dict = spec_dict
+        self.etag = etag
+        self.last_modified = last_modified
+        self.stored_at = time.time() if stored_at is None else stored_at
+
+    def is_fresh(self, max_age):
+        """Check whether the entry can be used without revalidation.
+
+        :param max_age: number of seconds entries are trusted for, or None
+        :rtype: bool
+        """
+        return max_age is not None and time.time() - self.stored_at < max_age
+
+    def conditional_headers(self):
+        """Request headers asking the server to only send the spec if it
+        changed since this entry was stored.
+
+        :rtype: dict
+        """
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class SpecCache(object):
+    """Cache of parsed specs stored as JSON files in a local directory.
+
+    Files are replaced atomically, so concurrent processes never read partial
+    entries. Disk access happens in the default executor of the event loop.
+
+    :param cache_dir: directory holding the cache files, created if needed
+    :param max_age: number of seconds a cached spec is used without
+        revalidating it with the server. Defaults to None, which means always
+        revalidate.
+    """
+
+    def __init__(self, cache_dir, max_age=None):
+        self.cache_dir = cache_dir
+        self.max_age = max_age
+
+    def get_path(self, spec_url):
+        key = hashlib.sha256(spec_url.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, key + '.json')
+
+    async def get(self, spec_url):
+        """Load the cached entry of a spec url.
+
+        :param spec_url: url of the spec
+        :rtype: :class:`SpecCacheEntry` or None if the spec is not cached or
+            the cache file can not be read.
+        """
+        return await asyncio.get_event_loop().run_in_executor(None, self._read, spec_url)
+
+    async def set(self, spec_url, entry):
+        """Store the entry of a spec url. Failures are logged and ignored, the
+        cache is only an optimization.
+
+        :param spec_url: url of the spec
+        :type entry: :class:`SpecCacheEntry`
+        """
+        await asyncio.get_event_loop().run_in_executor(None, self._write, spec_url, entry)
+
+    def _read(self, spec_url):
+        try:
+            with open(self.get_path(spec_url), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return SpecCacheEntry(
+                data['spec_dict'],
+                etag=data['etag'],
+                last_modified=data['last_modified'],
+                stored_at=data['stored_at'],
+            )
+        except FileNotFoundError:
+            return None
+        except Exception:
+            log.warning(u'Ignoring unreadable spec cache entry for %s', spec_url, exc_info=True)
+            return None
+
+    def _write(self, spec_url, entry):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump({
+                        'spec_dict': to_json_document(entry.spec_dict),
+                        'etag': entry.etag,
+                        'last_modified': entry.last_modified,
+                        'stored_at': entry.stored_at,
+                    }, f, default=str)
+                os.replace(tmp_path, self.get_path(spec_url))
+            except Exception:
+                os.unlink(tmp_path)
+                raise
+        except Exception:
+            log.warning(u'Could not store spec cache entry for %s', spec_url, exc_info=True)
@@ -1,8 +1,10 @@
 # -*- coding: utf-8 -*-
+import asyncio
 import contextlib
 import logging
 import os
 import os.path
+from functools import partial
 
 import yaml
 from bravado_asyncio.definitions import RunMode
@@ -14,17 +16,157 @@ from six.moves import urllib
 from six.moves.urllib import parse as urlparse
 
 from aiobravado.compat import json
+from aiobravado.exception import HTTPError
+from aiobravado.spec_cache import SpecCacheEntry
 
 log = logging.getLogger(__name__)
 
+# Maximum number of documents downloaded at the same time while resolving
+# remote $refs
+REMOTE_REFS_CONCURRENCY = 10
+
+try:
+    # LibYAML parses specs several times faster than pure Python
+    from yaml import CSafeLoader as YAMLSafeLoader
+except ImportError:  # pragma: no cover
+    from yaml import SafeLoader as YAMLSafeLoader
+
+YAML_STR_TAG = u'tag:yaml.org,2002:str'
+YAML_MERGE_TAG = u'tag:yaml.org,2002:merge'
+
+
+def iter_mapping_items(node):
+    """Yield the key and value nodes of a mapping node, including the ones
+    brought in by merge keys (``<<: *anchor``) in place of the merge keys.
+    """
+    if not isinstance(node, yaml.MappingNode):
+        return
+    for key_node, value_node in node.value:
+        if key_node.tag != YAML_MERGE_TAG:
+            yield key_node, value_node
+        elif isinstance(value_node, yaml.SequenceNode):
+            for merged_node in value_node.value:
+                for item in iter_mapping_items(merged_node):
+                    yield item
+        else:
+            for item in iter_mapping_items(value_node):
+                yield item
+
+
+def iter_mapping_values(node):
+    for _, value_node in iter_mapping_items(node):
+        yield value_node
+
+
+def stringify_response_codes(root_node):
+    """Retag the integer status codes of every operation's ``responses`` so
+    that they are constructed as strings, like JSON specs have them.
+
+    :type root_node: :class:`yaml.Node`
+    """
+    for key_node, paths_node in iter_mapping_items(root_node):
+        if key_node.value != 'paths':
+            continue
+        for path_item_node in iter_mapping_values(paths_node):
+            for operation_node in iter_mapping_values(path_item_node):
+                for operation_key_node, responses_node in iter_mapping_items(operation_node):
+                    if operation_key_node.value != 'responses':
+                        continue
+                    # Merge keys are skipped, the codes they bring in are
+                    # stringified instead
+                    for code_node, _ in iter_mapping_items(responses_node):
+                        if isinstance(code_node, yaml.ScalarNode):
+                            code_node.tag = YAML_STR_TAG
+
+
+class SpecYAMLLoader(YAMLSafeLoader):
+    """Safe YAML loader, backed by LibYAML when available, which constructs
+    response status codes as strings.
+    """
+
+    def construct_document(self, node):
+        stringify_response_codes(node)
+        return super(SpecYAMLLoader, self).construct_document(node)
+
 
 def is_file_scheme_uri(url):
     return urlparse.urlparse(url).scheme == u'file'
 
 
+def iter_refs(document):
+    """Yield every dict of a JSON-like document which contains a $ref.
+
+    :param document: dict or list
+    """
+    stack = [document]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            if isinstance(node.get('$ref'), str):
+                yield node
+            stack.extend(itervalues(node))
+        elif isinstance(node, list):
+            stack.extend(node)
+
+
+def resolve_ref(document_url, ref):
+    """Split a $ref found in the document at document_url into the absolute
+    url of the referenced document and the JSON pointer within it.
+
+    :return: tuple of (document url, fragment)
+    """
+    return urlparse.urldefrag(urlparse.urljoin(document_url, ref))
+
+
+def get_remote_document_urls(document, document_url):
+    """Find the urls of the other documents referenced by a document.
+
+    :param document: dict or list
+    :param document_url: url the document was loaded from
+    :rtype: set
+    """
+    document_url = urlparse.urldefrag(document_url)[0]
+    urls = set()
+    for ref_holder in iter_refs(document):
+        target_url, _ = resolve_ref(document_url, ref_holder['$ref'])
+        if target_url != document_url:
+            urls.add(target_url)
+    return urls
+
+
+def preload_remote_documents(swagger_spec, documents):
+    """Make a spec resolve remote $refs to documents which were already
+    loaded, before it is built.
+
+    bravado-core downloads the documents of remote $refs synchronously, from
+    the ref handlers of the spec, which can not wait for aiobravado's http
+    futures. The handlers of the spec return the loaded documents instead, so
+    they stay reachable under their original urls, e.g. for model discovery.
+
+    :type swagger_spec: :class:`bravado_core.spec.Spec`
+    :param documents: dict of url to the documents referenced, directly or
+        not, by the spec
+    """
+    ref_handlers = swagger_spec.get_ref_handlers()
+
+    def make_handler(handler):
+        def handle(uri):
+            try:
+                return documents[urlparse.urldefrag(uri)[0]]
+            except KeyError:
+                return handler(uri)
+        return handle
+
+    ref_handlers = {scheme: make_handler(handler) for scheme, handler in iteritems(ref_handlers)}
+    swagger_spec.get_ref_handlers = lambda: ref_handlers
+
+
 class FileEventual(object):
     """Adaptor which supports the :class:`crochet.EventualResult`
     interface for retrieving api docs from a local file.
+
+    Files are read and parsed in the default executor of the event loop, so
+    that loading large specs does not block other coroutines.
     """
 
     class FileResponse(object):
@@ -38,6 +180,9 @@ class FileEventual(object):
             return self._text
 
         async def json(self):
+            return await asyncio.get_event_loop().run_in_executor(None, self._load_json)
+
+        def _load_json(self):
             return json.loads(self._text.decode('utf-8'))
 
     def __init__(self, path):
@@ -55,7 +200,7 @@ class FileEventual(object):
             return self.FileResponse(content)
 
     async def result(self, *args, **kwargs):
-        return self.wait(*args, **kwargs)
+        return await asyncio.get_event_loop().run_in_executor(None, partial(self.wait, *args, **kwargs))
 
     def cancel(self):
         pass
@@ -86,11 +231,49 @@ class Loader(object):
     :param http_client: HTTP client interface.
     :type  http_client: http_client.HttpClient
     :param request_headers: dict of request headers
+    :param spec_cache: optional cache of parsed specs
+    :type  spec_cache: :class:`aiobravado.spec_cache.SpecCache`
+    :param remote_refs_concurrency: maximum number of documents downloaded
+        at the same time while resolving remote $refs
     """
 
-    def __init__(self, http_client, request_headers=None):
+    def __init__(self, http_client, request_headers=None, spec_cache=None,
+                 remote_refs_concurrency=REMOTE_REFS_CONCURRENCY):
         self.http_client = http_client
         self.request_headers = request_headers or {}
+        self.spec_cache = spec_cache
+        self.remote_refs_concurrency = remote_refs_concurrency
+
+    async def load_remote_documents(self, spec_url, spec_dict):
+        """Load every document referenced, directly or not, by remote $refs
+        of the spec. Each level of references is downloaded concurrently.
+
+        :param spec_url: URL the spec was loaded from
+        :param spec_dict: json spec in dict form
+        :returns: dict of document url to document
+        """
+        spec_url = urlparse.urldefrag(spec_url)[0]
+        semaphore = asyncio.Semaphore(self.remote_refs_concurrency)
+
+        async def load_document(url):
+            async with semaphore:
+                log.debug(u"Loading remote $ref document %s", url)
+                return await self.load_spec(url)
+
+        documents = {}
+        pending_urls = get_remote_document_urls(spec_dict, spec_url)
+        while pending_urls:
+            urls = sorted(pending_urls)
+            loaded_documents = await asyncio.gather(*[load_document(url) for url in urls])
+            documents.update(zip(urls, loaded_documents))
+
+            pending_urls = set()
+            for url, document in zip(urls, loaded_documents):
+                pending_urls.update(get_remote_document_urls(document, url))
+            pending_urls.difference_update(documents)
+            pending_urls.discard(spec_url)
+
+        return documents
 
     async def load_spec(self, spec_url, base_url=None):
         """Load a Swagger Spec from the given URL
@@ -99,15 +282,62 @@ class Loader(object):
         :param base_url: TODO: need this?
         :returns: json spec in dict form
         """
-        response = await request(
-            self.http_client,
-            spec_url,
-            self.request_headers,
-        ).result()
+        if self.spec_cache is None or is_file_scheme_uri(spec_url):
+            response = await request(
+                self.http_client,
+                spec_url,
+                self.request_headers,
+            ).result()
+            return await self.parse_response(spec_url, response)
+
+        return await self.load_cached_spec(spec_url)
+
+    async def load_cached_spec(self, spec_url):
+        """Load a Swagger Spec through the spec cache, revalidating stale
+        entries with a conditional GET.
 
+        :param spec_url: URL to swagger.json
+        :returns: json spec in dict form
+        """
+        entry = await self.spec_cache.get(spec_url)
+        if entry is not None and entry.is_fresh(self.spec_cache.max_age):
+            log.debug(u"Using cached spec for %s", spec_url)
+            return entry.spec_dict
+
+        headers = self.request_headers
+        if entry is not None:
+            headers = dict(headers, **entry.conditional_headers())
+
+        try:
+            response = await request(self.http_client, spec_url, headers).result()
+        except HTTPError as e:
+            if entry is None or e.status_code != 304:
+                raise
+            log.debug(u"Cached spec for %s is still valid", spec_url)
+            await self.spec_cache.set(spec_url, SpecCacheEntry(
+                entry.spec_dict, etag=entry.etag, last_modified=entry.last_modified))
+            return entry.spec_dict
+
+        spec_dict = await self.parse_response(spec_url, response)
+        await self.spec_cache.set(spec_url, SpecCacheEntry(
+            spec_dict,
+            etag=response.headers.get('etag'),
+            last_modified=response.headers.get('last-modified'),
+        ))
+        return spec_dict
+
+    async def parse_response(self, spec_url, response):
+        """Parse the JSON or YAML spec contained in a response.
+
+        :param spec_url: URL the spec was retrieved from
+        :type response: :class:`bravado_core.response.IncomingResponse`
+        :returns: json spec in dict form
+        """
         content_type = response.headers.get('content-type', '').lower()
         if is_yaml(spec_url, content_type):
-            return self.load_yaml(await response.text)
+            # Parsing YAML is slow, keep it off the event loop
+            text = await response.text
+            return await asyncio.get_event_loop().run_in_executor(None, self.load_yaml, text)
         else:
             return await response.json()
 
@@ -121,16 +351,7 @@ class Loader(object):
         :return: Python dictionary representing the spec.
         :raise: yaml.parser.ParserError: If the text is not valid YAML.
         """
-        data = yaml.safe_load(text)
-        for methods in itervalues(data.get('paths', {})):
-            for operation in itervalues(methods):
-                if 'responses' in operation:
-                    operation['responses'] = {
-                        str(code): response
-                        for code, response in iteritems(operation['responses'])
-                    }
-
-        return data
+        return yaml.load(text, Loader=SpecYAMLLoader)
 
 
 # TODO: Adding the file scheme here just adds complexity to request()
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+Validation of values against their schema with cached validators.
+
+:func:`bravado_core.validate.validate_schema_object` instantiates a new
+jsonschema validator every time it validates a value, which costs several times
+more than the validation itself for small values. :func:`validate_schema_object`
+does the same checks with a validator built once per schema and reused on every
+call.
+
+Request parameters are validated with it by the request builders of compiled
+operations when the ``cache_request_validators`` config key is set, see
+:class:`aiobravado.request_builder.RequestBuilder`.
+
+Validators are cached per thread. jsonschema resolves ``$ref`` with a stack of
+scopes kept on its RefResolver, so validators running in other threads, e.g. in
+the ``offload_executor``, each get their own copy of the resolver of the spec.
+"""
+import threading
+
+from bravado_core.exception import SwaggerMappingError
+from bravado_core.model import is_object
+from bravado_core.schema import SWAGGER_PRIMITIVES
+from bravado_core.swagger20_validator import get_validator_type
+from bravado_core.validate import scrub_sensitive_value
+from jsonschema.validators import RefResolver
+
+# Attribute of the specs holding the validators of each thread, keyed by the id
+# of their schema, in a threading.local. The schema is kept alongside its
+# validator so that its id can not be reused. Validators reference the spec, so
+# they are kept on it to be collected together.
+VALIDATORS_ATTRIBUTE = '_aiobravado_validators'
+
+
+def make_resolver(swagger_spec):
+    """Return a copy of the RefResolver of a spec, with the same handlers and
+    documents.
+
+    :type swagger_spec: :class:`bravado_core.spec.Spec`
+    :rtype: :class:`jsonschema.validators.RefResolver`
+    """
+    resolver = swagger_spec.resolver
+    return RefResolver(
+        base_uri=swagger_spec.origin_url or '',
+        referrer=swagger_spec.spec_dict,
+        store=resolver.store,
+        handlers=resolver.handlers,
+    )
+
+
+def get_validator(swagger_spec, schema_object_spec):
+    """Return the function validating values of a schema, building it on
+    first use.
+
+    :type swagger_spec: :class:`bravado_core.spec.Spec`
+    :param schema_object_spec: dereferenced schema of the values
+    :type schema_object_spec: dict
+    :rtype: callable
+    """
+    thread_validators = vars(swagger_spec).get(VALIDATORS_ATTRIBUTE)
+    if thread_validators is None:
+        thread_validators = threading.local()
+        setattr(swagger_spec, VALIDATORS_ATTRIBUTE, thread_validators)
+    validators = getattr(thread_validators, 'validators', None)
+    if validators is None:
+        validators = thread_validators.validators = {}
+        thread_validators.resolver = make_resolver(swagger_spec)
+    try:
+        return validators[id(schema_object_spec)][1]
+    except KeyError:
+        pass
+
+    validator = get_validator_type(swagger_spec=swagger_spec)(
+        schema_object_spec,
+        format_checker=swagger_spec.format_checker,
+        resolver=thread_validators.resolver,
+    )
+    validate = scrub_sensitive_value(validator.validate)
+    validators[id(schema_object_spec)] = (schema_object_spec, validate)
+    return validate
+
+
+def validate_schema_object(swagger_spec, schema_object_spec, value):
+    """Same as :func:`bravado_core.validate.validate_schema_object`.
+
+    :type swagger_spec: :class:`bravado_core.spec.Spec`
+    :param schema_object_spec: schema of the value
+    :type schema_object_spec: dict
+    :param value: value to validate
+    :raises ValidationError: when jsonschema validation fails.
+    :raises SwaggerMappingError: on invalid Swagger `type`.
+    :raises SwaggerValidationError: when user-defined format validation fails.
+    """
+    deref = swagger_spec.deref
+    schema_object_spec = deref(schema_object_spec)
+    default_type = 'object' if swagger_spec.config['default_type_to_object'] else None
+    obj_type = deref(schema_object_spec.get('type', default_type))
+
+    if not obj_type or obj_type == 'file':
+        return
+
+    if obj_type not in SWAGGER_PRIMITIVES and obj_type != 'array' and not is_object(swagger_spec, schema_object_spec):
+        raise SwaggerMappingError(
+            'Unknown type {0} for value {1}'.format(obj_type, value),
+        )
+
+    get_validator(swagger_spec, schema_object_spec)(value)
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+import copy
+import json
+import os
+
+import pytest
+
+from aiobravado.client import SwaggerClient
+
+
+@pytest.fixture(params=['petstore', 'simple'])
+def spec_dict(request, test_data_dir):
+    with open(os.path.join(test_data_dir, '2.0', request.param, 'swagger.json')) as f:
+        return json.load(f)
+
+
+@pytest.mark.parametrize('lazy_spec', [False, True], ids=['eager', 'lazy'])
+@pytest.mark.benchmark(group='from_spec')
+def test_from_spec(benchmark, spec_dict, lazy_spec):
+    # Specs are copied outside of the measured call, bravado-core may mutate them
+    benchmark.pedantic(
+        SwaggerClient.from_spec,
+        setup=lambda: ((copy.deepcopy(spec_dict),), {'config': {'lazy_spec': lazy_spec}}),
+        rounds=20,
+    )
+
+
+@pytest.mark.benchmark(group='attribute_lookup')
+def test_resource_lookup(benchmark, petstore_client):
+    benchmark(lambda: petstore_client.pet)
+
+
+@pytest.mark.benchmark(group='attribute_lookup')
+def test_operation_lookup(benchmark, petstore_client):
+    resource = petstore_client.pet
+    benchmark(lambda: resource.getPetById)
+
+
+@pytest.mark.benchmark(group='attribute_lookup')
+def test_operation_lookup_from_client(benchmark, petstore_client):
+    benchmark(lambda: petstore_client.pet.getPetById)
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import json
+import os
+
+import pytest
+from aiohttp import web
+
+from aiobravado.client import SwaggerClient
+from testing.integration_server import setup_routes
+
+
+@pytest.fixture
+def test_data_dir():
+    return os.path.join(os.path.abspath(os.path.dirname(__file__)), '../test-data')
+
+
+@pytest.fixture
+def petstore_dict(test_data_dir):
+    with open(os.path.join(test_data_dir, '2.0/petstore/swagger.json')) as f:
+        return json.load(f)
+
+
+@pytest.fixture
+def petstore_client(petstore_dict):
+    return SwaggerClient.from_spec(petstore_dict)
+
+
+class BenchmarkResponse(object):
+    """Minimal in-memory stand-in for the response adapters of the http
+    clients, so that only aiobravado and bravado-core code is measured.
+    """
+
+    def __init__(self, status_code, body, content_type='application/json'):
+        self.status_code = status_code
+        self.headers = {'content-type': content_type}
+        self._body = body
+
+    @property
+    async def raw_bytes(self):
+        return self._body
+
+    @property
+    async def text(self):
+        return self._body.decode('utf-8')
+
+    async def json(self, **kwargs):
+        return json.loads(self._body.decode('utf-8'))
+
+
+@pytest.fixture
+def event_loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest.fixture
+def make_pets():
+    def _make_pets(count):
+        return [
+            {
+                'id': pet_id,
+                'name': 'pet-{0}'.format(pet_id),
+                'photoUrls': ['http://localhost/pet-{0}.png'.format(pet_id)],
+                'category': {'id': 1, 'name': 'dogs'},
+                'tags': [{'id': 1, 'name': 'good'}],
+                'status': 'available',
+            }
+            for pet_id in range(count)
+        ]
+    return _make_pets
+
+
+@pytest.fixture
+def integration_server(event_loop):
+    """Url of the aiohttp integration server, run on the benchmark loop."""
+    app = web.Application()
+    setup_routes(app)
+    runner = web.AppRunner(app)
+    event_loop.run_until_complete(runner.setup())
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    event_loop.run_until_complete(site.start())
+    port = site._server.sockets[0].getsockname()[1]
+    yield 'http://127.0.0.1:{0}'.format(port)
+    event_loop.run_until_complete(runner.cleanup())
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+import pytest
+from bravado_core.validate import validate_schema_object
+from mock import Mock
+
+from aiobravado.client import construct_request
+from aiobravado.client import SwaggerClient
+from aiobravado.request_builder import RequestBuilder
+from aiobravado.validate import validate_schema_object as validate_with_cached_validator
+
+
+OPERATIONS = [
+    ('path', 'getPetById', {'petId': 42}),
+    ('query', 'findPetsByStatus', {'status': ['available', 'sold']}),
+    ('form', 'updatePetWithForm', {'petId': '42', 'name': 'Fido', 'status': 'sold'}),
+    ('body', 'addPet', {'body': {'name': 'Fido', 'photoUrls': ['http://localhost/fido.png']}}),
+]
+
+parametrize_operations = pytest.mark.parametrize(
+    'operation_id, op_kwargs',
+    [(operation_id, op_kwargs) for _, operation_id, op_kwargs in OPERATIONS],
+    ids=[param_kind for param_kind, _, _ in OPERATIONS],
+)
+
+
+@pytest.fixture(params=[True, False], ids=['validated', 'not_validated'])
+def petstore_client(request, petstore_dict):
+    return SwaggerClient.from_spec(petstore_dict, config={'validate_requests': request.param})
+
+
+@parametrize_operations
+@pytest.mark.benchmark(group='construct_request')
+def test_construct_request(benchmark, petstore_client, operation_id, op_kwargs):
+    operation = getattr(petstore_client.pet, operation_id).operation
+    benchmark(lambda: construct_request(operation, {'headers': {}}, **op_kwargs))
+
+
+@parametrize_operations
+@pytest.mark.benchmark(group='construct_request')
+def test_compiled_request_builder(benchmark, petstore_client, operation_id, op_kwargs):
+    builder = RequestBuilder(getattr(petstore_client.pet, operation_id).operation)
+    benchmark(lambda: builder.build({'headers': {}}, op_kwargs))
+
+
+@parametrize_operations
+@pytest.mark.benchmark(group='call_operation')
+def test_call_operation(benchmark, petstore_dict, operation_id, op_kwargs, validate_requests):
+    # Calls go all the way to the http client, which does not send anything
+    client = SwaggerClient.from_spec(petstore_dict, http_client=Mock(), config={
+        'validate_requests': validate_requests,
+        'compile_operations': True,
+        'cache_request_validators': True,
+    })
+    operation = getattr(client.pet, operation_id)
+    benchmark(lambda: operation(**op_kwargs))
+
+
+@pytest.fixture(params=[True, False], ids=['validated', 'not_validated'])
+def validate_requests(request):
+    return request.param
+
+
+@pytest.mark.parametrize('validate', [validate_schema_object, validate_with_cached_validator],
+                         ids=['bravado_core', 'cached_validator'])
+@pytest.mark.benchmark(group='validate_body')
+def test_validate_body(benchmark, petstore_dict, validate):
+    swagger_spec = SwaggerClient.from_spec(petstore_dict).swagger_spec
+    schema = swagger_spec.spec_dict['definitions']['Pet']
+    pet = {'name': 'Fido', 'photoUrls': ['http://localhost/fido.png'], 'tags': [{'id': 1, 'name': 'good'}]}
+    benchmark(validate, swagger_spec, schema, pet)
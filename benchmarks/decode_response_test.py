@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+import json
+
+import pytest
+
+from aiobravado.compat import json_loads_bytes
+
+
+def stdlib_json_loads_text(body):
+    """What response adapters do by default: decode to text, then parse."""
+    return json.loads(body.decode('utf-8'))
+
+
+def optional_loads(module_name):
+    module = pytest.importorskip(module_name)
+    return module.loads
+
+
+DECODERS = {
+    'stdlib_text': lambda: stdlib_json_loads_text,
+    'stdlib_bytes': lambda: json.loads,
+    'simplejson': lambda: optional_loads('simplejson'),
+    'orjson': lambda: optional_loads('orjson'),
+    'ujson': lambda: optional_loads('ujson'),
+    'rapidjson': lambda: optional_loads('rapidjson'),
+    'auto_detected': lambda: json_loads_bytes,
+}
+
+
+@pytest.fixture(params=[100, 10000], ids=['100_pets', '10000_pets'])
+def pets_body(request, make_pets):
+    return json.dumps(make_pets(request.param)).encode('utf-8')
+
+
+@pytest.mark.parametrize('decoder_name', sorted(DECODERS))
+@pytest.mark.benchmark(group='decode_json')
+def test_decode_json(benchmark, pets_body, decoder_name):
+    decoder = DECODERS[decoder_name]()
+    benchmark(decoder, pets_body)
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import json
+
+import pytest
+from bravado_asyncio.definitions import RunMode
+from bravado_asyncio.http_client import AsyncioClient
+from mock import Mock
+
+from aiobravado.client import SwaggerClient
+from aiobravado.http_future import FutureAdapter
+from aiobravado.http_future import HttpFuture
+from benchmarks.conftest import BenchmarkResponse
+
+CONCURRENT_CALLS = 200
+
+PET_BODY = json.dumps({'id': 42, 'name': 'Lili', 'photoUrls': []}).encode('utf-8')
+
+
+class InMemoryFutureAdapter(FutureAdapter):
+
+    async def result(self, timeout=None):
+        return BenchmarkResponse(200, PET_BODY)
+
+
+@pytest.fixture
+def in_memory_client(petstore_dict):
+    """Client whose calls never leave the process, to measure the per-call
+    overhead of aiobravado itself.
+    """
+    client = SwaggerClient.from_spec(petstore_dict, http_client=Mock())
+    operation = client.pet.getPetById.operation
+    client.swagger_spec.http_client.request.side_effect = lambda *args, **kwargs: HttpFuture(
+        InMemoryFutureAdapter(), lambda response: response, operation=operation)
+    return client
+
+
+@pytest.fixture
+def integration_client(event_loop, integration_server):
+    http_client = AsyncioClient(run_mode=RunMode.FULL_ASYNCIO, loop=event_loop)
+    yield event_loop.run_until_complete(
+        SwaggerClient.from_url('{0}/swagger.yaml'.format(integration_server), http_client=http_client),
+    )
+    event_loop.run_until_complete(http_client.client_session.close())
+
+
+@pytest.mark.benchmark(group='end_to_end')
+def test_in_memory_call(benchmark, event_loop, in_memory_client):
+    pet = benchmark(lambda: event_loop.run_until_complete(in_memory_client.pet.getPetById(petId=42).result()))
+    assert pet.name == 'Lili'
+
+
+@pytest.mark.benchmark(group='end_to_end')
+def test_sequential_calls(benchmark, event_loop, integration_client):
+    pet = benchmark(lambda: event_loop.run_until_complete(
+        integration_client.pet.getPetById(petId=42).result(timeout=10),
+    ))
+    assert pet.name == 'Lili'
+
+
+@pytest.mark.benchmark(group='end_to_end_throughput')
+def test_concurrent_calls(benchmark, event_loop, integration_client):
+    async def get_pets():
+        futures = [integration_client.pet.getPetById(petId=pet_id) for pet_id in range(10, 10 + CONCURRENT_CALLS)]
+        return await asyncio.gather(*[future.result(timeout=10) for future in futures])
+
+    pets = benchmark(lambda: event_loop.run_until_complete(get_pets()))
+    assert len(pets) == CONCURRENT_CALLS
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+import asyncio
+
+import pytest
+from bravado_asyncio.definitions import RunMode
+from bravado_asyncio.http_client import AsyncioClient
+
+from aiobravado.client import SwaggerClient
+
+pytest.importorskip('h2')
+
+from aiobravado.http2_client import HTTP2Client  # noqa: E402
+from testing.http2_server import HTTP2Server  # noqa: E402
+from testing.http2_server import petstore_handler  # noqa: E402
+
+CONCURRENT_CALLS = 200
+
+
+@pytest.fixture
+def http2_server(event_loop):
+    server = HTTP2Server(petstore_handler)
+    event_loop.run_until_complete(server.start())
+    yield 'http://127.0.0.1:{0}'.format(server.port)
+    event_loop.run_until_complete(server.stop())
+
+
+@pytest.fixture(params=['http1', 'http2'])
+def swagger_client(request, event_loop):
+    if request.param == 'http1':
+        server_url = request.getfixturevalue('integration_server')
+        http_client = AsyncioClient(run_mode=RunMode.FULL_ASYNCIO, loop=event_loop)
+    else:
+        server_url = request.getfixturevalue('http2_server')
+        http_client = HTTP2Client()
+
+    yield event_loop.run_until_complete(
+        SwaggerClient.from_url('{0}/swagger.yaml'.format(server_url), http_client=http_client),
+    )
+
+    if request.param == 'http1':
+        event_loop.run_until_complete(http_client.client_session.close())
+    else:
+        event_loop.run_until_complete(http_client.close())
+
+
+@pytest.mark.benchmark(group='concurrent_calls')
+def test_concurrent_get_pet_by_id(benchmark, event_loop, swagger_client):
+    async def get_pets():
+        futures = [swagger_client.pet.getPetById(petId=pet_id) for pet_id in range(10, 10 + CONCURRENT_CALLS)]
+        return await asyncio.gather(*[future.result(timeout=10) for future in futures])
+
+    pets = benchmark(lambda: event_loop.run_until_complete(get_pets()))
+    assert len(pets) == CONCURRENT_CALLS
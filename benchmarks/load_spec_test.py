@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+import os
+
+import pytest
+import yaml
+from six import iteritems
+from six import itervalues
+
+from aiobravado.swagger_model import Loader
+
+
+def pure_python_load_yaml(text):
+    """Spec loading before LibYAML support: pure Python parser and a second
+    pass over the operations to stringify the response codes.
+    """
+    data = yaml.safe_load(text)
+    for methods in itervalues(data.get('paths', {})):
+        for operation in itervalues(methods):
+            if 'responses' in operation:
+                operation['responses'] = {
+                    str(code): response
+                    for code, response in iteritems(operation['responses'])
+                }
+    return data
+
+
+def make_large_spec(path_count):
+    paths = {}
+    for index in range(path_count):
+        paths['/resource{0}/{{id}}'.format(index)] = {
+            method: {
+                'operationId': '{0}Resource{1}'.format(method, index),
+                'parameters': [{'name': 'id', 'in': 'path', 'required': True, 'type': 'integer'}],
+                'responses': {
+                    200: {'description': 'ok', 'schema': {'$ref': '#/definitions/Resource'}},
+                    404: {'description': 'not found'},
+                    'default': {'description': 'error'},
+                },
+            }
+            for method in ('get', 'put', 'delete')
+        }
+    return {
+        'swagger': '2.0',
+        'info': {'title': 'Large', 'version': '1.0'},
+        'paths': paths,
+        'definitions': {
+            'Resource': {
+                'type': 'object',
+                'properties': {'id': {'type': 'integer'}, 'name': {'type': 'string'}},
+            },
+        },
+    }
+
+
+@pytest.fixture(params=['integration_server', 'synthetic_large'])
+def yaml_spec(request):
+    if request.param == 'integration_server':
+        path = os.path.join(os.path.dirname(__file__), '../testing/swagger.yaml')
+        with open(path) as f:
+            return f.read()
+    return yaml.safe_dump(make_large_spec(500), default_flow_style=False)
+
+
+@pytest.mark.benchmark(group='load_yaml')
+def test_pure_python_load_yaml(benchmark, yaml_spec):
+    benchmark(pure_python_load_yaml, yaml_spec)
+
+
+@pytest.mark.benchmark(group='load_yaml')
+def test_loader_load_yaml(benchmark, yaml_spec):
+    loader = Loader(None)
+    assert loader.load_yaml(yaml_spec) == pure_python_load_yaml(yaml_spec)
+    benchmark(loader.load_yaml, yaml_spec)
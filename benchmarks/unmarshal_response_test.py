@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+import json
+import tracemalloc
+from functools import partial
+
+import pytest
+from bravado_core.response import get_response_spec
+from bravado_core.unmarshal import unmarshal_schema_object
+from bravado_core.validate import validate_schema_object
+from msgpack import packb
+
+from aiobravado.client import SwaggerClient
+from aiobravado.http_future import unmarshal_response_inner
+from benchmarks.conftest import BenchmarkResponse
+
+
+async def unmarshal_response_uncompiled(response, op):
+    """The unmarshalling path before unmarshal plans were introduced."""
+    response_spec = get_response_spec(status_code=response.status_code, op=op)
+    content_spec = op.swagger_spec.deref(response_spec['schema'])
+    content_value = await response.json()
+    if op.swagger_spec.config.get('validate_responses', False):
+        validate_schema_object(op.swagger_spec, content_spec, content_value)
+    return unmarshal_schema_object(op.swagger_spec, content_spec, content_value)
+
+
+async def as_coroutine(value):
+    return value
+
+
+@pytest.fixture(params=[1, 1000], ids=['1_pet', '1000_pets'])
+def pets_response(request, make_pets):
+    return BenchmarkResponse(200, json.dumps(make_pets(request.param)).encode('utf-8'))
+
+
+@pytest.fixture(params=[1, 1000], ids=['1_pet', '1000_pets'])
+def msgpack_pets_response(request, make_pets):
+    return BenchmarkResponse(200, packb(make_pets(request.param)), content_type='application/msgpack')
+
+
+@pytest.fixture(params=[1, 1000], ids=['1_string', '1000_strings'])
+def strings_response(request):
+    return BenchmarkResponse(200, json.dumps(['available'] * request.param).encode('utf-8'))
+
+
+@pytest.fixture
+def strings_operation(petstore_dict):
+    # Same response shape as getInventory, but as a list of primitives
+    petstore_dict['paths']['/pet/findByStatus']['get']['responses']['200']['schema'] = {
+        'type': 'array',
+        'items': {'type': 'string'},
+    }
+    return SwaggerClient.from_spec(petstore_dict, config={'validate_responses': False}).pet.findPetsByStatus.operation
+
+
+@pytest.mark.parametrize('unmarshal', [unmarshal_response_uncompiled, unmarshal_response_inner])
+@pytest.mark.benchmark(group='unmarshal_pets')
+def test_unmarshal_pets(benchmark, event_loop, petstore_dict, pets_response, unmarshal):
+    client = SwaggerClient.from_spec(petstore_dict, config={'validate_responses': False})
+    operation = client.pet.findPetsByStatus.operation
+    benchmark(lambda: event_loop.run_until_complete(unmarshal(pets_response, operation)))
+
+
+@pytest.mark.parametrize('unmarshal', [unmarshal_response_uncompiled, unmarshal_response_inner])
+@pytest.mark.benchmark(group='unmarshal_strings')
+def test_unmarshal_strings(benchmark, event_loop, strings_operation, strings_response, unmarshal):
+    benchmark(lambda: event_loop.run_until_complete(unmarshal(strings_response, strings_operation)))
+
+
+@pytest.mark.benchmark(group='unmarshal_pets_msgpack')
+def test_unmarshal_msgpack_pets(benchmark, event_loop, petstore_dict, msgpack_pets_response):
+    client = SwaggerClient.from_spec(petstore_dict, config={'validate_responses': False})
+    operation = client.pet.findPetsByStatus.operation
+    benchmark(lambda: event_loop.run_until_complete(unmarshal_response_inner(msgpack_pets_response, operation)))
+
+
+@pytest.mark.parametrize('compact_models', [False, True], ids=['models', 'compact_models'])
+@pytest.mark.benchmark(group='unmarshal_100000_pets')
+def test_unmarshal_100000_pets(benchmark, event_loop, petstore_dict, make_pets, compact_models):
+    client = SwaggerClient.from_spec(
+        petstore_dict,
+        config={'validate_responses': False, 'compact_models': compact_models},
+    )
+    operation = client.pet.findPetsByStatus.operation
+    response = BenchmarkResponse(200, json.dumps(make_pets(100000)).encode('utf-8'))
+    # Decode outside of the measurements, only the unmarshalled models count
+    response.json = partial(as_coroutine, json.loads(response._body.decode('utf-8')))
+
+    tracemalloc.start()
+    pets = event_loop.run_until_complete(unmarshal_response_inner(response, operation))
+    benchmark.extra_info['memory_bytes'] = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del pets
+
+    benchmark.pedantic(lambda: event_loop.run_until_complete(unmarshal_response_inner(response, operation)), rounds=3)
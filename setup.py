@@ -31,12 +31,13 @@ setup(
     install_requires=[
         'bravado-asyncio >= 0.4.0',
         'bravado-core >= 4.11.0',
-        'msgpack-python',
+        'msgpack-python >= 0.5.2',
         'python-dateutil',
         'pyyaml',
     ],
     extras_require={
         # as recommended by aiohttp, see http://aiohttp.readthedocs.io/en/stable/#library-installation
         'aiohttp_extras': ['aiodns', 'cchardet'],
+        'http2': ['h2 >= 3.0.0'],
     },
 )
@@ -0,0 +1,128 @@
+import argparse
+import asyncio
+import json
+import os.path
+
+import h2.config
+import h2.connection
+import h2.events
+
+
+class HTTP2Server(object):
+    """Minimal plain text HTTP/2 server (prior knowledge, no upgrade) running
+    on the current event loop, for tests and benchmarks.
+
+    :param handler: callable taking the method, path, headers dict and body of
+        a request, returning a (status, headers list, body bytes) tuple
+    """
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.port = None
+        self._server = None
+        self._connections = set()
+
+    async def start(self, host='127.0.0.1', port=0):
+        self._server = await asyncio.start_server(self._serve, host, port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self._server.close()
+        for connection in self._connections:
+            connection.cancel()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        await self._server.wait_closed()
+
+    async def _serve(self, reader, writer):
+        task = asyncio.current_task() if hasattr(asyncio, 'current_task') else asyncio.Task.current_task()
+        self._connections.add(task)
+        try:
+            await self._handle_connection(reader, writer)
+        finally:
+            self._connections.discard(task)
+
+    async def _handle_connection(self, reader, writer):
+        connection = h2.connection.H2Connection(
+            config=h2.config.H2Configuration(client_side=False, header_encoding='utf-8'),
+        )
+        connection.initiate_connection()
+        writer.write(connection.data_to_send())
+
+        requests = {}
+        pending_bodies = {}
+        try:
+            while True:
+                data = await reader.read(65536)
+                if not data:
+                    break
+                for event in connection.receive_data(data):
+                    if isinstance(event, h2.events.RequestReceived):
+                        requests[event.stream_id] = (dict(event.headers), [])
+                    elif isinstance(event, h2.events.DataReceived):
+                        requests[event.stream_id][1].append(event.data)
+                        connection.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+                    elif isinstance(event, h2.events.StreamEnded):
+                        headers, body = requests.pop(event.stream_id)
+                        status, response_headers, response_body = self.handler(
+                            headers[':method'], headers[':path'], headers, b''.join(body),
+                        )
+                        connection.send_headers(
+                            event.stream_id,
+                            [(':status', str(status)), ('content-length', str(len(response_body)))] +
+                            response_headers,
+                        )
+                        pending_bodies[event.stream_id] = response_body
+                    elif isinstance(event, h2.events.StreamReset):
+                        requests.pop(event.stream_id, None)
+                        pending_bodies.pop(event.stream_id, None)
+                    elif isinstance(event, h2.events.ConnectionTerminated):
+                        return
+
+                for stream_id, body in list(pending_bodies.items()):
+                    window = min(connection.local_flow_control_window(stream_id), len(body))
+                    while window > 0:
+                        chunk_size = min(window, connection.max_outbound_frame_size)
+                        connection.send_data(stream_id, body[:chunk_size])
+                        body = body[chunk_size:]
+                        window -= chunk_size
+                    if body:
+                        pending_bodies[stream_id] = body
+                    else:
+                        connection.end_stream(stream_id)
+                        del pending_bodies[stream_id]
+
+                writer.write(connection.data_to_send())
+                await writer.drain()
+        finally:
+            writer.close()
+
+
+def petstore_handler(method, path, headers, body):
+    """Serve the spec and the pets of the integration server."""
+    if path == '/swagger.yaml':
+        with open(os.path.join(os.path.dirname(__file__), 'swagger.yaml'), 'rb') as f:
+            return 200, [('content-type', 'text/vnd.yaml')], f.read()
+
+    if method == 'GET' and path.startswith('/pet/'):
+        pet_id = path[len('/pet/'):]
+        if not pet_id.isdigit() or pet_id == '5':
+            return 404, [], b''
+        pet = {'id': int(pet_id), 'name': 'Lili', 'photoUrls': []}
+        return 200, [('content-type', 'application/json; charset=utf-8')], json.dumps(pet).encode('utf-8')
+
+    return 404, [], b''
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        '-p', '--port', dest='port',
+        type=int, default=8081,
+        help='The port the webserver should listen on (default: %(default)s)',
+    )
+    args = parser.parse_args()
+
+    loop = asyncio.get_event_loop()
+    server = HTTP2Server(petstore_handler)
+    loop.run_until_complete(server.start(port=args.port))
+    loop.run_forever()
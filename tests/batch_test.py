@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+import asyncio
+
+import pytest
+from mock import Mock
+from mock import patch
+
+from aiobravado.batch import batch
+from aiobravado.batch import BatchResults
+from aiobravado.client import CallableOperation
+
+
+class FakeFuture(object):
+
+    def __init__(self, operation, op_kwargs):
+        self.operation = operation
+        self.op_kwargs = op_kwargs
+
+    async def result(self, timeout=None):
+        operation = self.operation
+        operation.in_flight += 1
+        operation.max_in_flight = max(operation.max_in_flight, operation.in_flight)
+        try:
+            await asyncio.sleep(self.op_kwargs.get('delay', 0))
+            if 'error' in self.op_kwargs:
+                raise self.op_kwargs['error']
+            return self.op_kwargs['value']
+        finally:
+            operation.in_flight -= 1
+            operation.finished.append(self.op_kwargs.get('value'))
+
+
+class FakeOperation(object):
+
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.finished = []
+
+    def __call__(self, **op_kwargs):
+        return FakeFuture(self, op_kwargs)
+
+
+@pytest.fixture
+def operation():
+    return FakeOperation()
+
+
+@pytest.mark.asyncio
+async def test_results_are_in_call_order(operation):
+    calls = [(operation, {'value': value, 'delay': 0.01 * (5 - value)}) for value in range(5)]
+
+    assert await batch(calls, concurrency=5) == [0, 1, 2, 3, 4]
+    assert operation.finished == [4, 3, 2, 1, 0]
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_bounded(operation):
+    calls = [(operation, {'value': value, 'delay': 0.001}) for value in range(20)]
+
+    assert await batch(calls, concurrency=3) == list(range(20))
+    assert operation.max_in_flight == 3
+
+
+@pytest.mark.asyncio
+async def test_return_exceptions(operation):
+    error = ValueError('boom')
+    calls = [(operation, {'value': 0}), (operation, {'error': error}), (operation, {'value': 2})]
+
+    assert await batch(calls, return_exceptions=True) == [0, error, 2]
+
+
+@pytest.mark.asyncio
+async def test_first_failure_is_raised_and_cancels_the_rest(operation):
+    calls = [(operation, {'error': ValueError('boom')})] + [
+        (operation, {'value': value, 'delay': 10}) for value in range(3)
+    ]
+
+    with pytest.raises(ValueError):
+        await batch(calls, concurrency=2)
+    await asyncio.sleep(0)
+
+    # The call to value 2 is never started
+    assert operation.in_flight == 0
+    assert sorted(operation.finished[1:]) == [0, 1]
+
+
+@pytest.mark.asyncio
+async def test_as_completed(operation):
+    calls = [(operation, {'value': value, 'delay': 0.01 * (3 - value)}) for value in range(3)]
+
+    results = [item async for item in BatchResults(calls, concurrency=3)]
+
+    assert results == [(2, 2), (1, 1), (0, 0)]
+
+
+@pytest.mark.asyncio
+async def test_breaking_early_cancels_the_calls_in_flight(operation):
+    calls = [(operation, {'value': value, 'delay': 0.01 * value}) for value in range(6)]
+
+    async for index, result in BatchResults(calls, concurrency=3):
+        break
+    await asyncio.sleep(0.1)
+
+    # The calls still in flight were interrupted and no new ones were made
+    assert operation.in_flight == 0
+    assert sorted(operation.finished) == [0, 1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_leaving_the_context_cancels_the_calls_in_flight(operation):
+    calls = [(operation, {'value': value, 'delay': 0.01 * value}) for value in range(6)]
+
+    async with BatchResults(calls, concurrency=3) as results:
+        async for index, result in results:
+            break
+        assert operation.in_flight == 3
+
+    await asyncio.sleep(0)
+    assert operation.in_flight == 0
+    assert sorted(operation.finished) == [0, 1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_empty_batch():
+    assert await batch([]) == []
+
+
+def test_invalid_concurrency():
+    with pytest.raises(ValueError):
+        BatchResults([], concurrency=0)
+
+
+@pytest.mark.asyncio
+async def test_callable_operation_batch(operation):
+    callable_operation = CallableOperation(Mock())
+
+    with patch.object(CallableOperation, '__call__', side_effect=operation):
+        results = await callable_operation.batch([{'value': 1}, {'value': 2}], concurrency=1)
+        as_completed = [item async for item in callable_operation.batch_as_completed([{'value': 3}])]
+
+    assert results == [1, 2]
+    assert as_completed == [(0, 3)]
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+import asyncio
+from functools import partial
+
+import mock
+import pytest
+from mock import Mock
+
+from aiobravado.circuit_breaker import BreakerFuture
+from aiobravado.circuit_breaker import BreakerRegistry
+from aiobravado.circuit_breaker import CircuitBreaker
+from aiobravado.client import SwaggerClient
+from aiobravado.exception import BravadoConnectionError
+from aiobravado.exception import BravadoTimeoutError
+from aiobravado.exception import CircuitBreakerOpen
+
+
+def make_breaker(**kwargs):
+    kwargs.setdefault('failure_rate_threshold', 0.5)
+    kwargs.setdefault('window_size', 4)
+    kwargs.setdefault('min_calls', 4)
+    kwargs.setdefault('reset_timeout', 10)
+    return CircuitBreaker(**kwargs)
+
+
+def call(breaker, failed):
+    breaker.before_call()
+    breaker.record(failed)
+
+
+@pytest.mark.parametrize('status_code, error, expected', [
+    (200, None, False),
+    (404, None, False),
+    (500, None, True),
+    (503, None, True),
+    (None, BravadoTimeoutError(), True),
+    (None, BravadoConnectionError(), True),
+    (None, ValueError(), False),
+])
+def test_is_failure(status_code, error, expected):
+    assert CircuitBreaker().is_failure(status_code=status_code, error=error) is expected
+
+
+def test_breaker_opens_at_the_failure_rate_threshold():
+    breaker = make_breaker()
+    for failed in (True, False, True):
+        call(breaker, failed)
+    assert breaker.state == 'closed'
+
+    call(breaker, False)
+    assert breaker.metrics() == {'state': 'open', 'failure_rate': 0.5, 'calls': 4, 'rejected': 0}
+
+    with pytest.raises(CircuitBreakerOpen):
+        breaker.before_call()
+    assert breaker.rejected == 1
+
+
+def test_failure_rate_only_counts_the_window():
+    breaker = make_breaker(min_calls=2)
+    for failed in (False, False, False, True, False, False, False, False):
+        call(breaker, failed)
+    assert breaker.failure_rate == 0
+    assert breaker.state == 'closed'
+
+
+def test_cancelled_calls_do_not_count():
+    breaker = make_breaker(min_calls=1)
+    call(breaker, None)
+    assert breaker.metrics()['calls'] == 0
+
+
+def test_breaker_half_opens_and_closes_after_successful_probes():
+    breaker = make_breaker(min_calls=1, half_open_calls=2)
+    call(breaker, True)
+    assert breaker.state == 'open'
+
+    with mock.patch('aiobravado.circuit_breaker.time.monotonic', return_value=breaker._opened_at + 10.5):
+        breaker.before_call()
+        breaker.before_call()
+        assert breaker.state == 'half_open'
+        with pytest.raises(CircuitBreakerOpen):
+            breaker.before_call()
+
+        breaker.record(False)
+        assert breaker.state == 'half_open'
+        breaker.record(False)
+
+    assert breaker.metrics() == {'state': 'closed', 'failure_rate': 0.0, 'calls': 0, 'rejected': 1}
+
+
+def test_failed_probe_opens_the_breaker_again():
+    breaker = make_breaker(min_calls=1)
+    call(breaker, True)
+    reopen_time = breaker._opened_at + 10.5
+
+    with mock.patch('aiobravado.circuit_breaker.time.monotonic', return_value=reopen_time):
+        call(breaker, True)
+
+    assert breaker.state == 'open'
+    assert breaker._opened_at == reopen_time
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('outcome, failed', [
+    ({'status_code': 200}, False),
+    ({'status_code': 502}, True),
+    ({'error': BravadoTimeoutError()}, True),
+    ({'error': ValueError()}, None),
+])
+async def test_breaker_future_records_the_outcome(fake_http_future, outcome, failed):
+    http_future = fake_http_future(**outcome)
+    breaker = Mock(spec=CircuitBreaker(), wraps=CircuitBreaker())
+    future = BreakerFuture(breaker, lambda: http_future)
+
+    try:
+        await future.result()
+    except Exception:
+        pass
+
+    breaker.before_call.assert_called_once_with()
+    breaker.record.assert_called_once_with(failed)
+
+
+@pytest.mark.asyncio
+async def test_breaker_future_does_not_send_calls_while_open():
+    breaker = make_breaker(min_calls=1)
+    call(breaker, True)
+    make_request = Mock()
+
+    with pytest.raises(CircuitBreakerOpen):
+        await BreakerFuture(breaker, make_request).result()
+    assert not make_request.called
+
+
+def test_registry_invalid_scope():
+    with pytest.raises(ValueError):
+        BreakerRegistry(scope='foo')
+
+
+@pytest.mark.asyncio
+async def test_client_calls_are_short_circuited(petstore_dict, fake_http_future):
+    breakers = BreakerRegistry(partial(make_breaker, min_calls=2))
+    http_client = Mock(request=Mock(side_effect=lambda *args, **kwargs: fake_http_future(status_code=503)))
+    client = SwaggerClient.from_spec(petstore_dict, http_client=http_client, config={'circuit_breakers': breakers})
+
+    for _ in range(2):
+        incoming_response = await client.pet.getPetById(petId=1).response()
+        assert incoming_response.status_code == 503
+
+    with pytest.raises(CircuitBreakerOpen):
+        await client.pet.getPetById(petId=1).result()
+
+    assert http_client.request.call_count == 2
+    assert breakers.metrics()['petstore.swagger.io']['state'] == 'open'
+
+
+@pytest.mark.asyncio
+async def test_refused_connections_open_the_breaker(make_local_client, closed_port_url):
+    breakers = BreakerRegistry(partial(make_breaker, min_calls=2))
+    client = make_local_client(closed_port_url, config={'circuit_breakers': breakers})
+
+    for _ in range(2):
+        with pytest.raises(BravadoConnectionError):
+            await client.pet.getPetById(petId=1).result(timeout=5)
+
+    with pytest.raises(CircuitBreakerOpen):
+        await client.pet.getPetById(petId=1).result(timeout=5)
+
+
+@pytest.mark.asyncio
+async def test_real_timeouts_open_the_breaker(make_local_client, local_server):
+    async def handler(request):
+        await asyncio.sleep(1)
+
+    breakers = BreakerRegistry(partial(make_breaker, min_calls=2))
+    async with local_server(handler) as url:
+        client = make_local_client(url, config={'circuit_breakers': breakers})
+        for _ in range(2):
+            with pytest.raises(BravadoTimeoutError):
+                await client.pet.getPetById(petId=1).result(timeout=0.05)
+
+        with pytest.raises(CircuitBreakerOpen):
+            await client.pet.getPetById(petId=1).result(timeout=0.05)
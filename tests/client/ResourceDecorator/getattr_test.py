@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from aiobravado.client import CallableOperation
+
+
+def test_operation_exists(petstore_client):
+    assert type(petstore_client.pet.getPetById) is CallableOperation
+
+
+def test_operation_is_cached(petstore_client):
+    assert petstore_client.pet.getPetById is petstore_client.pet.getPetById
+
+
+def test_operation_not_found(petstore_client):
+    with pytest.raises(AttributeError):
+        petstore_client.pet.foo
+    assert 'foo' not in petstore_client.pet._callable_operations
@@ -43,3 +43,15 @@ def client_tags_with_spaces():
 
 def test_get_resource(client_tags_with_spaces):
     assert type(client_tags_with_spaces._get_resource('my tag')) == ResourceDecorator
+
+
+def test_resource_is_cached(petstore_client):
+    assert petstore_client.pet is petstore_client.pet
+
+
+def test_resource_cache_invalidated_on_spec_swap(petstore_client, petstore_dict):
+    pet = petstore_client.pet
+    petstore_client.swagger_spec = SwaggerClient.from_spec(petstore_dict).swagger_spec
+
+    assert petstore_client.pet is not pet
+    assert petstore_client.pet.resource is petstore_client.swagger_spec.resources['pet']
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+import asyncio
+
+import pytest
+from mock import Mock
+
+from aiobravado.client import SwaggerClient
+from aiobravado.coalescing import CoalescedFuture
+from aiobravado.coalescing import make_request_key
+from aiobravado.exception import BravadoTimeoutError
+
+
+@pytest.fixture
+def response(event_loop):
+    return event_loop.create_future()
+
+
+@pytest.fixture
+def http_client(response, fake_http_future):
+    http_client = Mock()
+    http_client.request.side_effect = lambda *args, **kwargs: fake_http_future(wait_for=response)
+    return http_client
+
+
+@pytest.fixture
+def client(petstore_dict, http_client):
+    return SwaggerClient.from_spec(petstore_dict, http_client=http_client, config={'coalesce_requests': True})
+
+
+def test_identical_calls_share_one_request(event_loop, client, http_client, response):
+    futures = [client.pet.getPetById(petId=1) for _ in range(3)]
+    response.set_result(None)
+
+    results = event_loop.run_until_complete(asyncio.gather(*[future.result() for future in futures]))
+
+    assert results == [200] * 3
+    assert http_client.request.call_count == 1
+    assert client.pet.getPetById.coalescer.in_flight() == 0
+
+
+def test_calls_after_completion_send_a_new_request(event_loop, client, http_client, response):
+    response.set_result(None)
+    event_loop.run_until_complete(client.pet.getPetById(petId=1).result())
+    event_loop.run_until_complete(client.pet.getPetById(petId=1).result())
+
+    assert http_client.request.call_count == 2
+
+
+def test_errors_are_shared(event_loop, client, response):
+    futures = [client.pet.getPetById(petId=1) for _ in range(2)]
+    response.set_exception(ValueError('boom'))
+
+    results = event_loop.run_until_complete(
+        asyncio.gather(*[future.result() for future in futures], return_exceptions=True))
+
+    assert [type(result) for result in results] == [ValueError, ValueError]
+
+
+def test_different_calls_are_not_coalesced(client, http_client):
+    client.pet.getPetById(petId=1)
+    client.pet.getPetById(petId=2)
+    client.pet.getPetById(petId=1, _request_options={'headers': {'X-Foo': 'bar'}})
+
+    assert http_client.request.call_count == 3
+
+
+@pytest.mark.parametrize('request_options', [
+    {'coalesce': False},
+    {'response_callbacks': [Mock()]},
+])
+def test_opted_out_calls_are_not_coalesced(client, http_client, request_options):
+    client.pet.getPetById(petId=1, _request_options=dict(request_options))
+    client.pet.getPetById(petId=1, _request_options=dict(request_options))
+
+    assert http_client.request.call_count == 2
+
+
+def test_unsafe_methods_are_not_coalesced(client, http_client):
+    client.pet.deletePet(petId=1)
+    client.pet.deletePet(petId=1)
+
+    assert http_client.request.call_count == 2
+
+
+def test_coalescing_is_disabled_by_default(petstore_dict, http_client):
+    client = SwaggerClient.from_spec(petstore_dict, http_client=http_client)
+    client.pet.getPetById(petId=1)
+    client.pet.getPetById(petId=1)
+
+    assert http_client.request.call_count == 2
+
+
+def test_make_request_key_ignores_dict_order():
+    request = {'method': 'GET', 'url': 'http://localhost/pet', 'params': {'a': 1, 'b': [1, 2]}, 'headers': {}}
+    same_request = {'headers': {}, 'params': {'b': [1, 2], 'a': 1}, 'url': 'http://localhost/pet', 'method': 'GET'}
+
+    assert make_request_key('getPet', request, False) == make_request_key('getPet', same_request, False)
+    assert make_request_key('getPet', request, False) != make_request_key('getPet', request, True)
+
+
+def test_make_request_key_unhashable_values():
+    request = {'method': 'GET', 'url': 'http://localhost/pet', 'params': {'a': {1, 2}}, 'headers': {}}
+
+    assert make_request_key('getPet', request, False) is None
+
+
+def test_timeout_does_not_cancel_shared_request(event_loop, response):
+    task = asyncio.ensure_future(response, loop=event_loop)
+
+    with pytest.raises(BravadoTimeoutError):
+        event_loop.run_until_complete(CoalescedFuture(task).result(timeout=0.01))
+
+    assert not task.cancelled()
+    response.set_result('pet')
+    assert event_loop.run_until_complete(CoalescedFuture(task).result()) == 'pet'
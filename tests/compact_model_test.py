@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+import datetime
+import gc
+import weakref
+
+import pytest
+from bravado_core.response import IncomingResponse
+from bravado_core.spec import Spec
+from mock import Mock
+
+from aiobravado.compact_model import compile_unmarshaller
+from aiobravado.compact_model import CompactModel
+from aiobravado.compact_model import make_slot_names
+from aiobravado.http_future import unmarshal_response_inner
+
+
+PET = {
+    'id': 1,
+    'name': 'Lili',
+    'photoUrls': ['http://localhost/lili.png'],
+    'category': {'id': 2, 'name': 'cats'},
+    'tags': [{'id': 3, 'name': 'cute'}],
+    'status': 'available',
+}
+
+
+@pytest.fixture
+def spec_dict(petstore_dict):
+    petstore_dict['definitions']['Pet']['properties']['birth-date'] = {'type': 'string', 'format': 'date'}
+    petstore_dict['definitions']['Pet']['properties']['class'] = {'type': 'string'}
+    return petstore_dict
+
+
+@pytest.fixture
+def swagger_spec(spec_dict):
+    return Spec.from_dict(spec_dict, config={'use_models': True, 'compact_models': True})
+
+
+@pytest.fixture
+def unmarshal_pet(swagger_spec):
+    return compile_unmarshaller(swagger_spec, swagger_spec.spec_dict['definitions']['Pet'])
+
+
+def test_make_slot_names():
+    assert make_slot_names(['name', 'birth-date', 'class', '_private']) == {
+        'name': 'name',
+        'birth-date': '_p1',
+        'class': '_p2',
+        '_private': '_p3',
+    }
+
+
+def test_unmarshal_into_compact_models(unmarshal_pet):
+    pet = unmarshal_pet(dict(PET, **{'birth-date': '2017-01-02', 'class': 'mammal'}))
+
+    assert isinstance(pet, CompactModel)
+    assert type(pet).__name__ == 'Pet'
+    assert not hasattr(pet, '__dict__')
+    assert pet.name == 'Lili'
+    assert pet['name'] == 'Lili'
+    assert pet.category.name == 'cats'
+    assert pet.tags[0].name == 'cute'
+    assert getattr(pet, 'birth-date') == datetime.date(2017, 1, 2)
+    assert pet['class'] == 'mammal'
+    assert 'photoUrls' in pet
+
+
+def test_missing_properties_are_none(unmarshal_pet):
+    pet = unmarshal_pet({'name': 'Lili', 'photoUrls': []})
+    assert pet.category is None
+    assert pet['birth-date'] is None
+
+
+def test_additional_properties(unmarshal_pet):
+    pet = unmarshal_pet(dict(PET, color='black'))
+
+    assert pet.color == 'black'
+    assert 'color' in pet
+    assert 'color' in dir(pet)
+    assert pet._as_dict()['color'] == 'black'
+    assert 'color' not in pet._as_dict(additional_properties=False)
+
+    with pytest.raises(AttributeError):
+        pet.size
+
+
+def test_no_additional_properties(swagger_spec):
+    tag_spec = swagger_spec.spec_dict['definitions']['Tag']
+    tag_spec['additionalProperties'] = False
+    unmarshal_tag = compile_unmarshaller(swagger_spec, tag_spec)
+
+    tag = unmarshal_tag({'id': 1, 'name': 'cute'})
+
+    assert tag._as_dict() == {'id': 1, 'name': 'cute'}
+    assert 'color' not in tag
+    with pytest.raises(AttributeError):
+        tag.color
+
+
+def test_as_dict(unmarshal_pet):
+    pet = unmarshal_pet(PET)
+
+    assert pet._as_dict() == dict(PET, **{'birth-date': None, 'class': None})
+    assert isinstance(pet._as_dict(recursive=False)['category'], CompactModel)
+
+
+def test_equality_and_repr(unmarshal_pet):
+    assert unmarshal_pet(PET) == unmarshal_pet(PET)
+    assert unmarshal_pet(PET) != unmarshal_pet(dict(PET, name='Vivi'))
+    assert repr(unmarshal_pet({'name': 'Lili', 'photoUrls': []})) == (
+        "Pet(birth-date=None, category=None, class=None, id=None, name='Lili', photoUrls=[], status=None, tags=None)"
+    )
+
+
+def test_model_types_are_shared(swagger_spec, unmarshal_pet):
+    unmarshal_category = compile_unmarshaller(swagger_spec, swagger_spec.spec_dict['definitions']['Category'])
+    assert type(unmarshal_category({'id': 1})) is type(unmarshal_pet(PET).category)
+
+
+def test_model_types_do_not_keep_the_spec_alive(spec_dict):
+    swagger_spec = Spec.from_dict(spec_dict, config={'use_models': True, 'compact_models': True})
+    compile_unmarshaller(swagger_spec, swagger_spec.spec_dict['definitions']['Pet'])(PET)
+    spec_ref = weakref.ref(swagger_spec)
+
+    del swagger_spec
+    gc.collect()
+
+    assert spec_ref() is None
+
+
+@pytest.mark.parametrize('schema, value, expected', [
+    ({'type': 'integer'}, 1, 1),
+    ({'type': 'array', 'items': {'type': 'string'}}, ['a', None], ['a', None]),
+    ({'type': 'string', 'format': 'date'}, '2017-01-02', datetime.date(2017, 1, 2)),
+    (
+        {'type': 'object', 'properties': {'day': {'type': 'string', 'format': 'date'}, 'other': {'type': 'string'}}},
+        {'day': '2017-01-02'},
+        {'day': datetime.date(2017, 1, 2), 'other': None},
+    ),
+])
+def test_unmarshal_other_schemas(swagger_spec, schema, value, expected):
+    assert compile_unmarshaller(swagger_spec, schema)(value) == expected
+
+
+@pytest.mark.asyncio
+async def test_responses_use_compact_models(swagger_spec):
+    response = Mock(spec=IncomingResponse, status_code=200, headers={'content-type': 'application/json'})
+
+    async def json():
+        return [PET]
+    response.json = json
+
+    pets = await unmarshal_response_inner(response, swagger_spec.resources['pet'].operations['findPetsByStatus'])
+
+    assert isinstance(pets[0], CompactModel)
+    assert pets[0].name == 'Lili'
+
+
+def test_unmarshal_into_dicts(swagger_spec):
+    unmarshal_pets = compile_unmarshaller(swagger_spec, {
+        'type': 'array',
+        'items': {'allOf': [{'$ref': '#/definitions/Pet'}]},
+    }, use_models=False)
+
+    pets = unmarshal_pets([dict(PET, **{'birth-date': '2017-01-02'})])
+
+    assert type(pets[0]) is dict
+    assert type(pets[0]['category']) is dict
+    assert pets[0]['birth-date'] == datetime.date(2017, 1, 2)
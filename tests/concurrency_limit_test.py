@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+import asyncio
+from functools import partial
+
+import pytest
+from mock import Mock
+
+from aiobravado.client import SwaggerClient
+from aiobravado.concurrency_limit import AIMDLimiter
+from aiobravado.concurrency_limit import LimitedFuture
+from aiobravado.concurrency_limit import LimiterRegistry
+from aiobravado.exception import BravadoConnectionError
+from aiobravado.exception import BravadoTimeoutError
+from aiobravado.exception import ConcurrencyLimitExceeded
+
+
+@pytest.mark.asyncio
+async def test_calls_over_the_limit_are_queued():
+    limiter = AIMDLimiter(initial_limit=2)
+    await limiter.acquire()
+    await limiter.acquire()
+
+    waiter = asyncio.ensure_future(limiter.acquire())
+    await asyncio.sleep(0)
+    assert limiter.metrics() == {'limit': 2, 'in_flight': 2, 'queue_depth': 1, 'rejected': 0}
+
+    limiter.release()
+    await waiter
+    assert limiter.in_flight == 2
+    assert limiter.queue_depth == 0
+
+
+@pytest.mark.asyncio
+async def test_full_queue_fails_fast():
+    limiter = AIMDLimiter(initial_limit=1, max_queue=0)
+    await limiter.acquire()
+
+    with pytest.raises(ConcurrencyLimitExceeded):
+        await limiter.acquire()
+    assert limiter.rejected == 1
+
+
+@pytest.mark.asyncio
+async def test_queue_timeout():
+    limiter = AIMDLimiter(initial_limit=1, queue_timeout=0.01)
+    await limiter.acquire()
+
+    with pytest.raises(ConcurrencyLimitExceeded):
+        await limiter.acquire()
+    assert limiter.queue_depth == 0
+    assert limiter.rejected == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_the_queue():
+    limiter = AIMDLimiter(initial_limit=1)
+    await limiter.acquire()
+    waiter = asyncio.ensure_future(limiter.acquire())
+    await asyncio.sleep(0)
+
+    waiter.cancel()
+    await asyncio.sleep(0)
+
+    assert limiter.queue_depth == 0
+    limiter.release()
+    assert limiter.in_flight == 0
+
+
+def test_limit_increases_when_used():
+    limiter = AIMDLimiter(initial_limit=4, max_limit=5)
+    limiter.in_flight = 2
+    limiter.release(0.1)
+    assert limiter.limit == 5
+
+    limiter.in_flight = 4
+    limiter.release(0.1)
+    assert limiter.limit == 5
+
+
+def test_limit_does_not_increase_when_mostly_idle():
+    limiter = AIMDLimiter(initial_limit=10)
+    limiter.in_flight = 1
+    limiter.release(0.1)
+    assert limiter.limit == 10
+
+
+@pytest.mark.parametrize('latency, dropped', [(0.1, True), (2, False)])
+def test_limit_backs_off(latency, dropped):
+    limiter = AIMDLimiter(initial_limit=10, min_limit=9, backoff_ratio=0.5, latency_threshold=1)
+    limiter.in_flight = 10
+    limiter.release(latency, dropped=dropped)
+    assert limiter.limit == 9
+
+
+def test_cancelled_calls_do_not_change_the_limit():
+    limiter = AIMDLimiter(initial_limit=10)
+    limiter.in_flight = 10
+    limiter.release(None, dropped=True)
+    assert limiter.limit == 10
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('outcome, limit', [
+    ({}, 3),
+    ({'status_code': 503}, 1),
+    ({'error': BravadoTimeoutError()}, 1),
+])
+async def test_limited_future_adapts_the_limit(fake_http_future, outcome, limit):
+    http_future = fake_http_future(**outcome)
+    limiter = AIMDLimiter(initial_limit=2, backoff_ratio=0.5)
+    limited_future = LimitedFuture(limiter, lambda: http_future)
+
+    try:
+        await limited_future.result()
+    except BravadoTimeoutError:
+        pass
+
+    assert limiter.limit == limit
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_refused_connections_back_off(make_local_client, closed_port_url):
+    limiters = LimiterRegistry(partial(AIMDLimiter, initial_limit=4, backoff_ratio=0.5))
+    client = make_local_client(closed_port_url, config={'concurrency_limiters': limiters})
+
+    with pytest.raises(BravadoConnectionError):
+        await client.pet.getPetById(petId=1).result(timeout=5)
+
+    assert limiters.metrics()['getPetById']['limit'] == 2
+    assert limiters.metrics()['getPetById']['in_flight'] == 0
+
+
+@pytest.mark.asyncio
+async def test_real_timeouts_back_off(make_local_client, local_server):
+    async def handler(request):
+        await asyncio.sleep(1)
+
+    limiters = LimiterRegistry(partial(AIMDLimiter, initial_limit=4, backoff_ratio=0.5))
+    async with local_server(handler) as url:
+        client = make_local_client(url, config={'concurrency_limiters': limiters})
+        with pytest.raises(BravadoTimeoutError):
+            await client.pet.getPetById(petId=1).result(timeout=0.05)
+
+    assert limiters.metrics()['getPetById']['limit'] == 2
+
+
+@pytest.mark.asyncio
+async def test_limited_future_does_not_send_rejected_calls():
+    limiter = AIMDLimiter(initial_limit=1, max_queue=0)
+    await limiter.acquire()
+    make_request = Mock()
+
+    with pytest.raises(ConcurrencyLimitExceeded):
+        await LimitedFuture(limiter, make_request).result()
+    assert not make_request.called
+
+
+@pytest.mark.parametrize('scope, keys', [
+    ('operation', ['getPetById', 'deletePet']),
+    ('host', ['petstore.swagger.io']),
+])
+def test_registry_scopes(petstore_dict, scope, keys):
+    limiters = LimiterRegistry(partial(AIMDLimiter, initial_limit=5), scope=scope)
+    client = SwaggerClient.from_spec(petstore_dict, http_client=Mock(), config={'concurrency_limiters': limiters})
+
+    client.pet.getPetById(petId=1)
+    client.pet.deletePet(petId=1)
+
+    assert sorted(limiters.metrics()) == sorted(keys)
+    assert all(metrics['limit'] == 5 for metrics in limiters.metrics().values())
+
+
+def test_registry_invalid_scope():
+    with pytest.raises(ValueError):
+        LimiterRegistry(scope='foo')
+
+
+@pytest.mark.asyncio
+async def test_client_calls_are_limited(petstore_dict, fake_http_future):
+    in_flight = []
+    max_in_flight = []
+
+    def request(*args, **kwargs):
+        future = fake_http_future(delay=0.01)
+        original_response = future.response
+
+        async def response(timeout=None):
+            in_flight.append(1)
+            max_in_flight.append(len(in_flight))
+            try:
+                return await original_response(timeout)
+            finally:
+                in_flight.pop()
+
+        future.response = response
+        return future
+
+    limiters = LimiterRegistry(partial(AIMDLimiter, initial_limit=3, max_limit=3))
+    client = SwaggerClient.from_spec(
+        petstore_dict,
+        http_client=Mock(request=Mock(side_effect=request)),
+        config={'concurrency_limiters': limiters},
+    )
+
+    results = await asyncio.gather(*[client.pet.getPetById(petId=pet_id).result() for pet_id in range(10)])
+
+    assert results == [200] * 10
+    assert max(max_in_flight) == 3
@@ -1,8 +1,20 @@
 # -*- coding: utf-8 -*-
+import asyncio
 import json
 import os
+import socket
 
+import aiohttp
 import pytest
+from aiohttp import web
+from bravado_core.response import IncomingResponse
+from bravado_core.spec import Spec
+from mock import Mock
+
+from aiobravado.client import SwaggerClient
+from aiobravado.http_client import HttpClient
+from aiobravado.http_future import FutureAdapter
+from aiobravado.http_future import HttpFuture
 
 
 @pytest.fixture
@@ -15,3 +27,241 @@ def petstore_dict(test_dir):
     fpath = os.path.join(test_dir, '../test-data/2.0/petstore/swagger.json')
     with open(fpath) as f:
         return json.load(f)
+
+
+@pytest.fixture
+def make_operation(petstore_dict):
+    """Build the getPetById operation of the petstore with a given config."""
+    def make_operation(**config):
+        swagger_spec = Spec.from_dict(petstore_dict, config=config)
+        return swagger_spec.resources['pet'].operations['getPetById']
+    return make_operation
+
+
+class FakeResponse(IncomingResponse):
+    """Http response with a JSON body."""
+
+    def __init__(self, body=None, status_code=200, headers=None):
+        self.status_code = status_code
+        self.reason = 'reason'
+        self._body = json.dumps(body).encode('utf-8') if body is not None else b''
+        self.headers = dict({
+            'content-type': 'application/json',
+            'content-length': str(len(self._body)),
+        }, **(headers or {}))
+
+    @property
+    async def raw_bytes(self):
+        return self._body
+
+    @property
+    async def text(self):
+        return self._body.decode('utf-8')
+
+    async def json(self, **kwargs):
+        return json.loads(self._body.decode('utf-8'))
+
+
+@pytest.fixture
+def fake_response():
+    """Build a :class:`FakeResponse`."""
+    return FakeResponse
+
+
+class FakeFutureAdapter(FutureAdapter):
+    """Future adapter resolving to a given response right away."""
+
+    def __init__(self, response):
+        self.response = response
+
+    async def result(self, timeout=None):
+        return self.response
+
+
+@pytest.fixture
+def make_fake_http_client():
+    """Build a mock http client answering requests with ``get_response()``,
+    a :class:`FakeResponse` going through a real :class:`HttpFuture`.
+    """
+    def make_fake_http_client(get_response):
+        def request(request_params, operation=None, response_callbacks=None, also_return_response=False):
+            return HttpFuture(
+                FakeFutureAdapter(get_response()),
+                lambda response: response,
+                operation,
+                response_callbacks,
+                also_return_response,
+            )
+
+        return Mock(request=Mock(side_effect=request))
+    return make_fake_http_client
+
+
+class FakeHttpFuture(object):
+    """Stand-in for the :class:`HttpFuture` of a call, for the futures
+    wrapping it. The call gets a response with ``status_code`` (or
+    ``response``), or raises ``error``, after ``delay`` seconds and once
+    ``wait_for`` is done if given. Its result is the status code of the
+    response.
+    """
+
+    def __init__(self, status_code=200, error=None, delay=0, response=None, wait_for=None):
+        self.incoming_response = response or Mock(status_code=status_code)
+        self.error = error
+        self.delay = delay
+        self.wait_for = wait_for
+        self.cancelled = False
+
+    async def result(self, timeout=None):
+        incoming_response = await self.response(timeout=timeout)
+        return await self.make_result(incoming_response)
+
+    async def response(self, timeout=None):
+        try:
+            await asyncio.sleep(self.delay)
+            if self.wait_for is not None:
+                await self.wait_for
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.error is not None:
+            raise self.error
+        return self.incoming_response
+
+    async def make_result(self, incoming_response):
+        return incoming_response.status_code
+
+
+@pytest.fixture
+def fake_http_future():
+    """Build a :class:`FakeHttpFuture`."""
+    return FakeHttpFuture
+
+
+class AiohttpFutureAdapter(FutureAdapter):
+    """Future adapter of :class:`AiohttpClient`, raising the same errors as
+    the one of bravado-asyncio.
+    """
+
+    timeout_errors = (asyncio.TimeoutError,)
+    connection_errors = (aiohttp.ClientConnectionError,)
+
+    def __init__(self, future):
+        self.future = future
+
+    async def result(self, timeout=None):
+        return await asyncio.wait_for(self.future, timeout=timeout)
+
+    def cancel(self):
+        self.future.cancel()
+
+
+class AiohttpResponseAdapter(IncomingResponse):
+
+    def __init__(self, response):
+        self._response = response
+
+    @property
+    def status_code(self):
+        return self._response.status
+
+    @property
+    def reason(self):
+        return self._response.reason
+
+    @property
+    def headers(self):
+        return self._response.headers
+
+    @property
+    async def raw_bytes(self):
+        return await self._response.read()
+
+    @property
+    async def text(self):
+        return await self._response.text()
+
+    async def json(self, **kwargs):
+        return await self._response.json(content_type=None, **kwargs)
+
+
+class AiohttpClient(HttpClient):
+    """Minimal http client sending real requests with aiohttp, so that tests
+    see the errors of an actual transport.
+    """
+
+    def request(self, request_params, operation=None, response_callbacks=None,
+                also_return_response=False):
+        return HttpFuture(
+            AiohttpFutureAdapter(asyncio.ensure_future(self._send(request_params))),
+            AiohttpResponseAdapter,
+            operation,
+            response_callbacks,
+            also_return_response,
+        )
+
+    async def _send(self, request_params):
+        async with aiohttp.ClientSession() as session:
+            response = await session.request(
+                request_params['method'],
+                request_params['url'],
+                params=request_params.get('params'),
+                headers=request_params.get('headers'),
+                data=request_params.get('data'),
+            )
+            # Read before the session is closed
+            await response.read()
+            return response
+
+
+@pytest.fixture
+def local_http_client():
+    """:class:`AiohttpClient` sending real requests."""
+    return AiohttpClient()
+
+
+class LocalServer(object):
+    """aiohttp server answering every request with ``handler`` on a free
+    local port, used as ``async with LocalServer(handler) as url``.
+    """
+
+    def __init__(self, handler):
+        self.app = web.Application()
+        self.app.router.add_route('*', '/{tail:.*}', handler)
+        self.runner = web.AppRunner(self.app)
+
+    async def __aenter__(self):
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, '127.0.0.1', 0)
+        await site.start()
+        return 'http://127.0.0.1:{0}'.format(site._server.sockets[0].getsockname()[1])
+
+    async def __aexit__(self, *exc_info):
+        await self.runner.cleanup()
+
+
+@pytest.fixture
+def local_server():
+    """Build a :class:`LocalServer`."""
+    return LocalServer
+
+
+@pytest.fixture
+def closed_port_url():
+    """Url of a local port nothing listens on."""
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return 'http://127.0.0.1:{0}'.format(port)
+
+
+@pytest.fixture
+def make_local_client(petstore_dict):
+    """Build a client of the petstore served at a local url, sending its
+    requests with :class:`AiohttpClient`.
+    """
+    def make_local_client(url, config=None):
+        spec_dict = dict(petstore_dict, host=url.split('://')[1], schemes=['http'])
+        return SwaggerClient.from_spec(spec_dict, http_client=AiohttpClient(), config=config)
+    return make_local_client
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+import pytest
+from bravado_asyncio.http_client import AsyncioClient
+from mock import patch
+
+from aiobravado.client import SwaggerClient
+from aiobravado.connection_pool import make_http_client
+from aiobravado.connection_pool import PooledAsyncioClient
+
+
+def test_make_http_client_default():
+    http_client = make_http_client({})
+
+    assert type(http_client) is AsyncioClient
+
+
+def test_make_http_client_pooled():
+    http_client = make_http_client({'connection_limit_per_host': 20, 'keepalive_timeout': 60, 'dns_cache_ttl': None})
+
+    assert isinstance(http_client, PooledAsyncioClient)
+    assert http_client.limit == 100
+    assert http_client.limit_per_host == 20
+    assert http_client.keepalive_timeout == 60
+    assert http_client.dns_cache_ttl == 10
+
+
+def test_from_spec_uses_pool_config(petstore_dict):
+    client = SwaggerClient.from_spec(petstore_dict, config={'connection_limit': 5})
+
+    assert isinstance(client.swagger_spec.http_client, PooledAsyncioClient)
+    assert client.swagger_spec.http_client.limit == 5
+
+
+@pytest.mark.parametrize('dns_cache_ttl, use_dns_cache, ttl_dns_cache', [
+    (10, True, 10),
+    (0, False, None),
+])
+def test_make_connector(dns_cache_ttl, use_dns_cache, ttl_dns_cache):
+    http_client = PooledAsyncioClient(limit=5, limit_per_host=2, keepalive_timeout=30, dns_cache_ttl=dns_cache_ttl)
+
+    with patch('aiobravado.connection_pool.aiohttp.TCPConnector') as mock_connector:
+        http_client.make_connector()
+
+    mock_connector.assert_called_once_with(
+        limit=5,
+        limit_per_host=2,
+        keepalive_timeout=30,
+        use_dns_cache=use_dns_cache,
+        ttl_dns_cache=ttl_dns_cache,
+    )
+
+
+@pytest.mark.asyncio
+async def test_client_session_is_reused_until_closed():
+    http_client = PooledAsyncioClient(limit_per_host=2)
+
+    session = http_client.client_session
+    assert http_client.client_session is session
+    assert session.connector.limit_per_host == 2
+
+    await http_client.close()
+    assert session.closed
+    new_session = http_client.client_session
+    assert new_session is not session
+    await http_client.close()
+
+
+def test_clients_share_the_pool(petstore_dict):
+    http_client = PooledAsyncioClient()
+    pets = SwaggerClient.from_spec(petstore_dict, http_client=http_client)
+    users = SwaggerClient.from_spec(petstore_dict, http_client=http_client)
+
+    assert pets.swagger_spec.http_client is users.swagger_spec.http_client
@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import io
+import json
+
+import pytest
+from mock import Mock
+
+from aiobravado.client import SwaggerClient
+from aiobravado.exception import BravadoConnectionError
+from aiobravado.exception import HTTPNotFound
+from aiobravado.http_future import convert_error
+
+h2 = pytest.importorskip('h2')
+
+import h2.exceptions  # noqa: E402
+from aiobravado.http2_client import encode_request  # noqa: E402
+from aiobravado.http2_client import HTTP2Client  # noqa: E402
+from aiobravado.http2_client import HTTP2Connection  # noqa: E402
+from aiobravado.http2_client import HTTP2ConnectionError  # noqa: E402
+from aiobravado.http2_client import HTTP2FutureAdapter  # noqa: E402
+from testing.http2_server import HTTP2Server  # noqa: E402
+from testing.http2_server import petstore_handler  # noqa: E402
+
+
+def echo_handler(method, path, headers, body):
+    if path.startswith('/echo'):
+        response = {'method': method, 'path': path, 'headers': headers, 'body': body.decode('utf-8')}
+        return 200, [('content-type', 'application/json')], json.dumps(response).encode('utf-8')
+    return petstore_handler(method, path, headers, body)
+
+
+@pytest.fixture
+def http2_server(event_loop):
+    server = HTTP2Server(echo_handler)
+    event_loop.run_until_complete(server.start())
+    yield 'http://127.0.0.1:{0}'.format(server.port)
+    event_loop.run_until_complete(server.stop())
+
+
+@pytest.fixture
+def http_client(event_loop):
+    http_client = HTTP2Client()
+    yield http_client
+    event_loop.run_until_complete(http_client.close())
+
+
+@pytest.fixture
+def swagger_client(event_loop, http2_server, http_client):
+    return event_loop.run_until_complete(
+        SwaggerClient.from_url('{0}/swagger.yaml'.format(http2_server), http_client=http_client),
+    )
+
+
+def test_service_call(event_loop, swagger_client):
+    pet = event_loop.run_until_complete(swagger_client.pet.getPetById(petId=42).result(timeout=1))
+
+    assert pet.id == 42
+    assert pet.name == 'Lili'
+
+
+def test_error_response(event_loop, swagger_client):
+    with pytest.raises(HTTPNotFound):
+        event_loop.run_until_complete(swagger_client.pet.getPetById(petId=5).result(timeout=1))
+
+
+def test_refused_connection_raises_bravado_connection_error(event_loop, petstore_dict, http_client, closed_port_url):
+    spec_dict = dict(petstore_dict, host=closed_port_url.split('://')[1], schemes=['http'])
+    client = SwaggerClient.from_spec(spec_dict, http_client=http_client)
+
+    with pytest.raises(BravadoConnectionError) as excinfo:
+        event_loop.run_until_complete(client.pet.getPetById(petId=1).result(timeout=5))
+
+    assert isinstance(excinfo.value, OSError)
+
+
+@pytest.mark.parametrize('exception', [
+    HTTP2ConnectionError('Connection closed'),
+    h2.exceptions.ProtocolError('Invalid frame'),
+    ConnectionResetError(),
+])
+def test_connection_errors(exception):
+    error = convert_error(HTTP2FutureAdapter(Mock()), exception)
+
+    assert isinstance(error, BravadoConnectionError)
+    assert error.args == exception.args
+
+
+def test_concurrent_calls_share_one_connection(event_loop, swagger_client, http_client):
+    async def get_pets():
+        futures = [swagger_client.pet.getPetById(petId=pet_id) for pet_id in range(10, 60)]
+        return await asyncio.gather(*[future.result(timeout=1) for future in futures])
+
+    pets = event_loop.run_until_complete(get_pets())
+
+    assert [pet.id for pet in pets] == list(range(10, 60))
+    assert [len(pool) for pool in http_client._pools.values()] == [1]
+
+
+def test_streams_are_limited_per_connection(event_loop, http2_server):
+    http_client = HTTP2Client(connections_per_host=2, max_streams_per_connection=5)
+
+    async def get_echoes():
+        futures = [
+            http_client.request({'method': 'GET', 'url': '{0}/echo/{1}'.format(http2_server, index)})
+            for index in range(30)
+        ]
+        responses = await asyncio.gather(*[future.result(timeout=1) for future in futures])
+        return [(await response.json())['path'] for response in responses]
+
+    try:
+        assert event_loop.run_until_complete(get_echoes()) == ['/echo/{0}'.format(index) for index in range(30)]
+        assert [len(pool) for pool in http_client._pools.values()] == [2]
+    finally:
+        event_loop.run_until_complete(http_client.close())
+
+
+def test_large_request_body(event_loop, http2_server, http_client):
+    body = 'x' * 200000
+    future = http_client.request({
+        'method': 'POST',
+        'url': '{0}/echo'.format(http2_server),
+        'headers': {'Content-Type': 'text/plain', 'Connection': 'keep-alive'},
+        'data': body,
+    })
+
+    response = event_loop.run_until_complete(future.result(timeout=5))
+    echo = event_loop.run_until_complete(response.json())
+
+    assert echo['body'] == body
+    assert echo['headers']['content-type'] == 'text/plain'
+    assert 'connection' not in echo['headers']
+    assert response.headers['Content-Type'] == 'application/json'
+
+
+def test_cancel_after_the_response_ended(event_loop, http2_server):
+    port = int(http2_server.rsplit(':', 1)[1])
+
+    async def cancel_request():
+        connection = await HTTP2Connection.open('127.0.0.1', port)
+        try:
+            task = asyncio.ensure_future(
+                connection.request('GET', 'http', '127.0.0.1', '/echo', [('user-agent', 'test')]),
+            )
+            while not connection._streams:
+                await asyncio.sleep(0)
+            stream, = connection._streams.values()
+            set_result = stream.set_result
+
+            def set_result_and_cancel():
+                # The stream is closed but the request has not resumed yet
+                set_result()
+                task.cancel()
+            stream.set_result = set_result_and_cancel
+
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            assert connection.open_streams == 0
+        finally:
+            await connection.close()
+
+    event_loop.run_until_complete(cancel_request())
+
+
+def test_encode_request_query_and_form():
+    scheme, host, port, authority, path, headers, body = encode_request({
+        'method': 'POST',
+        'url': 'http://localhost:8080/pet/1?foo=bar',
+        'params': {'status': ['available', 'sold'], 'limit': 10},
+        'headers': {'userId': 42},
+        'data': {'name': 'Vivi'},
+    })
+
+    assert (scheme, host, port, authority) == ('http', 'localhost', 8080, 'localhost:8080')
+    assert path == '/pet/1?foo=bar&status=available&status=sold&limit=10'
+    assert headers == [
+        ('userid', '42'),
+        ('content-type', 'application/x-www-form-urlencoded'),
+        ('content-length', '9'),
+    ]
+    assert body == b'name=Vivi'
+
+
+def test_encode_request_files():
+    _, _, port, _, path, headers, body = encode_request({
+        'method': 'POST',
+        'url': 'https://localhost/pet/1/uploadImage',
+        'data': {'userId': 12},
+        'files': [('file', ('sample.jpg', io.BytesIO(b'image')))],
+    })
+
+    content_type = dict(headers)['content-type']
+    boundary = content_type.split('boundary=')[1]
+    assert port == 443
+    assert path == '/pet/1/uploadImage'
+    assert content_type.startswith('multipart/form-data; ')
+    assert b'name="userId"\r\n\r\n12\r\n' in body
+    assert b'filename="sample.jpg"' in body
+    assert body.endswith('--{0}--\r\n'.format(boundary).encode('utf-8'))
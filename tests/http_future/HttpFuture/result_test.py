@@ -1,10 +1,16 @@
 # -*- coding: utf-8 -*-
+import asyncio
+
+import aiohttp
 import pytest
+from aiohttp import web
 from bravado_core.operation import Operation
 from bravado_core.response import IncomingResponse
 from mock import Mock
 from mock import patch
 
+from aiobravado.exception import BravadoConnectionError
+from aiobravado.exception import BravadoTimeoutError
 from aiobravado.exception import HTTPError
 from aiobravado.http_future import FutureAdapter
 from aiobravado.http_future import HttpFuture
@@ -105,3 +111,26 @@ def test_also_return_response_true(mock_unmarshal_response, mock_future_adapter,
 
     assert http_response == response_adapter_instance
     assert swagger_result == 'hello world'
+
+
+@pytest.mark.asyncio
+async def test_real_timeout_raises_bravado_timeout_error(make_local_client, local_server):
+    async def handler(request):
+        await asyncio.sleep(1)
+        return web.json_response({})
+
+    async with local_server(handler) as url:
+        client = make_local_client(url)
+        with pytest.raises(BravadoTimeoutError) as excinfo:
+            await client.pet.getPetById(petId=1).result(timeout=0.05)
+
+    assert isinstance(excinfo.value, asyncio.TimeoutError)
+
+
+@pytest.mark.asyncio
+async def test_refused_connection_raises_bravado_connection_error(make_local_client, closed_port_url):
+    client = make_local_client(closed_port_url)
+    with pytest.raises(BravadoConnectionError) as excinfo:
+        await client.pet.getPetById(petId=1).result(timeout=5)
+
+    assert isinstance(excinfo.value, aiohttp.ClientConnectionError)
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+import json
+
+import pytest
+from bravado_core.response import IncomingResponse
+from mock import Mock
+
+from aiobravado.client import SwaggerClient
+from aiobravado.exception import HTTPError
+from aiobravado.http_future import FutureAdapter
+from aiobravado.http_future import HttpFuture
+
+
+class StreamReader(object):
+
+    def __init__(self, body, chunk_size):
+        self.chunks = [body[index:index + chunk_size] for index in range(0, len(body), chunk_size)]
+        self.read_count = 0
+
+    async def readany(self):
+        self.read_count += 1
+        return self.chunks.pop(0) if self.chunks else b''
+
+
+class ResponseAdapter(IncomingResponse):
+
+    def __init__(self, inner_response):
+        self.inner_response = inner_response
+        self.status_code = inner_response.status_code
+        self.headers = {'content-type': 'application/json'}
+        self.reason = 'OK'
+
+    @property
+    async def raw_bytes(self):
+        return self.inner_response.body
+
+    async def json(self, **kwargs):
+        return json.loads(self.inner_response.body.decode('utf-8'))
+
+
+def make_http_future(operation, body, status_code=200, chunk_size=16, streamed=True):
+    inner_response = Mock(status_code=status_code, body=body, spec=['status_code', 'body', 'content'])
+    if streamed:
+        inner_response.content = StreamReader(body, chunk_size)
+    else:
+        del inner_response.content
+
+    async def result(timeout=None):
+        return inner_response
+
+    return HttpFuture(
+        future=Mock(spec=FutureAdapter, result=result, timeout_errors=None),
+        response_adapter=ResponseAdapter,
+        operation=operation,
+    )
+
+
+@pytest.fixture
+def find_pets_operation(petstore_dict):
+    return SwaggerClient.from_spec(petstore_dict).pet.findPetsByStatus.operation
+
+
+@pytest.fixture
+def pets():
+    return [{'id': pet_id, 'name': 'pet-{0}'.format(pet_id), 'photoUrls': []} for pet_id in range(5)]
+
+
+async def collect(streamed_result):
+    return [item async for item in streamed_result]
+
+
+@pytest.mark.parametrize('streamed', [True, False])
+def test_stream_yields_unmarshalled_items(find_pets_operation, pets, streamed, event_loop):
+    body = json.dumps(pets).encode('utf-8')
+    http_future = make_http_future(find_pets_operation, body, streamed=streamed)
+
+    result = event_loop.run_until_complete(collect(http_future.stream()))
+
+    Pet = find_pets_operation.swagger_spec.definitions['Pet']
+    assert all(isinstance(pet, Pet) for pet in result)
+    assert [pet.id for pet in result] == [pet['id'] for pet in pets]
+
+
+def test_stream_reads_body_incrementally(find_pets_operation, pets, event_loop):
+    body = json.dumps(pets).encode('utf-8')
+    http_future = make_http_future(find_pets_operation, body, chunk_size=16)
+    streamed_result = http_future.stream()
+
+    first_pet = event_loop.run_until_complete(streamed_result.__anext__())
+
+    assert first_pet.id == 0
+    # The rest of the body has not been read yet
+    assert streamed_result._parser is not None
+
+
+def test_stream_runs_response_callbacks_at_the_end(find_pets_operation, pets, event_loop):
+    callback = Mock()
+    http_future = make_http_future(find_pets_operation, json.dumps(pets).encode('utf-8'))
+    http_future.response_callbacks = [callback]
+
+    event_loop.run_until_complete(collect(http_future.stream()))
+
+    assert callback.call_count == 1
+
+
+def test_stream_non_streamable_error_response(find_pets_operation, event_loop):
+    http_future = make_http_future(find_pets_operation, b'{}', status_code=400)
+
+    with pytest.raises(HTTPError) as excinfo:
+        event_loop.run_until_complete(collect(http_future.stream()))
+
+    assert excinfo.value.status_code == 400
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+import asyncio
+
+import pytest
+from aiohttp import web
+
+from aiobravado.circuit_breaker import BreakerRegistry
+from aiobravado.concurrency_limit import LimiterRegistry
+from aiobravado.http_future import FutureAdapter
+from aiobravado.http_future import FutureWrapper
+from aiobravado.response_cache import LRUResponseCache
+from aiobravado.retry import RetryPolicy
+
+PET = {'id': 1, 'name': 'Lili', 'photoUrls': []}
+
+WRAPPER_CONFIGS = [
+    {'concurrency_limiters': LimiterRegistry()},
+    {'circuit_breakers': BreakerRegistry()},
+    {'retry_policy': RetryPolicy(backoff=0)},
+    {'response_cache': LRUResponseCache()},
+    {'coalesce_requests': True},
+]
+
+
+@pytest.mark.parametrize('config', WRAPPER_CONFIGS)
+@pytest.mark.asyncio
+async def test_streaming_through_wrappers_is_rejected(make_local_client, closed_port_url, config):
+    future = make_local_client(closed_port_url, config=config).pet.findPetsByStatus(status=['available'])
+
+    assert isinstance(future, FutureWrapper)
+    with pytest.raises(ValueError) as excinfo:
+        future.stream()
+    assert 'can not be streamed' in str(excinfo.value)
+
+    await asyncio.gather(future.result(timeout=5), return_exceptions=True)
+
+
+@pytest.mark.parametrize('config', WRAPPER_CONFIGS[3:])
+@pytest.mark.asyncio
+async def test_response_of_shared_and_cached_calls_is_rejected(make_local_client, config, local_server):
+    async def handler(request):
+        return web.json_response(PET, headers={'Cache-Control': 'max-age=60'})
+
+    async with local_server(handler) as url:
+        client = make_local_client(url, config=config)
+        future = client.pet.getPetById(petId=1)
+        with pytest.raises(TypeError) as excinfo:
+            await future.response(timeout=5)
+        assert 'only be read through result()' in str(excinfo.value)
+
+        pet, response = await client.pet.getPetById(
+            petId=1, _request_options={'also_return_response': True}).result(timeout=5)
+
+    assert pet.name == 'Lili'
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize('config', WRAPPER_CONFIGS)
+@pytest.mark.asyncio
+async def test_wrappers_expose_the_call(make_local_client, config, local_server):
+    async def handler(request):
+        return web.json_response(PET)
+
+    async with local_server(handler) as url:
+        client = make_local_client(url, config=config)
+        future = client.pet.getPetById(petId=1)
+        assert future.operation is client.pet.getPetById.operation
+
+        pet = await future.result(timeout=5)
+
+    assert pet.name == 'Lili'
+    assert isinstance(future.future, FutureAdapter)
+
+
+@pytest.mark.parametrize('config', WRAPPER_CONFIGS[:3])
+@pytest.mark.asyncio
+async def test_cancel_through_wrappers(make_local_client, config, local_server):
+    requests = []
+
+    async def handler(request):
+        requests.append(request.path)
+        await asyncio.sleep(1)
+        return web.json_response(PET)
+
+    async with local_server(handler) as url:
+        future = make_local_client(url, config=config).pet.getPetById(petId=1)
+        result = asyncio.ensure_future(future.result(timeout=5))
+        await asyncio.sleep(0.1)
+
+        future.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await result
+
+    assert requests == ['/v2/pet/1']
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+import gc
+import weakref
+
+import mock
+import pytest
+from bravado_core.exception import MatchingResponseNotFound
+from bravado_core.spec import Spec
+from bravado_core.unmarshal import unmarshal_schema_object
+
+from aiobravado.http_future import get_unmarshal_plan
+
+
+@pytest.fixture
+def empty_swagger_spec():
+    return Spec(spec_dict={})
+
+
+@pytest.fixture
+def mock_get_response_spec():
+    with mock.patch('aiobravado.http_future.get_response_spec') as m:
+        m.return_value = {
+            'description': 'Days of the week',
+            'schema': {'type': 'array', 'items': {'type': 'string'}},
+        }
+        yield m
+
+
+def test_plan_is_cached_per_status_code(mock_get_response_spec, empty_swagger_spec):
+    op = mock.Mock(swagger_spec=empty_swagger_spec)
+
+    plan = get_unmarshal_plan(op, 200)
+
+    assert get_unmarshal_plan(op, 200) is plan
+    assert get_unmarshal_plan(op, 201) is not plan
+    assert mock_get_response_spec.call_count == 2
+
+
+def test_plans_do_not_keep_the_spec_alive(petstore_dict):
+    swagger_spec = Spec.from_dict(petstore_dict)
+    get_unmarshal_plan(swagger_spec.resources['pet'].operations['getPetById'], 200)
+    spec_ref = weakref.ref(swagger_spec)
+
+    del swagger_spec
+    gc.collect()
+
+    assert spec_ref() is None
+
+
+def test_plan_without_schema(mock_get_response_spec, empty_swagger_spec):
+    mock_get_response_spec.return_value = {'description': 'No content'}
+    plan = get_unmarshal_plan(mock.Mock(swagger_spec=empty_swagger_spec), 204)
+    assert not plan.has_schema
+
+
+def test_matching_response_not_found_is_not_cached(mock_get_response_spec, empty_swagger_spec):
+    op = mock.Mock(swagger_spec=empty_swagger_spec)
+    mock_get_response_spec.side_effect = MatchingResponseNotFound('boo')
+
+    with pytest.raises(MatchingResponseNotFound):
+        get_unmarshal_plan(op, 404)
+    with pytest.raises(MatchingResponseNotFound):
+        get_unmarshal_plan(op, 404)
+    assert mock_get_response_spec.call_count == 2
+
+
+def test_passthrough_plan_returns_value_unchanged(mock_get_response_spec, empty_swagger_spec):
+    value = ['Monday', 'Tuesday']
+    plan = get_unmarshal_plan(mock.Mock(swagger_spec=empty_swagger_spec), 200)
+    assert plan.unmarshal(value) is value
+
+
+@pytest.mark.parametrize('config', [{}, {'include_missing_properties': False}, {'use_models': False}])
+def test_models_plan_matches_bravado_core(petstore_dict, config):
+    swagger_spec = Spec.from_dict(petstore_dict, config=config)
+    schema = {'type': 'array', 'items': {'$ref': '#/definitions/Pet'}}
+    value = [
+        {'id': 1, 'name': 'Bo', 'photoUrls': [], 'category': {'id': 2}, 'tags': [{'name': 'dog'}], 'extra': 1},
+        {'id': 2, 'name': 'Mo', 'photoUrls': ['a'], 'category': None},
+        None,
+    ]
+    op = mock.Mock(swagger_spec=swagger_spec)
+
+    with mock.patch('aiobravado.http_future.get_response_spec', return_value={'description': '', 'schema': schema}):
+        result = get_unmarshal_plan(op, 200).unmarshal(value)
+
+    expected = unmarshal_schema_object(swagger_spec, schema, value)
+    assert result == expected
+    assert [type(pet) for pet in result] == [type(pet) for pet in expected]
+    if swagger_spec.config['use_models']:
+        assert isinstance(result[0], swagger_spec.definitions['Pet'])
+        assert isinstance(result[0].category, swagger_spec.definitions['Category'])
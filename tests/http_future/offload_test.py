@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+import json
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from mock import Mock
+from mock import patch
+
+from aiobravado.http_future import should_offload
+from aiobravado.http_future import unmarshal_response_inner
+
+PET = {'id': 1, 'name': 'Lili', 'photoUrls': []}
+
+
+@pytest.mark.parametrize('threshold, headers, expected', [
+    (None, {'content-length': '100000'}, False),
+    (1000, {'content-length': '100000'}, True),
+    (1000, {'content-length': '10'}, False),
+    (1000, {}, False),
+    (1000, {'content-length': '100000', 'content-type': 'application/json; charset=latin-1'}, False),
+])
+def test_should_offload(threshold, headers, expected):
+    response = Mock(headers=headers)
+    content_type = headers.get('content-type', 'application/json')
+    assert should_offload(response, content_type, {'offload_threshold': threshold}) is expected
+
+
+@pytest.mark.asyncio
+async def test_large_responses_are_unmarshalled_in_the_executor(make_operation, fake_response):
+    threads = []
+
+    def json_decoder(body):
+        threads.append(threading.current_thread())
+        return json.loads(body.decode('utf-8'))
+
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='offload')
+    operation = make_operation(
+        offload_threshold=10,
+        offload_executor=executor,
+        json_decoder=json_decoder,
+        validate_responses=True,
+    )
+
+    with patch('aiobravado.http_future.validate_schema_object') as mock_validate:
+        mock_validate.side_effect = lambda *args: threads.append(threading.current_thread())
+        pet = await unmarshal_response_inner(fake_response(PET), operation)
+
+    assert pet.name == 'Lili'
+    assert len(threads) == 2
+    assert all(thread.name.startswith('offload') for thread in threads)
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_small_responses_stay_on_the_event_loop(make_operation, fake_response):
+    operation = make_operation(offload_threshold=10 ** 6)
+
+    with patch('aiobravado.http_future.run_in_offload_executor') as mock_run:
+        pet = await unmarshal_response_inner(fake_response(PET), operation)
+
+    assert pet.name == 'Lili'
+    assert not mock_run.called
+
+
+@pytest.mark.asyncio
+async def test_default_json_decoding_is_offloaded(make_operation, fake_response):
+    threads = []
+
+    def json_loads_bytes(body):
+        threads.append(threading.current_thread())
+        return json.loads(body.decode('utf-8'))
+
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='offload')
+    operation = make_operation(offload_threshold=10, offload_executor=executor)
+    response = fake_response(PET)
+
+    with patch('aiobravado.http_future.json_loads_bytes', json_loads_bytes), \
+            patch.object(response, 'json', wraps=response.json) as mock_json:
+        pet = await unmarshal_response_inner(response, operation)
+
+    assert pet.name == 'Lili'
+    assert [thread.name.startswith('offload') for thread in threads] == [True]
+    assert not mock_json.called
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_http_client_decodes_without_raw_bytes(make_operation, fake_response):
+    executor = ThreadPoolExecutor(max_workers=1)
+    operation = make_operation(offload_threshold=10, offload_executor=executor)
+    response = fake_response(PET)
+
+    with patch.object(type(response), 'raw_bytes', property(Mock(side_effect=NotImplementedError))), \
+            patch.object(response, 'json', wraps=response.json) as mock_json:
+        pet = await unmarshal_response_inner(response, operation)
+
+    assert pet.name == 'Lili'
+    assert mock_json.called
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_process_pools_only_decode(make_operation, fake_response):
+    executor = ProcessPoolExecutor(max_workers=1)
+    operation = make_operation(offload_threshold=10, offload_executor=executor)
+
+    pet = await unmarshal_response_inner(fake_response(PET), operation)
+
+    assert pet.name == 'Lili'
+    executor.shutdown()
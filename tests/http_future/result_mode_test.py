@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+import datetime
+
+import pytest
+from mock import patch
+
+from aiobravado.client import SwaggerClient
+from aiobravado.coalescing import make_request_key
+from aiobravado.response_cache import LRUResponseCache
+
+PET = {
+    'id': 1,
+    'name': 'Lili',
+    'photoUrls': [],
+    'category': {'id': 2, 'name': 'cats'},
+    'birthDate': '2017-01-02',
+}
+
+
+@pytest.fixture
+def body():
+    return PET
+
+
+@pytest.fixture
+def http_client(make_fake_http_client, fake_response, body):
+    return make_fake_http_client(lambda: fake_response(body, headers={'cache-control': 'max-age=60'}))
+
+
+@pytest.fixture
+def make_client(petstore_dict, http_client):
+    petstore_dict['definitions']['Pet']['properties']['birthDate'] = {'type': 'string', 'format': 'date'}
+
+    def make_client(**config):
+        return SwaggerClient.from_spec(petstore_dict, http_client=http_client, config=config)
+    return make_client
+
+
+@pytest.mark.asyncio
+async def test_models_by_default(make_client):
+    client = make_client()
+    pet = await client.pet.getPetById(petId=1).result()
+
+    assert isinstance(pet, client.get_model('Pet'))
+    assert pet.birthDate == datetime.date(2017, 1, 2)
+
+
+@pytest.mark.asyncio
+async def test_raw_mode(make_client):
+    client = make_client(validate_responses=True)
+
+    with patch('aiobravado.http_future.validate_schema_object') as mock_validate:
+        pet = await client.pet.getPetById(petId=1, _request_options={'result_mode': 'raw'}).result()
+
+    assert pet == PET
+    assert not mock_validate.called
+
+
+@pytest.mark.parametrize('compact_models', [False, True])
+@pytest.mark.asyncio
+async def test_dicts_mode(make_client, compact_models):
+    client = make_client(compact_models=compact_models)
+    pet = await client.pet.getPetById(petId=1, _request_options={'result_mode': 'dicts'}).result()
+
+    assert type(pet) is dict
+    assert type(pet['category']) is dict
+    assert pet['category'] == {'id': 2, 'name': 'cats'}
+    assert pet['birthDate'] == datetime.date(2017, 1, 2)
+    assert pet['status'] is None
+
+
+@pytest.mark.parametrize('body', [[PET, PET]])
+@pytest.mark.asyncio
+async def test_streamed_dicts(make_client, body):
+    client = make_client()
+
+    future = client.pet.findPetsByStatus(status=['available'], _request_options={'result_mode': 'dicts'})
+    pets = [pet async for pet in future.stream()]
+
+    assert [pet['birthDate'] for pet in pets] == [datetime.date(2017, 1, 2)] * 2
+
+
+@pytest.mark.asyncio
+async def test_cached_results_are_kept_per_result_mode(make_client, http_client):
+    client = make_client(response_cache=LRUResponseCache(), response_cache_mode='result')
+
+    pet = await client.pet.getPetById(petId=1).result()
+    raw_pet = await client.pet.getPetById(petId=1, _request_options={'result_mode': 'raw'}).result()
+    cached_raw_pet = await client.pet.getPetById(petId=1, _request_options={'result_mode': 'raw'}).result()
+
+    assert isinstance(pet, client.get_model('Pet'))
+    assert raw_pet == cached_raw_pet == PET
+    assert http_client.request.call_count == 2
+
+
+def test_unknown_result_mode(make_client):
+    with pytest.raises(ValueError):
+        make_client().pet.getPetById(petId=1, _request_options={'result_mode': 'objects'})
+
+
+def test_request_keys_depend_on_result_mode():
+    request = {'method': 'GET', 'url': 'http://localhost/pet/1', 'headers': {}}
+    assert make_request_key('getPetById', request, False) == make_request_key('getPetById', request, False, 'models')
+    assert make_request_key('getPetById', request, False) != make_request_key('getPetById', request, False, 'raw')
@@ -131,3 +131,49 @@ def test_performs_validation(
     op = mock.Mock(swagger_spec=empty_swagger_spec)
     event_loop.run_until_complete(unmarshal_response_inner(response, op))
     assert mock_validate_schema_object.call_count == 1
+
+
+def test_json_decoder_from_config(mock_get_response_spec, empty_swagger_spec, response_spec, event_loop):
+    empty_swagger_spec.config['json_decoder'] = mock.Mock(return_value='Monday')
+    response = mock.Mock(
+        spec=IncomingResponse,
+        status_code=200,
+        headers={'content-type': APP_JSON},
+        raw_bytes=coroutine(lambda: b'"Sunday"')(),
+    )
+
+    mock_get_response_spec.return_value = response_spec
+    op = mock.Mock(swagger_spec=empty_swagger_spec)
+    assert 'Monday' == event_loop.run_until_complete(unmarshal_response_inner(response, op))
+    empty_swagger_spec.config['json_decoder'].assert_called_once_with(b'"Sunday"')
+
+
+def test_json_decoder_skipped_for_non_utf8_charset(
+    mock_get_response_spec, empty_swagger_spec, response_spec, event_loop,
+):
+    empty_swagger_spec.config['json_decoder'] = mock.Mock()
+    response = mock.Mock(
+        spec=IncomingResponse,
+        status_code=200,
+        headers={'content-type': APP_JSON + '; charset=latin-1'},
+        json=coroutine(mock.Mock(return_value='Monday')),
+    )
+
+    mock_get_response_spec.return_value = response_spec
+    op = mock.Mock(swagger_spec=empty_swagger_spec)
+    assert 'Monday' == event_loop.run_until_complete(unmarshal_response_inner(response, op))
+    assert empty_swagger_spec.config['json_decoder'].call_count == 0
+
+
+def test_msgpack_decoder_from_config(mock_get_response_spec, empty_swagger_spec, response_spec, event_loop):
+    empty_swagger_spec.config['msgpack_decoder'] = mock.Mock(return_value='Monday')
+    response = mock.Mock(
+        spec=IncomingResponse,
+        status_code=200,
+        headers={'content-type': APP_MSGPACK},
+        raw_bytes=coroutine(lambda: msgpack.dumps('Sunday'))(),
+    )
+
+    mock_get_response_spec.return_value = response_spec
+    op = mock.Mock(swagger_spec=empty_swagger_spec)
+    assert 'Monday' == event_loop.run_until_complete(unmarshal_response_inner(response, op))
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+import pytest
+from mock import Mock
+
+from aiobravado.client import SwaggerClient
+from aiobravado.http_future import FutureAdapter
+from aiobravado.http_future import HttpFuture
+from aiobravado.instrumentation import HistogramInstrumentation
+from aiobravado.instrumentation import Instrumentation
+from aiobravado.instrumentation import measure
+from aiobravado.instrumentation import measure_async
+from aiobravado.instrumentation import MultiInstrumentation
+from aiobravado.instrumentation import SpanInstrumentation
+
+
+class RecordingInstrumentation(Instrumentation):
+
+    def __init__(self):
+        self.observations = []
+
+    def observe(self, phase, operation, start, duration, error=None):
+        self.observations.append((phase, operation.operation_id, duration, error))
+
+
+class PetResponse(object):
+
+    status_code = 200
+    reason = 'OK'
+    headers = {'content-type': 'application/json'}
+
+    async def json(self):
+        return {'id': 1, 'name': 'Lili', 'photoUrls': []}
+
+
+class PetFutureAdapter(FutureAdapter):
+
+    async def result(self, timeout=None):
+        return PetResponse()
+
+
+def test_measure_without_instrumentation_calls_the_function():
+    func = Mock(return_value=42)
+    assert measure(None, 'unmarshal', Mock(), func, 1, 2) == 42
+    func.assert_called_once_with(1, 2)
+
+
+def test_measure_async_without_instrumentation_returns_the_awaitable():
+    awaitable = Mock()
+    assert measure_async(None, 'network', Mock(), awaitable) is awaitable
+
+
+def test_measure_reports_errors():
+    instrumentation = RecordingInstrumentation()
+    error = ValueError()
+
+    with pytest.raises(ValueError):
+        measure(instrumentation, 'validate', Mock(operation_id='getPetById'), Mock(side_effect=error))
+
+    [(phase, operation_id, duration, reported_error)] = instrumentation.observations
+    assert (phase, operation_id, reported_error) == ('validate', 'getPetById', error)
+    assert duration >= 0
+
+
+@pytest.mark.asyncio
+async def test_measure_async_reports_the_duration():
+    instrumentation = RecordingInstrumentation()
+
+    async def network():
+        return 'response'
+
+    result = await measure_async(instrumentation, 'network', Mock(operation_id='getPetById'), network())
+
+    assert result == 'response'
+    assert [observation[:2] for observation in instrumentation.observations] == [('network', 'getPetById')]
+
+
+def test_span_instrumentation():
+    tracer = Mock()
+    error = ValueError()
+
+    SpanInstrumentation(tracer).observe('decode', Mock(operation_id='getPetById'), 10.0, 0.5, error)
+
+    tracer.start_span.assert_called_once_with(
+        'aiobravado.decode',
+        start_time=10000000000,
+        attributes={'aiobravado.operation_id': 'getPetById'},
+    )
+    span = tracer.start_span.return_value
+    span.record_exception.assert_called_once_with(error)
+    span.end.assert_called_once_with(end_time=10500000000)
+
+
+def test_histogram_instrumentation():
+    histogram = Mock()
+
+    HistogramInstrumentation(histogram).observe('unmarshal', Mock(operation_id='getPetById'), 10.0, 0.5)
+
+    histogram.labels.assert_called_once_with(operation='getPetById', phase='unmarshal')
+    histogram.labels.return_value.observe.assert_called_once_with(0.5)
+
+
+def test_multi_instrumentation():
+    instrumentations = [Mock(), Mock()]
+    operation = Mock()
+
+    MultiInstrumentation(*instrumentations).observe('network', operation, 10.0, 0.5)
+
+    for instrumentation in instrumentations:
+        instrumentation.observe.assert_called_once_with('network', operation, 10.0, 0.5, None)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('validate_responses, phases', [
+    (False, ['construct_request', 'network', 'decode', 'unmarshal']),
+    (True, ['construct_request', 'network', 'decode', 'validate', 'unmarshal']),
+])
+async def test_client_reports_every_phase(petstore_dict, validate_responses, phases):
+    instrumentation = RecordingInstrumentation()
+    client = SwaggerClient.from_spec(
+        petstore_dict,
+        http_client=Mock(),
+        config={'instrumentation': instrumentation, 'validate_responses': validate_responses},
+    )
+    operation = client.pet.getPetById.operation
+    client.swagger_spec.http_client.request.side_effect = lambda *args, **kwargs: HttpFuture(
+        PetFutureAdapter(), lambda response: response, operation=operation)
+
+    pet = await client.pet.getPetById(petId=1).result()
+
+    assert pet.name == 'Lili'
+    assert [observation[0] for observation in instrumentation.observations] == phases
+    assert all(observation[1] == 'getPetById' for observation in instrumentation.observations)
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+import json
+
+import pytest
+
+from aiobravado.json_stream import JSONArrayStreamParser
+
+
+def parse_in_chunks(body, chunk_size):
+    parser = JSONArrayStreamParser()
+    items = []
+    for index in range(0, len(body), chunk_size):
+        items.extend(parser.feed(body[index:index + chunk_size]))
+    items.extend(parser.close())
+    return items
+
+
+@pytest.mark.parametrize('value', [
+    [],
+    [1, 22, 333],
+    [{'name': 'Fido', 'tags': [{'id': 1}]}, None, True, 'a,]"b', -1.5e3],
+    [u'caf\xe9', u'☃'],
+])
+@pytest.mark.parametrize('chunk_size', [1, 3, 1024])
+def test_parse_in_chunks(value, chunk_size):
+    body = json.dumps(value, ensure_ascii=False, indent=1).encode('utf-8')
+    assert parse_in_chunks(body, chunk_size) == value
+
+
+def test_items_are_returned_as_soon_as_complete():
+    parser = JSONArrayStreamParser()
+    assert parser.feed(b'[{"id": 1}, {"id"') == [{'id': 1}]
+    assert parser.feed(b': 2}]') == [{'id': 2}]
+    assert parser.close() == []
+
+
+def test_number_at_chunk_boundary_waits_for_more_data():
+    parser = JSONArrayStreamParser()
+    assert parser.feed(b'[12') == []
+    assert parser.feed(b'34]') == [1234]
+
+
+@pytest.mark.parametrize('body', [
+    b'{"id": 1}',
+    b'[1, 2',
+    b'[1 2]',
+    b'[1,]',
+    b'[1] [2]',
+])
+def test_invalid_body(body):
+    with pytest.raises(ValueError):
+        parse_in_chunks(body, 1024)
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+import json
+
+import pytest
+from bravado_core.response import IncomingResponse
+from bravado_core.spec import Spec
+from mock import Mock
+from mock import patch
+
+from aiobravado.client import SwaggerClient
+from aiobravado.http_future import unmarshal_response_inner
+from aiobravado.lazy_spec import LazySpec
+
+
+@pytest.fixture
+def lazy_client(petstore_dict):
+    return SwaggerClient.from_spec(petstore_dict, http_client=Mock(), config={'lazy_spec': True})
+
+
+@pytest.fixture
+def eager_client(petstore_dict):
+    return SwaggerClient.from_spec(petstore_dict, http_client=Mock())
+
+
+def test_lazy_spec_is_opt_in(eager_client, lazy_client):
+    assert type(eager_client.swagger_spec) is Spec
+    assert type(lazy_client.swagger_spec) is LazySpec
+
+
+def test_nothing_is_built_up_front(petstore_dict):
+    with patch('aiobravado.lazy_spec.Operation.from_spec') as mock_from_spec, \
+            patch('aiobravado.lazy_spec.model_discovery') as mock_model_discovery:
+        client = SwaggerClient.from_spec(petstore_dict, http_client=Mock(), config={'lazy_spec': True})
+        assert not mock_from_spec.called
+        assert not mock_model_discovery.called
+
+        client.pet
+        assert mock_from_spec.call_count == 8
+        assert mock_model_discovery.call_count == 1
+
+        client.store
+        assert mock_model_discovery.call_count == 1
+
+
+def test_models_are_discovered_on_first_lookup(petstore_dict):
+    client = SwaggerClient.from_spec(petstore_dict, http_client=Mock(), config={'lazy_spec': True})
+    with patch('aiobravado.lazy_spec.Operation.from_spec') as mock_from_spec:
+        assert client.get_model('Pet').__name__ == 'Pet'
+        assert not mock_from_spec.called
+
+
+def test_same_resources_and_models_as_eager_spec(eager_client, lazy_client):
+    eager_spec = eager_client.swagger_spec
+    lazy_spec = lazy_client.swagger_spec
+
+    assert sorted(lazy_spec.resources) == sorted(eager_spec.resources)
+    assert sorted(dir(lazy_client)) == sorted(dir(eager_client))
+    for name, resource in lazy_spec.resources.items():
+        assert sorted(resource.operations) == sorted(eager_spec.resources[name].operations)
+
+    assert sorted(lazy_spec.definitions) == sorted(eager_spec.definitions)
+    assert 'Pet' in lazy_spec.definitions
+    assert lazy_client.get_model('Pet').__name__ == 'Pet'
+    assert lazy_client.get_model('Pet') is lazy_client.get_model('Pet')
+
+
+def test_resources_are_built_once(lazy_client):
+    assert lazy_client.swagger_spec.resources['pet'] is lazy_client.swagger_spec.resources['pet']
+    assert lazy_client.pet.getPetById.operation is lazy_client.pet.getPetById.operation
+
+
+def test_resources_by_unsanitized_tag(petstore_dict):
+    petstore_dict['paths']['/pet/{petId}']['get']['tags'] = ['pet store']
+    client = SwaggerClient.from_spec(petstore_dict, http_client=Mock(), config={'lazy_spec': True})
+    resources = client.swagger_spec.resources
+
+    assert 'pet_store' in resources
+    assert 'pet store' in resources
+    assert resources['pet store'] is resources['pet_store']
+
+
+def test_operations_are_grouped_like_eager_spec(petstore_dict):
+    paths = petstore_dict['paths']
+    paths['/pet/{petId}']['get']['tags'] = []
+    paths['/pet/findByStatus']['get']['tags'] = ['pet store']
+    paths['/pet']['post']['tags'] = ['pet_store']
+    eager_resources = SwaggerClient.from_spec(petstore_dict, http_client=Mock()).swagger_spec.resources
+    resources = SwaggerClient.from_spec(
+        petstore_dict, http_client=Mock(), config={'lazy_spec': True}).swagger_spec.resources
+
+    assert sorted(resources) == sorted(eager_resources)
+    for name in list(eager_resources) + ['pet store']:
+        assert sorted(resources[name].operations) == sorted(eager_resources[name].operations)
+
+
+def test_operations_with_several_tags_are_shared(petstore_dict):
+    petstore_dict['paths']['/pet/{petId}']['get']['tags'] = ['pet', 'store']
+    client = SwaggerClient.from_spec(petstore_dict, http_client=Mock(), config={'lazy_spec': True})
+    resources = client.swagger_spec.resources
+
+    assert resources['pet'].operations['getPetById'] is resources['store'].operations['getPetById']
+
+
+def test_missing_resource(lazy_client):
+    with pytest.raises(AttributeError):
+        lazy_client.foo
+
+
+@pytest.mark.asyncio
+async def test_responses_are_unmarshalled_into_models(lazy_client):
+    response = Mock(
+        spec=IncomingResponse,
+        status_code=200,
+        headers={'content-type': 'application/json'},
+    )
+
+    async def json():
+        return {'id': 1, 'name': 'Lili', 'photoUrls': [], 'category': {'id': 2, 'name': 'cats'}}
+    response.json = json
+
+    pet = await unmarshal_response_inner(response, lazy_client.pet.getPetById.operation)
+
+    assert isinstance(pet, lazy_client.get_model('Pet'))
+    assert isinstance(pet.category, lazy_client.get_model('Category'))
+
+
+@pytest.fixture
+def remote_pet_spec_dict(petstore_dict):
+    """Petstore with the Pet model in another document."""
+    spec_dict = json.loads(
+        json.dumps(petstore_dict).replace('#/definitions/Pet"', 'definitions.json#/definitions/Pet"'))
+    del spec_dict['definitions']['Pet']
+    return spec_dict
+
+
+@pytest.fixture
+def definitions_dict(petstore_dict):
+    pet_spec = json.loads(json.dumps(petstore_dict['definitions']['Pet']).replace(
+        '#/definitions/', 'swagger.json#/definitions/'))
+    return {'definitions': {'Pet': pet_spec}}
+
+
+async def unmarshal_pet(client):
+    response = Mock(
+        spec=IncomingResponse,
+        status_code=200,
+        headers={'content-type': 'application/json'},
+    )
+
+    async def json():
+        return {'id': 1, 'name': 'Lili', 'photoUrls': [], 'category': {'id': 2, 'name': 'cats'}}
+    response.json = json
+
+    return await unmarshal_response_inner(response, client.pet.getPetById.operation)
+
+
+@pytest.mark.asyncio
+async def test_models_of_remote_refs(tmpdir, remote_pet_spec_dict, definitions_dict):
+    tmpdir.join('swagger.json').write(json.dumps(remote_pet_spec_dict))
+    tmpdir.join('definitions.json').write(json.dumps(definitions_dict))
+    origin_url = 'file://' + str(tmpdir.join('swagger.json'))
+    eager_client = SwaggerClient.from_spec(remote_pet_spec_dict, origin_url=origin_url, http_client=Mock())
+    client = SwaggerClient.from_spec(
+        remote_pet_spec_dict, origin_url=origin_url, http_client=Mock(), config={'lazy_spec': True})
+
+    pet = await unmarshal_pet(client)
+
+    assert type(pet).__name__ == 'Pet'
+    assert isinstance(pet.category, client.get_model('Category'))
+    assert sorted(client.swagger_spec.definitions) == sorted(eager_client.swagger_spec.definitions)
+
+
+@pytest.mark.asyncio
+async def test_models_of_preloaded_remote_refs(remote_pet_spec_dict, definitions_dict):
+    spec_url = 'http://localhost/swagger.json'
+    remote_documents = {'http://localhost/definitions.json': definitions_dict}
+    client = SwaggerClient.from_spec(
+        remote_pet_spec_dict, origin_url=spec_url, http_client=Mock(), config={'lazy_spec': True},
+        remote_documents=remote_documents,
+    )
+
+    pet = await unmarshal_pet(client)
+
+    assert isinstance(pet, client.get_model('Pet'))
+    assert isinstance(pet.category, client.get_model('Category'))
+
+
+@pytest.mark.asyncio
+async def test_models_of_inline_schemas(petstore_dict):
+    pet_spec = dict(petstore_dict['definitions'].pop('Pet'), **{'x-model': 'InlinePet'})
+    spec_dict = json.loads(
+        json.dumps(petstore_dict).replace(json.dumps({'$ref': '#/definitions/Pet'}), json.dumps(pet_spec)))
+    client = SwaggerClient.from_spec(spec_dict, http_client=Mock(), config={'lazy_spec': True})
+
+    pet = await unmarshal_pet(client)
+
+    assert isinstance(pet, client.get_model('InlinePet'))
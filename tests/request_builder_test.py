@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+import pytest
+from bravado_core.exception import SwaggerMappingError
+from mock import Mock
+from mock import patch
+
+from aiobravado.client import construct_request
+from aiobravado.client import SwaggerClient
+from aiobravado.request_builder import RequestBuilder
+
+
+@pytest.fixture(params=[False, True], ids=['bravado_core_validators', 'cached_validators'])
+def petstore_client(request, petstore_dict):
+    return SwaggerClient.from_spec(petstore_dict, config={'cache_request_validators': request.param})
+
+
+@pytest.mark.parametrize('resource, operation_id, op_kwargs, request_options', [
+    ('pet', 'getPetById', {'petId': 42}, {}),
+    ('pet', 'getPetById', {'petId': 42}, {'use_msgpack': True, 'timeout': 1}),
+    ('pet', 'findPetsByStatus', {'status': ['available', 'sold']}, {}),
+    ('pet', 'findPetsByStatus', {'status': ['sold']}, {'connect_timeout': 2}),
+    ('pet', 'updatePetWithForm', {'petId': '1', 'name': 'Fido'}, {}),
+    ('pet', 'deletePet', {'petId': 1}, {'headers': {'api_key': 'secret'}}),
+    ('pet', 'addPet', {'body': {'name': 'Fido', 'photoUrls': []}}, {}),
+    ('user', 'getUserByName', {'username': 'foo bar/baz'}, {}),
+])
+def test_build_matches_construct_request(petstore_client, resource, operation_id, op_kwargs, request_options):
+    operation = getattr(getattr(petstore_client, resource), operation_id).operation
+
+    expected = construct_request(operation, dict(request_options, headers={}), **op_kwargs)
+    request = RequestBuilder(operation).build(dict(request_options, headers={}), op_kwargs)
+
+    assert request == expected
+
+
+def test_build_is_repeatable(petstore_client):
+    builder = RequestBuilder(petstore_client.pet.getPetById.operation)
+    assert builder.build({}, {'petId': 1})['url'] == 'http://petstore.swagger.io/v2/pet/1'
+    assert builder.build({}, {'petId': 2})['url'] == 'http://petstore.swagger.io/v2/pet/2'
+
+
+def test_extra_parameter_error(petstore_client):
+    builder = RequestBuilder(petstore_client.pet.getPetById.operation)
+    with pytest.raises(SwaggerMappingError) as excinfo:
+        builder.build({}, {'petId': 1, 'extra_param': 'bar'})
+    assert 'does not have parameter' in str(excinfo.value)
+
+
+def test_required_parameter_missing(petstore_client):
+    builder = RequestBuilder(petstore_client.pet.getPetById.operation)
+    with pytest.raises(SwaggerMappingError) as excinfo:
+        builder.build({}, {})
+    assert 'required parameter' in str(excinfo.value)
+
+
+def test_callable_operation_uses_builder_when_enabled(petstore_dict):
+    http_client = Mock()
+    client = SwaggerClient.from_spec(
+        petstore_dict,
+        http_client=http_client,
+        config={'compile_operations': True},
+    )
+
+    with patch('aiobravado.client.construct_request') as mock_construct_request:
+        client.pet.getPetById(petId=42)
+        client.pet.getPetById(petId=43)
+
+    assert mock_construct_request.call_count == 0
+    assert client.pet.getPetById._request_builder is not None
+    assert http_client.request.call_args[0][0]['url'] == 'http://petstore.swagger.io/v2/pet/43'
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+import time
+
+import pytest
+
+from aiobravado.client import SwaggerClient
+from aiobravado.exception import HTTPNotFound
+from aiobravado.response_cache import CacheEntry
+from aiobravado.response_cache import get_freshness_lifetime
+from aiobravado.response_cache import LRUResponseCache
+from aiobravado.response_cache import parse_cache_control
+
+PET = {'id': 1, 'name': 'Fido', 'photoUrls': []}
+
+
+@pytest.fixture
+def responses():
+    return []
+
+
+@pytest.fixture
+def http_client(make_fake_http_client, responses):
+    return make_fake_http_client(lambda: responses.pop(0))
+
+
+@pytest.fixture
+def cache():
+    return LRUResponseCache()
+
+
+@pytest.fixture
+def client(petstore_dict, http_client, cache):
+    return SwaggerClient.from_spec(petstore_dict, http_client=http_client, config={'response_cache': cache})
+
+
+def sent_headers(http_client):
+    return [call[0][0]['headers'] for call in http_client.request.call_args_list]
+
+
+@pytest.mark.asyncio
+async def test_fresh_responses_are_served_from_the_cache(client, http_client, responses, fake_response):
+    responses.append(fake_response(PET, headers={'Cache-Control': 'max-age=60'}))
+
+    first = await client.pet.getPetById(petId=1).result()
+    second = await client.pet.getPetById(petId=1).result()
+
+    assert first.name == second.name == 'Fido'
+    # Unmarshalled again from the cached body
+    assert first is not second
+    assert http_client.request.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_result_mode_returns_the_cached_result(client, http_client, responses, fake_response):
+    responses.append(fake_response(PET, headers={'Cache-Control': 'max-age=60'}))
+    request_options = {'cache_mode': 'result'}
+
+    first = await client.pet.getPetById(petId=1, _request_options=request_options).result()
+    second = await client.pet.getPetById(petId=1, _request_options=request_options).result()
+
+    assert first is second
+    assert http_client.request.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_responses_are_revalidated(client, http_client, responses, fake_response):
+    responses.append(fake_response(PET, headers={'ETag': '"v1"', 'Last-Modified': 'Tue, 15 Nov 1994 12:45:26 GMT'}))
+    responses.append(fake_response(status_code=304, headers={'Cache-Control': 'max-age=60'}))
+
+    await client.pet.getPetById(petId=1).result()
+    pet = await client.pet.getPetById(petId=1).result()
+    await client.pet.getPetById(petId=1).result()
+
+    assert pet.name == 'Fido'
+    assert http_client.request.call_count == 2
+    assert sent_headers(http_client) == [
+        {},
+        {'If-None-Match': '"v1"', 'If-Modified-Since': 'Tue, 15 Nov 1994 12:45:26 GMT'},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_changed_responses_replace_the_cached_ones(client, http_client, responses, fake_response):
+    responses.append(fake_response(PET, headers={'ETag': '"v1"'}))
+    responses.append(fake_response(dict(PET, name='Rex'), headers={'ETag': '"v2"'}))
+    responses.append(fake_response(status_code=304))
+
+    await client.pet.getPetById(petId=1).result()
+    assert (await client.pet.getPetById(petId=1).result()).name == 'Rex'
+    assert (await client.pet.getPetById(petId=1).result()).name == 'Rex'
+    assert sent_headers(http_client)[2] == {'If-None-Match': '"v2"'}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('headers', [
+    {'Cache-Control': 'no-store, max-age=60'},
+    {},
+])
+async def test_uncacheable_responses(client, http_client, responses, cache, headers, fake_response):
+    responses.extend([fake_response(PET, headers=headers), fake_response(PET, headers=headers)])
+
+    await client.pet.getPetById(petId=1).result()
+    await client.pet.getPetById(petId=1).result()
+
+    assert http_client.request.call_count == 2
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_errors_are_not_cached(client, responses, cache, fake_response):
+    responses.append(fake_response(status_code=404, headers={'Cache-Control': 'max-age=60'}))
+
+    with pytest.raises(HTTPNotFound):
+        await client.pet.getPetById(petId=1).result()
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_cache_request_option(client, http_client, responses, fake_response):
+    responses.extend([fake_response(PET, headers={'Cache-Control': 'max-age=60'}) for _ in range(2)])
+
+    await client.pet.getPetById(petId=1).result()
+    await client.pet.getPetById(petId=1, _request_options={'cache': False}).result()
+
+    assert http_client.request.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_also_return_response_on_hit(client, responses, fake_response):
+    responses.append(fake_response(PET, headers={'Cache-Control': 'max-age=60'}))
+    request_options = {'also_return_response': True}
+
+    await client.pet.getPetById(petId=1, _request_options=request_options).result()
+    pet, response = await client.pet.getPetById(petId=1, _request_options=request_options).result()
+
+    assert pet.name == 'Fido'
+    assert response.status_code == 200
+    assert response.headers['Cache-Control'] == 'max-age=60'
+
+
+def test_invalid_cache_mode(client):
+    with pytest.raises(ValueError):
+        client.pet.getPetById(petId=1, _request_options={'cache_mode': 'foo'})
+
+
+@pytest.mark.asyncio
+async def test_lru_eviction():
+    cache = LRUResponseCache(max_size=2)
+    await cache.set('a', 1)
+    await cache.set('b', 2)
+    await cache.get('a')
+    await cache.set('c', 3)
+
+    assert await cache.get('a') == 1
+    assert await cache.get('b') is None
+    assert await cache.get('c') == 3
+
+
+@pytest.mark.asyncio
+async def test_lru_ttl():
+    cache = LRUResponseCache(ttl=60)
+    await cache.set('a', 1)
+    cache._entries['a'] = (time.time() - 61, 1)
+
+    assert await cache.get('a') is None
+    assert len(cache) == 0
+
+
+def test_parse_cache_control():
+    assert parse_cache_control('no-cache, Max-Age=60, private="x"') == {
+        'no-cache': None,
+        'max-age': '60',
+        'private': 'x',
+    }
+
+
+@pytest.mark.parametrize('headers, lifetime', [
+    ({}, 0),
+    ({'Cache-Control': 'max-age=60'}, 60),
+    ({'cache-control': 'public, max-age=60'}, 60),
+    ({'Cache-Control': 'no-cache, max-age=60'}, 0),
+    ({'Cache-Control': 'no-store'}, None),
+    ({'Cache-Control': 'max-age=abc'}, 0),
+])
+def test_get_freshness_lifetime(headers, lifetime):
+    assert get_freshness_lifetime(headers) == lifetime
+
+
+def test_conditional_headers():
+    entry = CacheEntry(200, 'OK', {'etag': '"v1"'}, b'')
+    assert entry.conditional_headers() == {'If-None-Match': '"v1"'}
+    assert not entry.is_fresh()
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from jsonschema.exceptions import ValidationError
+from mock import Mock
+from mock import patch
+
+from aiobravado.http_future import unmarshal_response_inner
+from aiobravado.response_validation import SampledValidator
+
+PET = {'id': 1, 'name': 'Lili', 'photoUrls': []}
+INVALID_PET = {'id': 1, 'photoUrls': []}
+
+
+@pytest.mark.parametrize('sample_rate, random_value, expected', [
+    (0, 0.0, False),
+    (1, 0.99, True),
+    (0.1, 0.05, True),
+    (0.1, 0.5, False),
+])
+def test_should_validate(sample_rate, random_value, expected):
+    validator = SampledValidator(sample_rate=sample_rate)
+    with patch('aiobravado.response_validation.random.random', return_value=random_value):
+        assert validator.should_validate(Mock(operation_id='getPetById')) is expected
+
+
+def test_sample_rate_per_operation():
+    validator = SampledValidator(sample_rate=0, sample_rates={'getPetById': 1})
+    assert validator.should_validate(Mock(operation_id='getPetById'))
+    assert not validator.should_validate(Mock(operation_id='findPetsByStatus'))
+
+
+@pytest.mark.asyncio
+async def test_failures_are_counted_and_logged(make_operation, fake_response):
+    validator = SampledValidator(sample_rate=1)
+    operation = make_operation(validate_responses=False, response_validator=validator)
+
+    with patch('aiobravado.response_validation.log') as mock_log:
+        pet = await unmarshal_response_inner(fake_response(INVALID_PET), operation)
+        await validator.drain()
+
+    assert pet.name is None
+    assert validator.metrics() == {'getPetById': {'validated': 1, 'failed': 1}}
+    assert mock_log.warning.call_count == 1
+
+    await unmarshal_response_inner(fake_response(PET), operation)
+    await validator.drain()
+    assert validator.metrics() == {'getPetById': {'validated': 2, 'failed': 1}}
+
+
+@pytest.mark.asyncio
+async def test_validation_does_not_block_the_event_loop(make_operation, fake_response):
+    release = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=1)
+    validator = SampledValidator(sample_rate=1, executor=executor)
+    operation = make_operation(validate_responses=False, response_validator=validator)
+    # Keep the only worker busy while the response is unmarshalled
+    blocker = asyncio.get_event_loop().run_in_executor(executor, release.wait)
+
+    unmarshalling = asyncio.ensure_future(unmarshal_response_inner(fake_response(PET), operation))
+    await asyncio.sleep(0.01)
+    assert not unmarshalling.done()
+
+    release.set()
+    await blocker
+    pet = await unmarshalling
+    assert pet.name == 'Lili'
+    assert validator.metrics() == {'getPetById': {'validated': 1, 'failed': 0}}
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_drain_waits_for_the_validations_of_cancelled_calls(make_operation, fake_response):
+    release = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=1)
+    validator = SampledValidator(sample_rate=1, executor=executor)
+    operation = make_operation(validate_responses=False, response_validator=validator)
+    blocker = asyncio.get_event_loop().run_in_executor(executor, release.wait)
+
+    unmarshalling = asyncio.ensure_future(unmarshal_response_inner(fake_response(PET), operation))
+    await asyncio.sleep(0.01)
+    unmarshalling.cancel()
+    draining = asyncio.ensure_future(validator.drain())
+    await asyncio.sleep(0.01)
+    assert not draining.done()
+
+    release.set()
+    await blocker
+    await draining
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_raise_errors(make_operation, fake_response):
+    validator = SampledValidator(sample_rate=1, raise_errors=True)
+    operation = make_operation(validate_responses=False, response_validator=validator)
+
+    with pytest.raises(ValidationError):
+        await unmarshal_response_inner(fake_response(INVALID_PET), operation)
+    assert validator.metrics() == {'getPetById': {'validated': 1, 'failed': 1}}
+
+
+@pytest.mark.asyncio
+async def test_validate_responses_takes_precedence(make_operation, fake_response):
+    validator = Mock(spec=SampledValidator)
+    operation = make_operation(validate_responses=True, response_validator=validator)
+
+    with pytest.raises(ValidationError):
+        await unmarshal_response_inner(fake_response(INVALID_PET), operation)
+    assert not validator.validate.called
@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+import asyncio
+
+import pytest
+from aiohttp import web
+from mock import Mock
+from mock import patch
+
+from aiobravado.client import SwaggerClient
+from aiobravado.exception import BravadoConnectionError
+from aiobravado.exception import BravadoTimeoutError
+from aiobravado.exception import HTTPServerError
+from aiobravado.retry import HedgePolicy
+from aiobravado.retry import LatencyTracker
+from aiobravado.retry import ResilientFuture
+from aiobravado.retry import RetryPolicy
+
+
+def make_request_from(http_futures):
+    http_futures = iter(http_futures)
+    return Mock(side_effect=lambda: next(http_futures))
+
+
+@pytest.mark.parametrize('status_code, error, expected', [
+    (200, None, False),
+    (503, None, True),
+    (500, None, False),
+    (404, None, False),
+    (None, BravadoTimeoutError(), True),
+    (None, BravadoConnectionError(), True),
+    (None, ValueError(), False),
+])
+def test_retry_policy_should_retry(status_code, error, expected):
+    assert RetryPolicy().should_retry(1, error=error, status_code=status_code) is expected
+
+
+def test_retry_policy_stops_after_max_attempts():
+    policy = RetryPolicy(max_attempts=2)
+    assert policy.should_retry(1, status_code=503)
+    assert not policy.should_retry(2, status_code=503)
+
+
+def test_retry_policy_retry_on_base_class():
+    policy = RetryPolicy(retry_on=(HTTPServerError,))
+    assert policy.should_retry(1, status_code=500)
+    assert policy.should_retry(1, status_code=502)
+    assert not policy.should_retry(1, status_code=400)
+
+
+def test_retry_policy_backoff():
+    policy = RetryPolicy(backoff=0.1, max_backoff=0.3, jitter=False)
+    assert [policy.get_delay(attempt) for attempt in (1, 2, 3)] == [0.1, 0.2, 0.3]
+
+    policy = RetryPolicy(backoff=0.1, max_backoff=0.3)
+    assert all(0 <= policy.get_delay(3) <= 0.3 for _ in range(100))
+
+
+def test_retry_policy_from_dict():
+    policy = RetryPolicy.from_dict({'max_attempts': 5, 'retry_on': ['HTTPServerError'], 'methods': ['get']})
+    assert policy.max_attempts == 5
+    assert policy.retry_on == (HTTPServerError,)
+    assert policy.methods == frozenset(['GET'])
+
+
+def test_latency_tracker_quantile():
+    tracker = LatencyTracker(size=100)
+    assert tracker.quantile(0.95) is None
+
+    for latency in range(1, 201):
+        tracker.record(latency)
+    assert len(tracker) == 100
+    assert tracker.quantile(0.95) == 195
+    assert tracker.quantile(0) == 101
+
+
+def test_hedge_policy_delay():
+    tracker = LatencyTracker()
+    assert HedgePolicy(delay=0.2).get_delay(tracker) == 0.2
+
+    policy = HedgePolicy(min_samples=2)
+    tracker.record(0.1)
+    assert policy.get_delay(tracker) is None
+    tracker.record(0.3)
+    assert policy.get_delay(tracker) == 0.3
+
+
+@pytest.mark.asyncio
+async def test_retries_until_success(fake_http_future):
+    make_request = make_request_from([
+        fake_http_future(error=BravadoTimeoutError()),
+        fake_http_future(status_code=503),
+        fake_http_future(status_code=200),
+    ])
+    future = ResilientFuture(make_request, 'GET', retry_policy=RetryPolicy(backoff=0))
+
+    assert await future.result() == 200
+    assert make_request.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_returns_last_response_once_attempts_are_exhausted(fake_http_future):
+    make_request = make_request_from([fake_http_future(status_code=503), fake_http_future(status_code=503)])
+    future = ResilientFuture(make_request, 'GET', retry_policy=RetryPolicy(max_attempts=2, backoff=0))
+
+    incoming_response = await future.response()
+
+    assert incoming_response.status_code == 503
+    assert make_request.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_non_idempotent_calls_are_not_retried(fake_http_future):
+    make_request = make_request_from([fake_http_future(error=BravadoTimeoutError())])
+    future = ResilientFuture(make_request, 'POST', retry_policy=RetryPolicy(backoff=0))
+
+    with pytest.raises(BravadoTimeoutError):
+        await future.result()
+    assert make_request.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_hedged_call_uses_the_fastest_response(fake_http_future):
+    slow = fake_http_future(status_code=200, delay=1)
+    fast = fake_http_future(status_code=201)
+    future = ResilientFuture(make_request_from([slow, fast]), 'GET', hedge_policy=HedgePolicy(delay=0.01))
+
+    assert await future.result() == 201
+    await asyncio.sleep(0)
+    assert slow.cancelled
+
+
+@pytest.mark.asyncio
+async def test_hedge_not_sent_when_the_call_is_fast(fake_http_future):
+    make_request = make_request_from([fake_http_future()])
+    future = ResilientFuture(make_request, 'GET', hedge_policy=HedgePolicy(delay=0.1))
+
+    assert await future.result() == 200
+    assert make_request.call_count == 1
+    assert len(future.latency_tracker) == 1
+
+
+@pytest.mark.asyncio
+async def test_hedged_call_waits_for_the_other_request_on_failure(fake_http_future):
+    failing = fake_http_future(error=BravadoTimeoutError(), delay=0.02)
+    slower = fake_http_future(status_code=201, delay=0.03)
+    future = ResilientFuture(make_request_from([failing, slower]), 'GET', hedge_policy=HedgePolicy(delay=0.01))
+
+    assert await future.result() == 201
+
+
+def test_client_reads_policies_from_vendor_extensions(petstore_dict):
+    petstore_dict['paths']['/pet/{petId}']['get']['x-retry-policy'] = {'max_attempts': 5}
+    client = SwaggerClient.from_spec(
+        petstore_dict,
+        http_client=Mock(),
+        config={'hedge_policy': HedgePolicy(delay=0.1)},
+    )
+
+    retry_policy, hedge_policy = client.pet.getPetById.policies
+    assert retry_policy.max_attempts == 5
+    assert hedge_policy.delay == 0.1
+
+    assert isinstance(client.pet.getPetById(petId=1), ResilientFuture)
+    request_options = {'retry_policy': None, 'hedge_policy': None}
+    assert not isinstance(client.pet.getPetById(petId=1, _request_options=request_options), ResilientFuture)
+
+
+@pytest.mark.asyncio
+async def test_client_retries_calls(petstore_dict, fake_http_future):
+    http_client = Mock(request=Mock(side_effect=[fake_http_future(status_code=503), fake_http_future(status_code=503)]))
+    client = SwaggerClient.from_spec(
+        petstore_dict,
+        http_client=http_client,
+        config={'retry_policy': RetryPolicy(max_attempts=2, backoff=0)},
+    )
+
+    incoming_response = await client.pet.getPetById(petId=1).response()
+
+    assert incoming_response.status_code == 503
+    assert http_client.request.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_real_timeouts_are_retried(make_local_client, local_server):
+    calls = []
+
+    async def handler(request):
+        calls.append(request.path)
+        if len(calls) == 1:
+            await asyncio.sleep(1)
+        return web.json_response({'id': 1, 'name': 'Lili', 'photoUrls': []})
+
+    async with local_server(handler) as url:
+        client = make_local_client(url, config={'retry_policy': RetryPolicy(backoff=0, jitter=False)})
+        pet = await client.pet.getPetById(petId=1).result(timeout=0.2)
+
+    assert pet.name == 'Lili'
+    assert calls == ['/v2/pet/1', '/v2/pet/1']
+
+
+@pytest.mark.asyncio
+async def test_refused_connections_are_retried(make_local_client, closed_port_url):
+    client = make_local_client(closed_port_url, config={'retry_policy': RetryPolicy(backoff=0, jitter=False)})
+    with patch.object(client.swagger_spec.http_client, 'request',
+                      wraps=client.swagger_spec.http_client.request) as mock_request:
+        with pytest.raises(BravadoConnectionError):
+            await client.pet.getPetById(petId=1).result(timeout=5)
+
+    assert mock_request.call_count == 3
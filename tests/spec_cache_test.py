@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+import pickle
+import time
+
+import pytest
+import yaml
+
+from aiobravado.spec_cache import SpecCache
+from aiobravado.spec_cache import SpecCacheEntry
+from aiobravado.swagger_model import SpecYAMLLoader
+
+
+@pytest.mark.asyncio
+async def test_round_trip(tmpdir):
+    spec_cache = SpecCache(str(tmpdir.join('specs')))
+    await spec_cache.set('http://localhost/swagger.json', SpecCacheEntry({'swagger': '2.0'}, etag='"v1"'))
+
+    entry = await spec_cache.get('http://localhost/swagger.json')
+
+    assert entry.spec_dict == {'swagger': '2.0'}
+    assert entry.etag == '"v1"'
+    assert await spec_cache.get('http://localhost/other.json') is None
+
+
+@pytest.mark.asyncio
+async def test_yaml_spec_is_normalised(tmpdir):
+    spec_dict = yaml.load(
+        'swagger: "2.0"\n'
+        'info: {title: Dates, version: 2020-01-01}\n'
+        'x-codes: {200: ok}\n',
+        Loader=SpecYAMLLoader,
+    )
+    spec_cache = SpecCache(str(tmpdir))
+    await spec_cache.set('http://localhost/swagger.yaml', SpecCacheEntry(spec_dict))
+
+    entry = await spec_cache.get('http://localhost/swagger.yaml')
+
+    assert entry.spec_dict == {
+        'swagger': '2.0',
+        'info': {'title': 'Dates', 'version': '2020-01-01'},
+        'x-codes': {'200': 'ok'},
+    }
+
+
+@pytest.mark.asyncio
+async def test_unreadable_entry_is_ignored(tmpdir):
+    spec_cache = SpecCache(str(tmpdir))
+    with open(spec_cache.get_path('http://localhost/swagger.json'), 'w') as f:
+        f.write('garbage')
+
+    assert await spec_cache.get('http://localhost/swagger.json') is None
+
+
+@pytest.mark.asyncio
+async def test_pickled_entry_is_not_loaded(tmpdir):
+    spec_cache = SpecCache(str(tmpdir))
+    with open(spec_cache.get_path('http://localhost/swagger.json'), 'wb') as f:
+        pickle.dump(SpecCacheEntry({'swagger': '2.0'}), f)
+
+    assert await spec_cache.get('http://localhost/swagger.json') is None
+
+
+@pytest.mark.parametrize('max_age, age, expected', [
+    (None, 0, False),
+    (60, 10, True),
+    (60, 100, False),
+])
+def test_is_fresh(max_age, age, expected):
+    entry = SpecCacheEntry({}, stored_at=time.time() - age)
+    assert entry.is_fresh(max_age) is expected
+
+
+def test_conditional_headers():
+    entry = SpecCacheEntry({}, etag='"v1"', last_modified='Wed, 21 Oct 2015 07:28:00 GMT')
+    assert entry.conditional_headers() == {
+        'If-None-Match': '"v1"',
+        'If-Modified-Since': 'Wed, 21 Oct 2015 07:28:00 GMT',
+    }
+    assert SpecCacheEntry({}).conditional_headers() == {}
@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+import os.path
+import threading
+
+import pytest
+from six.moves import urllib
+from six.moves.urllib import parse as urlparse
+
+from aiobravado.swagger_model import FileEventual
+
+
+@pytest.fixture
+def petstore_url(test_dir):
+    path = os.path.abspath(os.path.join(test_dir, '../test-data/2.0/petstore/swagger.json'))
+    return urlparse.urljoin(u'file:', urllib.request.pathname2url(path))
+
+
+@pytest.mark.asyncio
+async def test_file_is_read_off_the_event_loop(petstore_url):
+    file_eventual = FileEventual(petstore_url)
+    wait = file_eventual.wait
+    threads = []
+
+    def recording_wait(**kwargs):
+        threads.append(threading.current_thread())
+        return wait(**kwargs)
+
+    file_eventual.wait = recording_wait
+    response = await file_eventual.result()
+
+    assert threads[0] is not threading.current_thread()
+    assert (await response.json())['swagger'] == '2.0'
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+import json
+
+import pytest
+from bravado_core.response import IncomingResponse
+from mock import Mock
+
+from aiobravado.exception import HTTPError
+from aiobravado.spec_cache import SpecCache
+from aiobravado.spec_cache import SpecCacheEntry
+from aiobravado.swagger_model import Loader
+
+SPEC_URL = 'http://localhost/swagger.json'
+
+
+class Response(IncomingResponse):
+
+    def __init__(self, status_code, body=b'', headers=None):
+        self.status_code = status_code
+        self.reason = ''
+        self.headers = dict({'content-type': 'application/json'}, **(headers or {}))
+        self.body = body
+
+    async def json(self, **kwargs):
+        return json.loads(self.body.decode('utf-8'))
+
+
+def mock_http_client(response):
+    http_client = Mock()
+
+    async def result(timeout=None):
+        if not 200 <= response.status_code < 300:
+            raise HTTPError(response)
+        return response
+
+    http_client.request.return_value.result = result
+    return http_client
+
+
+@pytest.fixture
+def spec_cache(tmpdir):
+    return SpecCache(str(tmpdir))
+
+
+@pytest.mark.asyncio
+async def test_miss_stores_spec_with_validators(spec_cache):
+    http_client = mock_http_client(Response(200, b'{"swagger": "2.0"}', {'etag': '"v1"'}))
+
+    spec_dict = await Loader(http_client, spec_cache=spec_cache).load_spec(SPEC_URL)
+
+    assert spec_dict == {'swagger': '2.0'}
+    entry = await spec_cache.get(SPEC_URL)
+    assert entry.spec_dict == spec_dict
+    assert entry.etag == '"v1"'
+
+
+@pytest.mark.asyncio
+async def test_not_modified_uses_cached_spec(spec_cache):
+    await spec_cache.set(SPEC_URL, SpecCacheEntry({'swagger': '2.0'}, etag='"v1"'))
+    http_client = mock_http_client(Response(304))
+
+    spec_dict = await Loader(http_client, request_headers={'foo': 'bar'}, spec_cache=spec_cache).load_spec(SPEC_URL)
+
+    assert spec_dict == {'swagger': '2.0'}
+    request_params = http_client.request.call_args[0][0]
+    assert request_params['headers'] == {'foo': 'bar', 'If-None-Match': '"v1"'}
+
+
+@pytest.mark.asyncio
+async def test_modified_spec_replaces_cached_spec(spec_cache):
+    await spec_cache.set(SPEC_URL, SpecCacheEntry({'swagger': '1.2'}, etag='"v1"'))
+    http_client = mock_http_client(Response(200, b'{"swagger": "2.0"}', {'etag': '"v2"'}))
+
+    spec_dict = await Loader(http_client, spec_cache=spec_cache).load_spec(SPEC_URL)
+
+    assert spec_dict == {'swagger': '2.0'}
+    assert (await spec_cache.get(SPEC_URL)).etag == '"v2"'
+
+
+@pytest.mark.asyncio
+async def test_fresh_entry_skips_network(tmpdir):
+    spec_cache = SpecCache(str(tmpdir), max_age=60)
+    await spec_cache.set(SPEC_URL, SpecCacheEntry({'swagger': '2.0'}))
+    http_client = Mock()
+
+    assert await Loader(http_client, spec_cache=spec_cache).load_spec(SPEC_URL) == {'swagger': '2.0'}
+    assert http_client.request.call_count == 0
+
+
+@pytest.mark.asyncio
+async def test_errors_are_not_cached(spec_cache):
+    http_client = mock_http_client(Response(500))
+
+    with pytest.raises(HTTPError):
+        await Loader(http_client, spec_cache=spec_cache).load_spec(SPEC_URL)
+    assert await spec_cache.get(SPEC_URL) is None
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+import json
+
+import pytest
+from aiohttp import web
+from mock import Mock
+
+from aiobravado.client import SwaggerClient
+from aiobravado.swagger_model import get_remote_document_urls
+from aiobravado.swagger_model import Loader
+
+
+@pytest.fixture
+def spec_dict():
+    return {
+        'swagger': '2.0',
+        'info': {'version': '1.0.0', 'title': 'Split'},
+        'paths': {
+            '/pet': {
+                'get': {
+                    'operationId': 'getPet',
+                    'tags': ['pet'],
+                    'responses': {
+                        '200': {'description': 'A pet', 'schema': {'$ref': 'definitions.json#/definitions/Pet'}},
+                    },
+                },
+            },
+        },
+        'definitions': {
+            'Error': {'type': 'object', 'properties': {'message': {'type': 'string'}}},
+        },
+    }
+
+
+@pytest.fixture
+def definitions_dict():
+    return {
+        'definitions': {
+            'Pet': {
+                'type': 'object',
+                'properties': {
+                    'name': {'type': 'string'},
+                    'category': {'$ref': 'nested/category.json'},
+                    'error': {'$ref': 'swagger.json#/definitions/Error'},
+                    'owner': {'$ref': '#/definitions/Owner'},
+                },
+            },
+            'Owner': {'type': 'object', 'properties': {'name': {'type': 'string'}}},
+        },
+    }
+
+
+@pytest.fixture
+def category_dict():
+    return {'type': 'object', 'properties': {'name': {'type': 'string'}}}
+
+
+@pytest.fixture
+def spec_url(tmpdir, spec_dict, definitions_dict, category_dict):
+    tmpdir.join('swagger.json').write(json.dumps(spec_dict))
+    tmpdir.join('definitions.json').write(json.dumps(definitions_dict))
+    tmpdir.mkdir('nested').join('category.json').write(json.dumps(category_dict))
+    return 'file://' + str(tmpdir.join('swagger.json'))
+
+
+def test_get_remote_document_urls(definitions_dict):
+    assert get_remote_document_urls(definitions_dict, 'http://localhost/api/definitions.json') == {
+        'http://localhost/api/nested/category.json',
+        'http://localhost/api/swagger.json',
+    }
+
+
+@pytest.mark.asyncio
+async def test_load_remote_documents(spec_url, spec_dict, definitions_dict, category_dict):
+    documents = await Loader(None).load_remote_documents(spec_url, spec_dict)
+
+    base_url = spec_url.rsplit('/', 1)[0]
+    assert documents == {
+        base_url + '/definitions.json': definitions_dict,
+        base_url + '/nested/category.json': category_dict,
+    }
+
+
+@pytest.mark.asyncio
+async def test_from_url_with_remote_refs(spec_url):
+    client = await SwaggerClient.from_url(spec_url, http_client=Mock())
+    response_spec = client.pet.getPet.operation.op_spec['responses']['200']
+    pet_spec = client.swagger_spec.deref(response_spec['schema'])
+    assert set(pet_spec['properties']) == {'name', 'category', 'error', 'owner'}
+
+
+@pytest.mark.asyncio
+async def test_models_of_remote_documents(local_server, local_http_client):
+    documents = {
+        '/swagger.json': {
+            'swagger': '2.0',
+            'info': {'version': '1.0.0', 'title': 'Split'},
+            'paths': {
+                '/pet': {
+                    'get': {
+                        'operationId': 'getPet',
+                        'tags': ['pet'],
+                        'responses': {
+                            '200': {'description': 'A pet', 'schema': {'$ref': 'definitions.json#/definitions/Pet'}},
+                        },
+                    },
+                },
+            },
+            'definitions': {
+                'Local': {'type': 'object', 'properties': {'name': {'type': 'string'}}},
+            },
+        },
+        '/definitions.json': {
+            'definitions': {
+                'Pet': {
+                    'type': 'object',
+                    'properties': {
+                        'name': {'type': 'string'},
+                        'category': {'$ref': '#/definitions/Category'},
+                    },
+                },
+                'Category': {'type': 'object', 'properties': {'id': {'type': 'integer'}}},
+            },
+        },
+        '/pet': {'name': 'Lili', 'category': {'id': 1}},
+    }
+
+    async def handler(request):
+        return web.json_response(documents[request.path])
+
+    async with local_server(handler) as url:
+        client = await SwaggerClient.from_url(url + '/swagger.json', http_client=local_http_client)
+        pet = await client.pet.getPet().result(timeout=5)
+
+    assert sorted(client.swagger_spec.definitions) == ['Category', 'Local', 'Pet']
+    assert isinstance(pet, client.get_model('Pet'))
+    assert isinstance(pet.category, client.get_model('Category'))
+    assert pet.category.id == 1
@@ -42,3 +42,62 @@ def test_load_yaml(yaml_spec):
             },
         },
     }
+
+
+def test_load_yaml_only_stringifies_response_codes():
+    loader = Loader(None)
+    result = loader.load_yaml("""swagger: '2.0'
+paths:
+  /ping:
+    parameters: []
+    get:
+      responses:
+        200:
+          description: pong
+        default:
+          description: error
+      x-limits:
+        200: 10
+definitions:
+  Pong:
+    enum: [200]
+""")
+
+    assert result['paths']['/ping']['get']['responses'] == {
+        '200': {'description': 'pong'},
+        'default': {'description': 'error'},
+    }
+    assert result['paths']['/ping']['get']['x-limits'] == {200: 10}
+    assert result['definitions']['Pong']['enum'] == [200]
+
+
+def test_load_yaml_with_merged_responses():
+    loader = Loader(None)
+    result = loader.load_yaml("""swagger: '2.0'
+x-responses:
+  errors: &errors
+    500:
+      description: error
+  not-found: &not-found
+    404:
+      description: not found
+paths:
+  /ping:
+    get:
+      responses:
+        200:
+          description: pong
+        <<: *errors
+    post:
+      responses:
+        <<: [*errors, *not-found]
+""")
+
+    assert result['paths']['/ping']['get']['responses'] == {
+        '200': {'description': 'pong'},
+        '500': {'description': 'error'},
+    }
+    assert result['paths']['/ping']['post']['responses'] == {
+        '404': {'description': 'not found'},
+        '500': {'description': 'error'},
+    }
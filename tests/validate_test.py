@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+from concurrent.futures import ThreadPoolExecutor
+
+import bravado_core.param
+import bravado_core.validate
+import pytest
+from bravado_core.exception import SwaggerMappingError
+from bravado_core.spec import Spec
+from jsonschema.exceptions import ValidationError
+from mock import Mock
+from mock import patch
+
+from aiobravado.client import SwaggerClient
+from aiobravado.validate import get_validator
+from aiobravado.validate import validate_schema_object
+from aiobravado.validate import VALIDATORS_ATTRIBUTE
+
+
+@pytest.fixture
+def swagger_spec(petstore_dict):
+    return Spec.from_dict(petstore_dict)
+
+
+def test_validators_are_built_once(swagger_spec):
+    schema = {'type': 'integer', 'minimum': 1}
+    with patch('aiobravado.validate.get_validator_type') as mock_type:
+        assert get_validator(swagger_spec, schema) is get_validator(swagger_spec, schema)
+        assert mock_type.return_value.call_count == 1
+
+        get_validator(swagger_spec, {'type': 'string'})
+        assert mock_type.return_value.call_count == 2
+
+
+def test_threads_have_their_own_validators_and_resolver(swagger_spec):
+    schema = swagger_spec.spec_dict['definitions']['Pet']
+
+    def get_thread_validator():
+        return get_validator(swagger_spec, schema), vars(swagger_spec)[VALIDATORS_ATTRIBUTE].resolver
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        other_validator, other_resolver = executor.submit(get_thread_validator).result()
+    validator, resolver = get_thread_validator()
+
+    assert validator is not other_validator
+    assert len({id(resolver), id(other_resolver), id(swagger_spec.resolver)}) == 3
+
+
+def test_concurrent_validations(swagger_spec):
+    schema = {'type': 'array', 'items': {'$ref': '#/definitions/Pet'}}
+    pets = [{'name': 'Lili', 'photoUrls': [], 'category': {'id': 1}, 'tags': [{'id': 2}]}] * 100
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda _: validate_schema_object(swagger_spec, schema, pets), range(32)))
+
+
+@pytest.mark.parametrize('schema, value', [
+    ({'type': 'integer', 'minimum': 1}, 0),
+    ({'type': 'array', 'items': {'type': 'string'}}, [1]),
+    ({'$ref': '#/definitions/Pet'}, {'name': 'Lili'}),
+])
+def test_invalid_values(swagger_spec, schema, value):
+    with pytest.raises(ValidationError):
+        validate_schema_object(swagger_spec, schema, value)
+
+
+@pytest.mark.parametrize('schema, value', [
+    ({'type': 'integer', 'minimum': 1}, 1),
+    ({'$ref': '#/definitions/Pet'}, {'name': 'Lili', 'photoUrls': []}),
+    ({'type': 'file'}, object()),
+    ({}, object()),
+])
+def test_valid_values(swagger_spec, schema, value):
+    validate_schema_object(swagger_spec, schema, value)
+
+
+def test_unknown_type(swagger_spec):
+    with pytest.raises(SwaggerMappingError):
+        validate_schema_object(swagger_spec, {'type': 'foo'}, 1)
+
+
+def test_sensitive_values_are_scrubbed(swagger_spec):
+    with pytest.raises(ValidationError) as excinfo:
+        validate_schema_object(swagger_spec, {'type': 'string', 'maxLength': 3, 'x-sensitive': True}, 'secret')
+    assert excinfo.value.instance == '***'
+
+
+@pytest.mark.parametrize('config, cached_validations', [
+    ({}, 0),
+    ({'compile_operations': True}, 0),
+    ({'cache_request_validators': True}, 0),
+    ({'compile_operations': True, 'cache_request_validators': True}, 1),
+    ({'compile_operations': True, 'cache_request_validators': True, 'validate_requests': False}, 0),
+])
+def test_requests_are_validated(petstore_dict, config, cached_validations):
+    client = SwaggerClient.from_spec(petstore_dict, http_client=Mock(), config=config)
+
+    with patch('aiobravado.validate.get_validator', wraps=get_validator) as mock_get_validator:
+        client.pet.getPetById(petId=1)
+    assert mock_get_validator.call_count == cached_validations
+
+    if client.swagger_spec.config['validate_requests']:
+        with pytest.raises(ValidationError):
+            client.pet.addPet(body={'name': 'Lili'})
+        with pytest.raises(ValidationError) as excinfo:
+            client.pet.findPetsByStatus(status=['lost'])
+        assert excinfo.value.instance == 'lost'
+
+
+def test_bravado_core_is_not_affected(swagger_spec):
+    param = swagger_spec.resources['pet'].operations['findPetsByStatus'].params['status']
+    request = {'url': '/pet/findByStatus', 'params': {}, 'headers': {}}
+
+    assert bravado_core.param.validate_schema_object is bravado_core.validate.validate_schema_object
+    with patch('aiobravado.validate.get_validator') as mock_get_validator:
+        bravado_core.param.marshal_param(param, ['sold'], request)
+        with pytest.raises(ValidationError):
+            bravado_core.param.marshal_param(param, ['lost'], request)
+    assert not mock_get_validator.called
+    assert request['params'] == {'status': ['sold']}